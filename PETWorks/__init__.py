@@ -1,57 +1,81 @@
 import json
+from importlib import import_module
+from types import ModuleType
+from typing import TYPE_CHECKING, Dict, Union
 
-import pandas as pd
-
-import PETWorks.federatedlearning as FL
-import PETWorks.reidentificationrisk as ReidentificationRisk
-import PETWorks.ambiguity as Ambiguity
-import PETWorks.precision as Precision
-import PETWorks.nonUniformEntropy as NonUniformEntropy
-import PETWorks.aecs as AECS
-import PETWorks.kanonymity as KAnonymity
-import PETWorks.dpresence as DPresence
-import PETWorks.profitability as Profitability
-import PETWorks.tcloseness as TCloseness
-import PETWorks.ldiversity as LDiversity
-from web.generate import generateWebView
+if TYPE_CHECKING:
+    import pandas as pd
 
 HISTORY = "images/history.png"
 
+# Techs map to the modules that implement them, which are only imported when
+# a tech is first used.
+VALIDATIONS: Dict[str, Union[str, ModuleType]] = {
+    "FL": "PETWorks.federatedlearning",
+    "ReidentificationRisk": "PETWorks.reidentificationrisk",
+    "Ambiguity": "PETWorks.ambiguity",
+    "Precision": "PETWorks.precision",
+    "Non-Uniform Entropy": "PETWorks.nonUniformEntropy",
+    "AECS": "PETWorks.aecs",
+    "k-anonymity": "PETWorks.kanonymity",
+    "d-presence": "PETWorks.dpresence",
+    "profitability": "PETWorks.profitability",
+    "t-closeness": "PETWorks.tcloseness",
+    "l-diversity": "PETWorks.ldiversity",
+    "incremental": "PETWorks.incremental",
+}
+ANONYMIZATIONS: Dict[str, Union[str, ModuleType]] = {
+    "k-anonymity": "PETWorks.kanonymity",
+    "l-diversity": "PETWorks.ldiversity",
+    "d-presence": "PETWorks.dpresence",
+    "t-closeness": "PETWorks.tcloseness",
+}
+DATA_PROCESSES: Dict[str, Union[str, ModuleType]] = {
+    "FL": "PETWorks.federatedlearning",
+}
+MULTI_METRIC_VALIDATION = "PETWorks.multimetric"
+MULTI_CRITERIA_ANONYMIZATION = "PETWorks.multicriteria"
+BATCH_ANONYMIZATION = "PETWorks.batch"
+
+
+def registerValidation(tech: str, module: Union[str, ModuleType]) -> None:
+    VALIDATIONS[tech] = module
+
+
+def registerAnonymization(tech: str, module: Union[str, ModuleType]) -> None:
+    ANONYMIZATIONS[tech] = module
+
+
+def registerDataProcess(tech: str, module: Union[str, ModuleType]) -> None:
+    DATA_PROCESSES[tech] = module
+
+
+def __loadModule(
+    registry: Dict[str, Union[str, ModuleType]], tech: str
+) -> ModuleType:
+    if tech not in registry:
+        raise ValueError(f"Unsupported tech: {tech}")
+
+    module = registry[tech]
+    if isinstance(module, str):
+        return import_module(module)
+
+    return module
+
 
 def dataProcess(model, gradient, tech, method, **keywordArgs):
-    if tech == "FL":
-        return FL.dataProcess(model, gradient, tech, method, **keywordArgs)
+    return __loadModule(DATA_PROCESSES, tech).dataProcess(
+        model, gradient, tech, method, **keywordArgs
+    )
 
 
 def PETValidation(recover, origin, tech, **keywordArgs):
-    if tech == "FL":
-        return FL.PETValidation(recover, origin, tech, **keywordArgs)
-    elif tech == "ReidentificationRisk":
-        return ReidentificationRisk.PETValidation(
-            recover, origin, tech, **keywordArgs
-        )
-    elif tech == "Ambiguity":
-        return Ambiguity.PETValidation(recover, origin, tech, **keywordArgs)
-    elif tech == "Precision":
-        return Precision.PETValidation(recover, origin, tech, **keywordArgs)
-    elif tech == "Non-Uniform Entropy":
-        return NonUniformEntropy.PETValidation(
-            recover, origin, tech, **keywordArgs
-        )
-    elif tech == "AECS":
-        return AECS.PETValidation(recover, origin, tech, **keywordArgs)
-    elif tech == "k-anonymity":
-        return KAnonymity.PETValidation(recover, origin, tech, **keywordArgs)
-    elif tech == "d-presence":
-        return DPresence.PETValidation(recover, origin, tech, **keywordArgs)
-    elif tech == "profitability":
-        return Profitability.PETValidation(
-            recover, origin, tech, **keywordArgs
-        )
-    elif tech == "t-closeness":
-        return TCloseness.PETValidation(recover, origin, tech, **keywordArgs)
-    elif tech == "l-diversity":
-        return LDiversity.PETValidation(recover, origin, tech, **keywordArgs)
+    if isinstance(tech, list):
+        module = import_module(MULTI_METRIC_VALIDATION)
+    else:
+        module = __loadModule(VALIDATIONS, tech)
+
+    return module.PETValidation(recover, origin, tech, **keywordArgs)
 
 
 def report(result, format):
@@ -60,6 +84,8 @@ def report(result, format):
         return
 
     if format == "web":
+        from web.generate import generateWebView
+
         originPath = "images/original_image.png"
         recoverPath = "images/recovered_image.png"
         result["origin"].save(originPath)
@@ -78,25 +104,44 @@ def PETAnonymization(
     dataHierarchy,
     attributeTypes,
     maxSuppressionRate,
-    **keywordArgs
+    **keywordArgs,
+):
+    if isinstance(tech, list):
+        return import_module(MULTI_CRITERIA_ANONYMIZATION).PETAnonymization(
+            originalData,
+            dataHierarchy,
+            attributeTypes,
+            maxSuppressionRate,
+            tech,
+            **keywordArgs,
+        )
+
+    return __loadModule(ANONYMIZATIONS, tech).PETAnonymization(
+        originalData,
+        dataHierarchy,
+        attributeTypes,
+        maxSuppressionRate,
+        **keywordArgs,
+    )
+
+
+def PETBatchAnonymization(
+    originalData,
+    tech,
+    dataHierarchy,
+    attributeTypes,
+    maxSuppressionRate,
+    parameterSets,
 ):
-    if tech == "k-anonymity":
-        anonymization = KAnonymity
-    elif tech == "l-diversity":
-        anonymization = LDiversity
-    elif tech == "d-presence":
-        anonymization = DPresence
-    elif tech == "t-closeness":
-        anonymization = TCloseness
-
-    return anonymization.PETAnonymization(
+    return import_module(BATCH_ANONYMIZATION).PETAnonymization(
         originalData,
         dataHierarchy,
         attributeTypes,
         maxSuppressionRate,
-        **keywordArgs
+        tech,
+        parameterSets,
     )
 
 
-def output(data: pd.DataFrame, filePath: str) -> None:
+def output(data: "pd.DataFrame", filePath: str) -> None:
     data.to_csv(filePath, index=False, sep=";")
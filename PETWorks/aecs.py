@@ -1,7 +1,7 @@
 from PETWorks.arx import (
     Data,
     loadDataFromCsv,
-    JavaApi,
+    javaApiSession,
     UtilityMetrics,
     setDataHierarchies,
 )
@@ -12,16 +12,16 @@ def _measureAECS(original: Data, anonymized: Data) -> float:
 
 
 def PETValidation(original, anonymized, _, attributeTypes):
-    javaApi = JavaApi()
-    original = loadDataFromCsv(
-        original, javaApi.StandardCharsets.UTF_8, ";", javaApi
-    )
-    anonymized = loadDataFromCsv(
-        anonymized, javaApi.StandardCharsets.UTF_8, ";", javaApi
-    )
+    with javaApiSession() as javaApi:
+        original = loadDataFromCsv(
+            original, javaApi.StandardCharsets.UTF_8, ";", javaApi
+        )
+        anonymized = loadDataFromCsv(
+            anonymized, javaApi.StandardCharsets.UTF_8, ";", javaApi
+        )
 
-    setDataHierarchies(original, None, attributeTypes, javaApi)
-    setDataHierarchies(anonymized, None, attributeTypes, javaApi)
+        setDataHierarchies(original, None, attributeTypes, javaApi)
+        setDataHierarchies(anonymized, None, attributeTypes, javaApi)
 
-    aecs = _measureAECS(original, anonymized)
-    return {"AECS": aecs}
+        aecs = _measureAECS(original, anonymized)
+        return {"AECS": aecs}
@@ -0,0 +1,171 @@
+import asyncio
+from concurrent.futures import CancelledError, Executor, ThreadPoolExecutor
+from functools import partial
+from os import cpu_count
+from threading import Lock
+from typing import Any, Callable, Union
+
+import pandas as pd
+
+import PETWorks
+from PETWorks.arx import bindJavaApi, getJavaApiPool, javaApiSession
+
+JVM_BOUND_VALIDATIONS = [
+    "ReidentificationRisk",
+    "Ambiguity",
+    "Precision",
+    "Non-Uniform Entropy",
+    "AECS",
+]
+
+
+class _GatewayJob:
+    def __init__(self, function: Callable, *arguments, **keywordArgs):
+        self.function = function
+        self.arguments = arguments
+        self.keywordArgs = keywordArgs
+
+        self.__lock = Lock()
+        self.__javaApi = None
+        self.__isCancelled = False
+
+    def run(self) -> Any:
+        with javaApiSession() as javaApi:
+            with self.__lock:
+                if self.__isCancelled:
+                    raise CancelledError()
+                self.__javaApi = javaApi
+
+            try:
+                with bindJavaApi(javaApi):
+                    return self.function(*self.arguments, **self.keywordArgs)
+            finally:
+                with self.__lock:
+                    self.__javaApi = None
+
+    def cancel(self) -> None:
+        with self.__lock:
+            self.__isCancelled = True
+            javaApi = self.__javaApi
+
+        # A running JVM call can only be interrupted by ending its gateway,
+        # which the pool then replaces.
+        if javaApi is not None:
+            javaApi.kill()
+
+
+__gatewayExecutor = None
+__cpuExecutor = None
+__executorLock = Lock()
+
+
+def getGatewayExecutor() -> Executor:
+    global __gatewayExecutor
+
+    with __executorLock:
+        if __gatewayExecutor is None:
+            __gatewayExecutor = ThreadPoolExecutor(
+                getJavaApiPool().maxSize,
+                thread_name_prefix="petworks-gateway",
+            )
+
+        return __gatewayExecutor
+
+
+def getCpuExecutor() -> Executor:
+    global __cpuExecutor
+
+    with __executorLock:
+        if __cpuExecutor is None:
+            __cpuExecutor = ThreadPoolExecutor(
+                cpu_count(), thread_name_prefix="petworks-cpu"
+            )
+
+        return __cpuExecutor
+
+
+def shutdownExecutors() -> None:
+    global __gatewayExecutor, __cpuExecutor
+
+    with __executorLock:
+        executors = [__gatewayExecutor, __cpuExecutor]
+        __gatewayExecutor = None
+        __cpuExecutor = None
+
+    for executor in executors:
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+async def __runOnGateway(
+    timeout: float, function: Callable, *arguments, **keywordArgs
+) -> Any:
+    job = _GatewayJob(function, *arguments, **keywordArgs)
+    future = asyncio.get_running_loop().run_in_executor(
+        getGatewayExecutor(), job.run
+    )
+    try:
+        return await asyncio.wait_for(future, timeout)
+    except (asyncio.CancelledError, asyncio.TimeoutError):
+        job.cancel()
+        raise
+
+
+async def __runOnCpu(
+    timeout: float, function: Callable, *arguments, **keywordArgs
+) -> Any:
+    # Jobs that have not started are dropped, but a running one finishes in
+    # its thread after its result has been given up on.
+    future = asyncio.get_running_loop().run_in_executor(
+        getCpuExecutor(), partial(function, *arguments, **keywordArgs)
+    )
+    return await asyncio.wait_for(future, timeout)
+
+
+async def PETValidation(
+    recover, origin, tech, timeout: float = None, **keywordArgs
+) -> Any:
+    techs = tech if isinstance(tech, list) else [tech]
+    if any(tech in JVM_BOUND_VALIDATIONS for tech in techs):
+        run = __runOnGateway
+    else:
+        run = __runOnCpu
+        # Forking from a process whose other threads may hold locks is
+        # unsafe, so the measurements run in the executor thread itself.
+        if "numOfProcess" in keywordArgs:
+            keywordArgs["numOfProcess"] = 1
+
+    return await run(
+        timeout,
+        PETWorks.PETValidation,
+        recover,
+        origin,
+        tech,
+        **keywordArgs,
+    )
+
+
+async def PETAnonymization(
+    originalData,
+    tech: Union[str, list],
+    dataHierarchy,
+    attributeTypes,
+    maxSuppressionRate,
+    timeout: float = None,
+    **keywordArgs,
+) -> pd.DataFrame:
+    if isinstance(tech, list) or keywordArgs.get("engine") == "native":
+        run = __runOnCpu
+    else:
+        run = __runOnGateway
+
+    return await run(
+        timeout,
+        PETWorks.PETAnonymization,
+        originalData,
+        tech,
+        dataHierarchy,
+        attributeTypes,
+        maxSuppressionRate,
+        **keywordArgs,
+    )
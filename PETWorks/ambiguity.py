@@ -3,7 +3,7 @@ from PETWorks.arx import (
     loadDataFromCsv,
     loadDataHierarchy,
     setDataHierarchies,
-    JavaApi,
+    javaApiSession,
     UtilityMetrics,
 )
 
@@ -13,21 +13,20 @@ def _measureAmbiguity(original: Data, anonymized: Data) -> float:
 
 
 def PETValidation(original, anonymized, _, dataHierarchy, attributeTypes):
-    javaApi = JavaApi()
-
-    dataHierarchy = loadDataHierarchy(
-        dataHierarchy, javaApi.StandardCharsets.UTF_8, ";", javaApi
-    )
-
-    original = loadDataFromCsv(
-        original, javaApi.StandardCharsets.UTF_8, ";", javaApi
-    )
-    anonymized = loadDataFromCsv(
-        anonymized, javaApi.StandardCharsets.UTF_8, ";", javaApi
-    )
-
-    setDataHierarchies(original, dataHierarchy, attributeTypes, javaApi)
-    setDataHierarchies(anonymized, dataHierarchy, attributeTypes, javaApi)
-
-    ambiguity = _measureAmbiguity(original, anonymized)
-    return {"ambiguity": ambiguity}
+    with javaApiSession() as javaApi:
+        dataHierarchy = loadDataHierarchy(
+            dataHierarchy, javaApi.StandardCharsets.UTF_8, ";", javaApi
+        )
+
+        original = loadDataFromCsv(
+            original, javaApi.StandardCharsets.UTF_8, ";", javaApi
+        )
+        anonymized = loadDataFromCsv(
+            anonymized, javaApi.StandardCharsets.UTF_8, ";", javaApi
+        )
+
+        setDataHierarchies(original, dataHierarchy, attributeTypes, javaApi)
+        setDataHierarchies(anonymized, dataHierarchy, attributeTypes, javaApi)
+
+        ambiguity = _measureAmbiguity(original, anonymized)
+        return {"ambiguity": ambiguity}
@@ -1,24 +1,34 @@
+import atexit
+from contextlib import contextmanager
 from dataclasses import dataclass
-import re
 import pandas as pd
 import numpy as np
-from os import PathLike, listdir
-from os.path import join
-from typing import Dict, Iterator, List, Tuple
+from os import PathLike, close, register_at_fork, remove
+from tempfile import mkstemp
+from threading import Condition, Lock, local
+from typing import Callable, Dict, Generator, Iterator, List, Tuple
+from weakref import WeakKeyDictionary, WeakMethod
 from PETWorks.attributetypes import (
     IDENTIFIER,
     INSENSITIVE_ATTRIBUTE,
     QUASI_IDENTIFIER,
     SENSITIVE_ATTRIBUTE,
 )
+from PETWorks.hierarchy import (
+    CompiledHierarchy,
+    findAnonymousLevels,
+    getHierarchySignature,
+    loadCompiledHierarchies,
+)
 
 
 from py4j.java_gateway import JavaGateway, JavaClass
 from py4j.java_collections import JavaArray
-from py4j.protocol import Py4JJavaError
-
+from py4j.protocol import Py4JError, Py4JJavaError
 
 PATH_TO_ARX_LIBRARY = "arx/lib/libarx-3.9.0.jar"
+DATA_HANDLE_DELIMITER = ";"
+DEFAULT_JAVA_API_POOL_SIZE = 4
 
 Data = JavaClass
 Charset = JavaClass
@@ -27,6 +37,7 @@ CSVHierarchyInput = JavaClass
 Hierarchy = JavaClass
 ARXConfiguration = JavaClass
 KAnonymity = JavaClass
+PrivacyModel = JavaClass
 ARXAnonymizer = JavaClass
 ARXResult = JavaClass
 ARXNode = JavaClass
@@ -63,7 +74,9 @@ javaApiTable = {
 
 
 def createJavaGateway() -> JavaGateway:
-    return JavaGateway.launch_gateway(classpath=PATH_TO_ARX_LIBRARY)
+    return JavaGateway.launch_gateway(
+        classpath=PATH_TO_ARX_LIBRARY, die_on_exit=True
+    )
 
 
 class JavaApi:
@@ -72,12 +85,202 @@ class JavaApi:
         gatewayObject: JavaGateway = None,
         apiTable: Dict[str, str] = javaApiTable,
     ):
-        self.gatewayObject = createJavaGateway()
+        if gatewayObject is None:
+            gatewayObject = createJavaGateway()
+
+        self.gatewayObject = gatewayObject
 
         for name, javaApi in apiTable.items():
             api = eval("self.gatewayObject." + javaApi)
             setattr(self, name, api)
 
+    def isAlive(self) -> bool:
+        try:
+            self.gatewayObject.jvm.java.lang.System.currentTimeMillis()
+        except Py4JError:
+            return False
+
+        return True
+
+    def shutdown(self) -> None:
+        try:
+            self.gatewayObject.shutdown()
+        except Py4JError:
+            pass
+
+    def kill(self) -> None:
+        # Shutting the gateway down leaves a JVM that is still computing
+        # alive, so its process is ended as well.
+        self.shutdown()
+
+        javaProcess = getattr(self.gatewayObject, "java_process", None)
+        if javaProcess is not None:
+            javaProcess.kill()
+            javaProcess.wait()
+
+
+class JavaApiPool:
+    def __init__(
+        self,
+        maxSize: int = DEFAULT_JAVA_API_POOL_SIZE,
+        apiTable: Dict[str, str] = javaApiTable,
+        createJavaApi: Callable[[], JavaApi] = None,
+    ):
+        if maxSize < 1:
+            raise ValueError(f"Unexpected pool size: {maxSize}")
+
+        self.maxSize = maxSize
+        self.apiTable = apiTable
+        self.createJavaApi = createJavaApi or (
+            lambda: JavaApi(apiTable=apiTable)
+        )
+
+        self.__condition = Condition()
+        self.__idleJavaApis = []
+        self.__numOfJavaApis = 0
+        self.__isShutdown = False
+
+        # Gateways inherited through fork belong to the parent process. The
+        # hook runs in the child before any other thread exists, so the state
+        # is reset without racing a concurrent acquire or release.
+        forgetJavaApis = WeakMethod(self.__forgetParentProcessJavaApis)
+
+        def forgetJavaApisInChild() -> None:
+            method = forgetJavaApis()
+            if method is not None:
+                method()
+
+        register_at_fork(after_in_child=forgetJavaApisInChild)
+
+    def __forgetParentProcessJavaApis(self) -> None:
+        self.__condition = Condition()
+        self.__idleJavaApis = []
+        self.__numOfJavaApis = 0
+
+    def acquire(self, timeout: float = None) -> JavaApi:
+        with self.__condition:
+            isAvailable = self.__condition.wait_for(
+                lambda: self.__isShutdown
+                or self.__idleJavaApis
+                or self.__numOfJavaApis < self.maxSize,
+                timeout,
+            )
+            if self.__isShutdown:
+                raise RuntimeError("The Java API pool has been shut down.")
+            if not isAvailable:
+                raise TimeoutError("No Java API is available in the pool.")
+
+            if self.__idleJavaApis:
+                javaApi = self.__idleJavaApis.pop()
+            else:
+                javaApi = None
+                self.__numOfJavaApis += 1
+
+        if javaApi is not None:
+            if javaApi.isAlive():
+                return javaApi
+            javaApi.shutdown()
+
+        try:
+            return self.createJavaApi()
+        except Exception:
+            self.__discard()
+            raise
+
+    def release(self, javaApi: JavaApi) -> None:
+        if not javaApi.isAlive():
+            self.__discard()
+            return
+
+        with self.__condition:
+            if not self.__isShutdown:
+                self.__idleJavaApis.append(javaApi)
+                self.__condition.notify()
+                return
+
+        javaApi.shutdown()
+        self.__discard()
+
+    def __discard(self) -> None:
+        with self.__condition:
+            self.__numOfJavaApis -= 1
+            self.__condition.notify()
+
+    @contextmanager
+    def session(self, timeout: float = None) -> Iterator[JavaApi]:
+        javaApi = self.acquire(timeout)
+        try:
+            yield javaApi
+        finally:
+            self.release(javaApi)
+
+    def shutdown(self) -> None:
+        with self.__condition:
+            self.__isShutdown = True
+            idleJavaApis = self.__idleJavaApis
+            self.__idleJavaApis = []
+            self.__numOfJavaApis -= len(idleJavaApis)
+            self.__condition.notify_all()
+
+        for javaApi in idleJavaApis:
+            javaApi.shutdown()
+
+
+__javaApiPool = None
+__javaApiPoolLock = Lock()
+
+
+def getJavaApiPool() -> JavaApiPool:
+    global __javaApiPool
+
+    with __javaApiPoolLock:
+        if __javaApiPool is None:
+            __javaApiPool = JavaApiPool()
+
+        return __javaApiPool
+
+
+def shutdownJavaApiPool() -> None:
+    global __javaApiPool
+
+    with __javaApiPoolLock:
+        javaApiPool = __javaApiPool
+        __javaApiPool = None
+
+    if javaApiPool is not None:
+        javaApiPool.shutdown()
+
+
+__boundJavaApis = local()
+
+
+@contextmanager
+def bindJavaApi(javaApi: JavaApi) -> Iterator[JavaApi]:
+    previousJavaApi = getattr(__boundJavaApis, "javaApi", None)
+    __boundJavaApis.javaApi = javaApi
+    try:
+        yield javaApi
+    finally:
+        __boundJavaApis.javaApi = previousJavaApi
+
+
+@contextmanager
+def javaApiSession(timeout: float = None) -> Iterator[JavaApi]:
+    # A Java API bound to this thread is owned by whoever bound it.
+    javaApi = getattr(__boundJavaApis, "javaApi", None)
+    if javaApi is not None:
+        yield javaApi
+        return
+
+    with getJavaApiPool().session(timeout) as javaApi:
+        yield javaApi
+
+
+atexit.register(shutdownJavaApiPool)
+
+__javaHierarchyCache: Dict[JavaApi, Dict] = WeakKeyDictionary()
+__javaHierarchyCacheLock = Lock()
+
 
 @dataclass
 class UtilityMetrics:
@@ -111,40 +314,57 @@ def loadDataFromCsv(
     return javaApi.Data.create(path, charset, delimiter)
 
 
-def __findHierarchyFile(path: PathLike) -> Iterator[Tuple[str, PathLike]]:
-    for filename in listdir(path):
-        result = re.match(".*hierarchy_(.*?).csv", filename)
-        if result is None:
-            continue
-
-        attributeName = result.group(1)
+def createDataFromDataFrame(dataFrame: pd.DataFrame, javaApi: JavaApi) -> Data:
+    fileDescriptor, path = mkstemp(suffix=".csv")
+    close(fileDescriptor)
 
-        dataHierarchyFile = join(path, filename)
-
-        yield attributeName, dataHierarchyFile
+    # ARX opens the file when the data is created, so it can go right away.
+    try:
+        dataFrame.to_csv(path, sep=DATA_HANDLE_DELIMITER, index=False)
+        return loadDataFromCsv(
+            path,
+            javaApi.StandardCharsets.UTF_8,
+            DATA_HANDLE_DELIMITER,
+            javaApi,
+        )
+    finally:
+        remove(path)
 
 
 def loadDataHierarchy(
     path: PathLike, charset: Charset, delimiter: str, javaApi: JavaApi
 ) -> Dict[str, JavaArray]:
-    return {
-        attributeName: javaApi.Hierarchy.create(
-            javaApi.CSVHierarchyInput(
-                hierarchyFile, charset, delimiter
-            ).getHierarchy()
-        )
-        for attributeName, hierarchyFile in __findHierarchyFile(path)
-    }
+    signature = getHierarchySignature(path, delimiter)
+    key = (signature, charset.name())
+
+    with __javaHierarchyCacheLock:
+        javaHierarchies = __javaHierarchyCache.setdefault(javaApi, {})
+        if key not in javaHierarchies:
+            # Drop hierarchies loaded from older versions of the same files.
+            for staleKey in list(javaHierarchies):
+                if staleKey[0][:2] == signature[:2]:
+                    del javaHierarchies[staleKey]
+
+            javaHierarchies[key] = {
+                attributeName: javaApi.Hierarchy.create(
+                    javaApi.CSVHierarchyInput(
+                        hierarchyFile, charset, delimiter
+                    ).getHierarchy()
+                )
+                for attributeName, hierarchyFile, _ in signature[3]
+            }
+
+        return dict(javaHierarchies[key])
 
 
 def loadDataHierarchyNatively(
     path: PathLike, delimiter: str
 ) -> Dict[str, np.chararray]:
     return {
-        attributeName: pd.read_csv(hierarchyFile, sep=delimiter).to_numpy(
-            dtype=str
-        )
-        for attributeName, hierarchyFile in __findHierarchyFile(path)
+        attributeName: hierarchy.values
+        for attributeName, hierarchy in loadCompiledHierarchies(
+            path, delimiter
+        ).items()
     }
 
 
@@ -211,96 +431,119 @@ def getQiIndices(data: Data) -> List[int]:
     return qiIndices
 
 
-def findAnonymousLevel(hierarchy: JavaArray, value: str) -> int:
-    for hierarchyRow in hierarchy:
-        for level in range(len(hierarchyRow)):
-            if hierarchyRow[level] == value:
-                return level
-    return -1
-
-
 def getAnonymousLevels(
-    anonymizedSubset: Data, hierarchies: Dict[str, JavaArray]
+    anonymizedSubset: Data, hierarchies: Dict[str, CompiledHierarchy]
 ) -> List[int]:
-    subsetDataFrame = getDataFrame(anonymizedSubset)
-    subsetRowNum = len(subsetDataFrame)
-
-    qiIndices = getQiIndices(anonymizedSubset)
-
-    sampleRowIndex = -1
-    allSuppressed = False
-    for subsetRowIndex in range(subsetRowNum):
-        for qiIndex in qiIndices:
-            if subsetDataFrame.iloc[subsetRowIndex][qiIndex] != "*":
-                sampleRowIndex = subsetRowIndex
-                break
+    return findAnonymousLevels(
+        getDataFrame(anonymizedSubset),
+        getQiNames(anonymizedSubset),
+        hierarchies,
+    )
 
-        if sampleRowIndex != -1:
-            break
 
-        allSuppressed = subsetRowIndex == subsetRowNum - 1
+def __exportDataHandle(data: Data) -> str:
+    fileDescriptor, path = mkstemp(suffix=".csv")
+    close(fileDescriptor)
 
-    anonymousLevels = []
-    for qiIndex in qiIndices:
-        value = subsetDataFrame.iloc[sampleRowIndex][qiIndex]
-        attributeName = subsetDataFrame.columns[qiIndex]
-        hierarchy = hierarchies[attributeName].getHierarchy()
+    try:
+        data.getHandle().save(path, DATA_HANDLE_DELIMITER)
+    except Exception:
+        remove(path)
+        raise
 
-        if allSuppressed:
-            anonymousLevels.append(len(hierarchy[0]) - 1)
-            continue
+    return path
 
-        anonymousLevels.append(findAnonymousLevel(hierarchy, value))
 
-    return anonymousLevels
+def __readExportedDataHandle(path: PathLike, **options):
+    return pd.read_csv(
+        path,
+        sep=DATA_HANDLE_DELIMITER,
+        dtype=str,
+        na_filter=False,
+        **options,
+    )
 
 
 def getDataFrame(data: Data) -> pd.DataFrame:
     if not data:
         return pd.DataFrame()
 
-    dataHandle = data.getHandle()
-    rowNum = dataHandle.getNumRows()
-    colNum = dataHandle.getNumColumns()
-
-    data = []
-    for rowIndex in range(rowNum):
-        row = []
-        for colIndex in range(colNum):
-            row.append(dataHandle.getValue(rowIndex, colIndex))
-        data.append(row)
-
-    colNames = [
-        dataHandle.getAttributeName(colIndex) for colIndex in range(colNum)
-    ]
+    path = __exportDataHandle(data)
+    try:
+        return __readExportedDataHandle(path)
+    finally:
+        remove(path)
 
-    return pd.DataFrame(data, columns=colNames)
 
+def getDataFrameChunks(
+    data: Data, chunkSize: int
+) -> Generator[pd.DataFrame, None, None]:
+    if not data:
+        return
 
-def getSubsetIndices(
-    table: Data,
-    subset: Data,
-) -> List[int]:
-    qiNames = getQiNames(table)
-    qiIndices = getQiIndices(table)
+    path = __exportDataHandle(data)
+    try:
+        with __readExportedDataHandle(path, chunksize=chunkSize) as reader:
+            yield from reader
+    finally:
+        remove(path)
 
-    tableDataFrame = getDataFrame(table)
-    groupedSubset = getDataFrame(subset).groupby(qiNames)
 
+def findSubsetIndices(
+    tableDataFrame: pd.DataFrame,
+    subsetDataFrame: pd.DataFrame,
+    qiNames: List[str],
+) -> List[int]:
     tableRowNum = len(tableDataFrame)
 
-    subsetIndices = []
-    for _, subsetGroup in groupedSubset:
-        subsetGroupList = subsetGroup.values.tolist()
-        filter = pd.Series(True, index=range(tableRowNum))
-        for qiName, qiIndex in zip(qiNames, qiIndices):
-            filter &= tableDataFrame[qiName] == subsetGroupList[0][qiIndex]
+    # Group both tables together so that equal QI tuples share one id.
+    classIds = (
+        pd.concat(
+            [tableDataFrame[qiNames], subsetDataFrame[qiNames]],
+            ignore_index=True,
+        )
+        .groupby(qiNames)
+        .ngroup()
+        .fillna(-1)
+        .to_numpy(int)
+    )
+    tableClassIds = classIds[:tableRowNum]
+    subsetClassIds = classIds[tableRowNum:]
+
+    numOfClasses = classIds.max(initial=-1) + 1
+    tableClassSizes = np.bincount(
+        tableClassIds[tableClassIds >= 0], minlength=numOfClasses
+    )
+    subsetClassSizes = np.bincount(
+        subsetClassIds[subsetClassIds >= 0], minlength=numOfClasses
+    )
+
+    tableRowOrder = np.argsort(tableClassIds, kind="stable")
+    tableClassStarts = np.searchsorted(
+        tableClassIds[tableRowOrder], np.arange(numOfClasses)
+    )
+
+    subsetClasses = np.flatnonzero(subsetClassSizes)
+    matchedSizes = np.minimum(
+        subsetClassSizes[subsetClasses], tableClassSizes[subsetClasses]
+    )
+    offsets = np.arange(matchedSizes.sum()) - np.repeat(
+        np.cumsum(matchedSizes) - matchedSizes, matchedSizes
+    )
+    positions = (
+        np.repeat(tableClassStarts[subsetClasses], matchedSizes) + offsets
+    )
+
+    return tableRowOrder[positions].tolist()
 
-        subsetIndices += np.flatnonzero(filter).tolist()[
-            : len(subsetGroupList)
-        ]
 
-    return subsetIndices
+def getSubsetIndices(
+    table: Data,
+    subset: Data,
+) -> List[int]:
+    return findSubsetIndices(
+        getDataFrame(table), getDataFrame(subset), getQiNames(table)
+    )
 
 
 def convertJavaListToList(javaList) -> Tuple:
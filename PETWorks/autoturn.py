@@ -1,24 +1,24 @@
-from dataclasses import asdict
-import itertools
+from dataclasses import asdict, dataclass
 import json
 import math
 from multiprocessing import Pool
 from os import PathLike
 import os
-from typing import Callable, Dict, Generator, List, Tuple, TypeVar
+from typing import Callable, Dict, List, Sequence, Set, Tuple, TypeVar
 
 import numpy as np
 import pandas as pd
 from PETWorks.arx import (
-    createJavaGateway,
+    Data,
+    Hierarchy,
     JavaApi,
+    createDataFromDataFrame,
     loadDataFromCsv,
     loadDataHierarchy,
-    loadDataHierarchyNatively,
-    applyAnonymousLevels,
     setDataHierarchies,
-    getDataFrame,
 )
+from PETWorks.generalization import Generalizer, readDataFrameFromCsv
+from PETWorks.hierarchy import loadCompiledHierarchies
 from PETWorks.report import toFile
 from PETWorks.report.iterator import generateConfigs
 from PETWorks.report.evaluator import filterWithKAnonymityParallelly, Metrics
@@ -26,85 +26,126 @@ from PETWorks.report.validator import isAnalysiable
 
 T = TypeVar("T")
 
+RESULT_FLUSH_INTERVAL = 100
+METRIC_NAMES = [
+    "k",
+    "d",
+    "t",
+    "l",
+    "profitability",
+    "ambiguity",
+    "precision",
+    "nonUniformEntropy",
+    "aecs",
+]
 
-def __sample(
-    data: List[T], count: int, dataSize: int = None
-) -> Generator[T, None, None]:
-    if dataSize is None:
-        dataSize = len(data)
 
-    step = (dataSize - 1) // (count - 1)
+def __sample(data: Sequence[T], count: int) -> List[T]:
+    step = max((len(data) - 1) // max(count - 1, 1), 1)
+    return [data[index] for index in range(0, len(data), step)[:count]]
 
-    steppedData = (
-        element for index, element in enumerate(data) if index % step == 0
-    )
-
-    yield from itertools.islice(steppedData, count)
-
-
-__javaApi = None
 
+__analysisFunction = None
+__worker = None
+
+
+@dataclass
+class _AutotuneWorker:
+    originalDataFile: PathLike
+    dataHierarchyFolder: PathLike
+    attributeTypes: Dict[str, str]
+    bias: float
+    originalDataFrame: pd.DataFrame
+    nativeDataHierarchy: Dict[str, np.chararray]
+    generalizer: Generalizer
+    javaApi: JavaApi = None
+    originalData: Data = None
+    dataHierarchy: Dict[str, Hierarchy] = None
+
+    def getOriginalData(self) -> Data:
+        if self.javaApi is None:
+            self.javaApi = JavaApi()
+            self.dataHierarchy = loadDataHierarchy(
+                self.dataHierarchyFolder,
+                self.javaApi.StandardCharsets.UTF_8,
+                ";",
+                self.javaApi,
+            )
+            self.originalData = loadDataFromCsv(
+                self.originalDataFile,
+                self.javaApi.StandardCharsets.UTF_8,
+                ";",
+                self.javaApi,
+            )
+            setDataHierarchies(
+                self.originalData,
+                self.dataHierarchy,
+                self.attributeTypes,
+                self.javaApi,
+            )
 
-def __setJavaApi():
-    global __javaApi
-    gateway = createJavaGateway()
-    __javaApi = JavaApi(gateway)
-
+        return self.originalData
 
-__analysisFunction = None
 
+def __initializeWorker(
+    originalDataFile: PathLike,
+    dataHierarchyFolder: PathLike,
+    attributeTypes: Dict[str, str],
+    bias: float,
+) -> None:
+    global __worker
+    originalDataFrame = readDataFrameFromCsv(originalDataFile, ";")
+    compiledHierarchies = loadCompiledHierarchies(dataHierarchyFolder, ";")
 
-def __findQualifiedConfigsImplement(argumentSets: List):
-    (
-        originalData,
-        dataHierarchy,
+    __worker = _AutotuneWorker(
+        originalDataFile,
+        dataHierarchyFolder,
         attributeTypes,
         bias,
-        k,
-        transformation,
-    ) = argumentSets
-
-    utf8 = __javaApi.StandardCharsets.UTF_8
-    dataHierarchyFolder = dataHierarchy
-    originalDataFile = originalData
-
-    originalData = loadDataFromCsv(originalDataFile, utf8, ";", __javaApi)
-    dataHierarchy = loadDataHierarchy(
-        dataHierarchyFolder, __javaApi.StandardCharsets.UTF_8, ";", __javaApi
+        originalDataFrame,
+        {
+            attributeName: hierarchy.values
+            for attributeName, hierarchy in compiledHierarchies.items()
+        },
+        Generalizer(originalDataFrame, compiledHierarchies, attributeTypes),
     )
 
-    setDataHierarchies(originalData, dataHierarchy, attributeTypes, __javaApi)
 
-    anonymizedData = applyAnonymousLevels(
-        originalData, transformation, dataHierarchy, attributeTypes, __javaApi
-    )
+def __findQualifiedConfigsImplement(argumentSet: Tuple) -> Dict:
+    k, transformation = argumentSet
 
-    originalDataFrame = getDataFrame(originalData)
-    anonymizedDataFrame = getDataFrame(anonymizedData)
-    if isAnalysiable(
-        originalDataFrame, anonymizedDataFrame, __analysisFunction, bias
+    anonymizedDataFrame = __worker.generalizer.apply(transformation)
+    if not isAnalysiable(
+        __worker.originalDataFrame,
+        anonymizedDataFrame,
+        __analysisFunction,
+        __worker.bias,
     ):
-        # Make a copy of the original data for ARX API to evaluate metrics.
-        originalData = loadDataFromCsv(originalDataFile, utf8, ";", __javaApi)
-        setDataHierarchies(
-            originalData, dataHierarchy, attributeTypes, __javaApi
-        )
-
-        nativeDataHierarchy = loadDataHierarchyNatively(
-            dataHierarchyFolder, ";"
-        )
+        return {}
 
-        metrics = Metrics.evaluate(
-            originalData,
-            anonymizedData,
-            k,
-            attributeTypes,
-            nativeDataHierarchy,
-        )
+    # Only analysable configs need ARX for the utility metrics.
+    originalData = __worker.getOriginalData()
+    anonymizedData = createDataFromDataFrame(
+        anonymizedDataFrame, __worker.javaApi
+    )
+    setDataHierarchies(
+        anonymizedData,
+        __worker.dataHierarchy,
+        __worker.attributeTypes,
+        __worker.javaApi,
+    )
 
-        return asdict(metrics)
+    metrics = Metrics.evaluate(
+        originalData,
+        anonymizedData,
+        k,
+        __worker.attributeTypes,
+        __worker.nativeDataHierarchy,
+        __worker.originalDataFrame,
+        anonymizedDataFrame,
+    )
 
-    return {}
+    return asdict(metrics)
 
 
 def __calculateFiveThresholds(values: List[float]) -> Tuple[float]:
@@ -146,10 +187,10 @@ def generateAnonymityConfigs(
     secondSampleCount: int,
 ) -> None:
     # Generate anonymity configs
-    total, configs = generateConfigs(originalData)
+    configs = generateConfigs(originalData)
 
     # First sampling
-    configs = list(__sample(configs, firstSampleCount, dataSize=total))
+    configs = configs.sample(firstSampleCount)
     print(f"Configs left after first sampling : {len(configs)}")
 
     # Filter by ARX API
@@ -160,7 +201,7 @@ def generateAnonymityConfigs(
     print(f"Configs left after filtering : {len(configs)}")
 
     # Second Sampling
-    configs = list(__sample(configs, secondSampleCount))
+    configs = __sample(configs, secondSampleCount)
 
     print(f"Configs left after second sampling : {len(configs)}")
 
@@ -168,6 +209,29 @@ def generateAnonymityConfigs(
     toFile(configs, output)
 
 
+def __resumeResults(output: PathLike) -> Set[int]:
+    completedIndices = set()
+    completedSize = 0
+
+    # Keep every complete record and drop a line cut off by a crash.
+    with open(output, "rb+") as file:
+        for line in file:
+            if not line.endswith(b"\n"):
+                break
+
+            try:
+                record = json.loads(line)
+            except ValueError:
+                break
+
+            completedIndices.add(record["index"])
+            completedSize += len(line)
+
+        file.truncate(completedSize)
+
+    return completedIndices
+
+
 def findQualifiedAnonymityConfigs(
     originalData: PathLike,
     dataHierarchy: PathLike,
@@ -176,7 +240,8 @@ def findQualifiedAnonymityConfigs(
     analysisFunction: Callable[[pd.DataFrame], float],
     bias: float,
     output: PathLike,
-    numOfProcess=(os.cpu_count() - 1),
+    numOfProcess=max(os.cpu_count() - 1, 1),
+    resume: bool = False,
 ) -> None:
     global __analysisFunction
     __analysisFunction = analysisFunction
@@ -186,85 +251,69 @@ def findQualifiedAnonymityConfigs(
             line.strip().split(",") for line in inFile.readlines()
         )
 
-        argumentSets = [
-            (
-                originalData,
-                dataHierarchy,
-                attributeTypes,
-                bias,
-                parameter[1],
-                [int(val) for val in parameter[2:]],
-            )
+        configs = [
+            {
+                "suppressionLimit": float(parameter[0]),
+                "k": int(parameter[1]),
+                "level": [int(val) for val in parameter[2:]],
+            }
             for parameter in rawParameters
         ]
 
-    with open(output, "w") as outFile:
-        pool = Pool(numOfProcess, initializer=__setJavaApi)
+    completedIndices = set()
+    if resume and os.path.exists(output):
+        completedIndices = __resumeResults(output)
+
+    pendingIndices = [
+        index for index in range(len(configs)) if index not in completedIndices
+    ]
+    argumentSets = [
+        (configs[index]["k"], configs[index]["level"])
+        for index in pendingIndices
+    ]
+
+    with open(output, "a" if resume else "w") as outFile, Pool(
+        numOfProcess,
+        initializer=__initializeWorker,
+        initargs=(originalData, dataHierarchy, attributeTypes, bias),
+    ) as pool:
         asyncResults = pool.imap(
             __findQualifiedConfigsImplement, argumentSets, chunksize=30
         )
 
-        for index, result in enumerate(asyncResults):
+        for count, (index, result) in enumerate(
+            zip(pendingIndices, asyncResults), start=1
+        ):
             if result:
-                representation = json.dumps(result, indent=4)
-
-                print(f"{index} - {representation}")
-                outFile.write(representation + "\n")
-
+                print(f"{index} - {json.dumps(result)}")
             else:
                 print(
                     f"{index} - No result "
                     "since the analysis target is not analyzable."
                 )
-                outFile.write(
-                    "No result since the analysis target is not analyzable.\n"
-                )
 
-            outFile.flush()
+            record = {
+                "index": index,
+                "config": configs[index],
+                "metrics": result or None,
+            }
+            outFile.write(json.dumps(record) + "\n")
+
+            if count % RESULT_FLUSH_INTERVAL == 0:
+                outFile.flush()
 
 
 def calculateThresholds(
     metricsMeasures: PathLike,
     output: PathLike,
 ) -> Dict[str, Tuple[float]]:
-    effectiveResults = {
-        "k": [],
-        "d": [],
-        "t": [],
-        "l": [],
-        "profitability": [],
-        "ambiguity": [],
-        "precision": [],
-        "nonUniformEntropy": [],
-        "aecs": [],
-    }
-
-    with open(metricsMeasures, "r") as file:
-        totalCount = 0
-        while True:
-            totalCount += 1
-            line = file.readline()
-
-            if line == "":
-                break
-
-            if line.startswith("{"):
-                buffer = ""
-
-                while not line.startswith("}"):
-                    buffer += line
-                    line = file.readline()
-
-                buffer += line
-                jsonObj = json.loads(buffer)
-
-                for metric, values in effectiveResults.items():
-                    values.append(jsonObj[metric])
+    results = pd.read_json(metricsMeasures, lines=True, dtype=False)
+    effectiveResults = pd.DataFrame(
+        results["metrics"].dropna().tolist(), columns=METRIC_NAMES
+    )
 
-    effectiveResults["k"] = [int(element) for element in effectiveResults["k"]]
-    effectiveResults["l"] = [
-        int(element) for element in effectiveResults["l"]
-    ]
+    effectiveResults["k"] = effectiveResults["k"].astype(int)
+    effectiveResults["l"] = effectiveResults["l"].astype(int)
 
     thresholds = {}
     for metric, values in effectiveResults.items():
@@ -0,0 +1,145 @@
+from os import PathLike
+from typing import Dict, Generator, Iterable, List
+
+import pandas as pd
+
+import PETWorks.dpresence as DPresence
+import PETWorks.kanonymity as KAnonymity
+import PETWorks.ldiversity as LDiversity
+import PETWorks.tcloseness as TCloseness
+from PETWorks.arx import (
+    Data,
+    Hierarchy,
+    JavaApi,
+    PrivacyModel,
+    anonymizeData,
+    getDataFrame,
+    javaApiSession,
+    loadDataFromCsv,
+    loadDataHierarchy,
+    setDataHierarchies,
+)
+
+SUPPORTED_TECHS = ["k-anonymity", "l-diversity", "t-closeness", "d-presence"]
+
+
+def __createPrivacyModels(
+    tech: str,
+    originalData: PathLike,
+    original: Data,
+    dataHierarchy: Dict[str, Hierarchy],
+    attributeTypes: Dict[str, str],
+    parameters: dict,
+    javaApi: JavaApi,
+) -> List[PrivacyModel]:
+    if tech == "k-anonymity":
+        return KAnonymity.createArxPrivacyModels(parameters["k"], javaApi)
+    elif tech == "l-diversity":
+        return LDiversity.createArxPrivacyModels(
+            attributeTypes, parameters["l"], javaApi
+        )
+    elif tech == "t-closeness":
+        return TCloseness.createArxPrivacyModels(
+            originalData,
+            dataHierarchy,
+            attributeTypes,
+            parameters["t"],
+            javaApi,
+        )
+    elif tech == "d-presence":
+        return DPresence.createArxPrivacyModels(
+            original,
+            parameters["dMin"],
+            parameters["dMax"],
+            parameters["subsetData"],
+            javaApi,
+        )
+
+
+def __anonymize(
+    originalData: PathLike,
+    dataHierarchy: PathLike,
+    attributeTypes: Dict[str, str],
+    maxSuppressionRate: float,
+    tech: str,
+    parameters: dict,
+) -> pd.DataFrame:
+    with javaApiSession() as javaApi:
+        original = loadDataFromCsv(
+            originalData, javaApi.StandardCharsets.UTF_8, ";", javaApi
+        )
+
+        dataHierarchy = loadDataHierarchy(
+            dataHierarchy, javaApi.StandardCharsets.UTF_8, ";", javaApi
+        )
+
+        setDataHierarchies(
+            original,
+            dataHierarchy,
+            attributeTypes,
+            javaApi,
+            tech in ["l-diversity", "t-closeness"],
+        )
+
+        anonymizedResult = anonymizeData(
+            original,
+            __createPrivacyModels(
+                tech,
+                originalData,
+                original,
+                dataHierarchy,
+                attributeTypes,
+                parameters,
+                javaApi,
+            ),
+            javaApi,
+            None,
+            float(parameters.get("maxSuppressionRate", maxSuppressionRate)),
+        )
+        anonymizedData = javaApi.Data.create(
+            anonymizedResult.getOutput(True).iterator()
+        )
+        return getDataFrame(anonymizedData)
+
+
+def __anonymizeInBatch(
+    originalData: PathLike,
+    dataHierarchy: PathLike,
+    attributeTypes: Dict[str, str],
+    maxSuppressionRate: float,
+    tech: str,
+    parameterSets: Iterable[dict],
+) -> Generator[pd.DataFrame, None, None]:
+    # A gateway is taken from the pool for each parameter set and given back
+    # before the result is yielded, so a consumer that stops iterating or
+    # anonymizes in between never waits on a gateway held by this generator.
+    for parameters in parameterSets:
+        yield __anonymize(
+            originalData,
+            dataHierarchy,
+            attributeTypes,
+            maxSuppressionRate,
+            tech,
+            parameters,
+        )
+
+
+def PETAnonymization(
+    originalData: PathLike,
+    dataHierarchy: PathLike,
+    attributeTypes: Dict[str, str],
+    maxSuppressionRate: float,
+    tech: str,
+    parameterSets: Iterable[dict],
+) -> Generator[pd.DataFrame, None, None]:
+    if tech not in SUPPORTED_TECHS:
+        raise ValueError(f"Unsupported tech: {tech}")
+
+    return __anonymizeInBatch(
+        originalData,
+        dataHierarchy,
+        attributeTypes,
+        maxSuppressionRate,
+        tech,
+        parameterSets,
+    )
@@ -1,18 +1,29 @@
-from typing import Dict
+from os import PathLike
+from typing import Dict, List
 
 import pandas as pd
 
 from PETWorks.arx import (
+    Data,
     JavaApi,
-    applyAnonymousLevels,
-    getAnonymousLevels,
+    PrivacyModel,
+    javaApiSession,
     getDataFrame,
+    getSubsetIndices,
     loadDataFromCsv,
     loadDataHierarchy,
     setDataHierarchies,
     anonymizeData,
 )
 from PETWorks.attributetypes import QUASI_IDENTIFIER
+from PETWorks.generalization import Generalizer, readDataFrameFromCsv
+from PETWorks.hierarchy import (
+    CompiledHierarchy,
+    findAnonymousLevels,
+    loadCompiledHierarchies,
+)
+from PETWorks.streaming import countClassSizes, readStrippedCsvInChunks
+from PETWorks.table import countSharedClasses
 
 
 def measureDPresence(
@@ -23,26 +34,51 @@ def measureDPresence(
     qiNames = [
         qi for qi, value in attributeTypes.items() if value == QUASI_IDENTIFIER
     ]
-    populationGroups = populationTable.groupby(qiNames).groups
-    sampleGroups = sampleTable.groupby(qiNames).groups
-
-    intersectionGroups = set(populationGroups.keys()).intersection(
-        set(sampleGroups.keys())
+    populationCounts, sampleCounts = countSharedClasses(
+        populationTable, sampleTable, qiNames
     )
 
-    rawValues = [
-        (
-            float(len(sampleGroups[intersectGroup])),
-            float(len(populationGroups[intersectGroup])),
-        )
-        for intersectGroup in intersectionGroups
-    ]
+    isShared = (populationCounts > 0) & (sampleCounts > 0)
+    deltaValues = sampleCounts[isShared] / populationCounts[isShared]
+
+    return deltaValues.tolist()
+
 
-    deltaValues = [
-        count / pCount for count, pCount in rawValues if pCount != 0
+def measureDPresenceInChunks(
+    original: PathLike,
+    sample: PathLike,
+    dataHierarchy: Dict[str, CompiledHierarchy],
+    attributeTypes: Dict[str, str],
+    chunkSize: int,
+) -> list[float]:
+    qiNames = [
+        qi for qi, value in attributeTypes.items() if value == QUASI_IDENTIFIER
     ]
+    (sampleCounts,) = countClassSizes(
+        readStrippedCsvInChunks(sample, ";", chunkSize), [qiNames]
+    )
+    sampleClasses = sampleCounts.index.to_frame(index=False)
+
+    # Without suppression every record is generalized on its own, so the
+    # population can be generalized one chunk at a time.
+    def generalize(chunks):
+        anonymousLevels = None
+        for chunk in chunks:
+            generalizer = Generalizer(chunk, dataHierarchy, attributeTypes)
+            if anonymousLevels is None:
+                anonymousLevels = findAnonymousLevels(
+                    sampleClasses, generalizer.qiNames, dataHierarchy
+                )
+            yield generalizer.apply(anonymousLevels)
+
+    (populationCounts,) = countClassSizes(
+        generalize(readStrippedCsvInChunks(original, ";", chunkSize)),
+        [qiNames],
+    )
 
-    return deltaValues
+    sharedClasses = sampleCounts.index.intersection(populationCounts.index)
+    deltaValues = sampleCounts[sharedClasses] / populationCounts[sharedClasses]
+    return deltaValues.tolist()
 
 
 def validateDPresence(
@@ -52,46 +88,59 @@ def validateDPresence(
 
 
 def PETValidation(
-    original, sample, _, dataHierarchy, attributeTypes, dMin, dMax
+    original,
+    sample,
+    _,
+    dataHierarchy,
+    attributeTypes,
+    dMin,
+    dMax,
+    chunkSize=None,
 ):
-    javaApi = JavaApi()
-    dataHierarchy = loadDataHierarchy(
-        dataHierarchy, javaApi.StandardCharsets.UTF_8, ";", javaApi
-    )
-    originalPopulationData = loadDataFromCsv(
-        original, javaApi.StandardCharsets.UTF_8, ";", javaApi
-    )
-    anonymizedSampleData = loadDataFromCsv(
-        sample, javaApi.StandardCharsets.UTF_8, ";", javaApi
-    )
+    dataHierarchy = loadCompiledHierarchies(dataHierarchy, ";")
 
-    setDataHierarchies(
-        originalPopulationData, dataHierarchy, attributeTypes, javaApi
-    )
-    setDataHierarchies(
-        anonymizedSampleData, dataHierarchy, attributeTypes, javaApi
-    )
-
-    anonymousLevels = getAnonymousLevels(anonymizedSampleData, dataHierarchy)
-    anonymizedPopulation = applyAnonymousLevels(
-        originalPopulationData,
-        anonymousLevels,
-        dataHierarchy,
-        attributeTypes,
-        javaApi,
-    )
+    if chunkSize:
+        deltaValues = measureDPresenceInChunks(
+            original, sample, dataHierarchy, attributeTypes, chunkSize
+        )
+    else:
+        originalPopulationData = readDataFrameFromCsv(original, ";")
+        anonymizedSampleData = readDataFrameFromCsv(sample, ";")
 
-    populationDataFrame = getDataFrame(anonymizedPopulation)
-    sampleDataFrame = getDataFrame(anonymizedSampleData)
+        generalizer = Generalizer(
+            originalPopulationData, dataHierarchy, attributeTypes
+        )
+        anonymousLevels = findAnonymousLevels(
+            anonymizedSampleData, generalizer.qiNames, dataHierarchy
+        )
+        anonymizedPopulation = generalizer.apply(anonymousLevels)
 
-    deltaValues = measureDPresence(
-        populationDataFrame, sampleDataFrame, attributeTypes
-    )
+        deltaValues = measureDPresence(
+            anonymizedPopulation, anonymizedSampleData, attributeTypes
+        )
     fulfillDPresence = validateDPresence(deltaValues, float(dMin), float(dMax))
 
     return {"dMin": dMin, "dMax": dMax, "d-presence": fulfillDPresence}
 
 
+def createArxPrivacyModels(
+    original: Data,
+    dMin: float,
+    dMax: float,
+    subsetData: PathLike,
+    javaApi: JavaApi,
+) -> List[PrivacyModel]:
+    subset = loadDataFromCsv(
+        subsetData, javaApi.StandardCharsets.UTF_8, ";", javaApi
+    )
+    subsetIndices = javaApi.HashSet()
+    for index in getSubsetIndices(original, subset):
+        subsetIndices.add(index)
+
+    dataSubset = javaApi.DataSubset.create(original, subsetIndices)
+    return [javaApi.DPresence(dMin, dMax, dataSubset)]
+
+
 def PETAnonymization(
     originalData: str,
     dataHierarchy: str,
@@ -101,31 +150,29 @@ def PETAnonymization(
     dMax: float,
     subsetData: str,
 ) -> pd.DataFrame:
-    javaApi = JavaApi()
-
-    originalData = loadDataFromCsv(
-        originalData, javaApi.StandardCharsets.UTF_8, ";", javaApi
-    )
-
-    dataHierarchy = loadDataHierarchy(
-        dataHierarchy, javaApi.StandardCharsets.UTF_8, ";", javaApi
-    )
+    with javaApiSession() as javaApi:
+        originalData = loadDataFromCsv(
+            originalData, javaApi.StandardCharsets.UTF_8, ";", javaApi
+        )
 
-    subsetData = loadDataFromCsv(
-        subsetData, javaApi.StandardCharsets.UTF_8, ";", javaApi
-    )
+        dataHierarchy = loadDataHierarchy(
+            dataHierarchy, javaApi.StandardCharsets.UTF_8, ";", javaApi
+        )
 
-    setDataHierarchies(originalData, dataHierarchy, attributeTypes, javaApi)
-    dataSubset = javaApi.DataSubset.create(originalData, subsetData)
+        setDataHierarchies(
+            originalData, dataHierarchy, attributeTypes, javaApi
+        )
 
-    anonymizedResult = anonymizeData(
-        originalData,
-        [javaApi.DPresence(dMin, dMax, dataSubset)],
-        javaApi,
-        None,
-        float(maxSuppressionRate),
-    )
-    anonymizedData = javaApi.Data.create(
-        anonymizedResult.getOutput(True).iterator()
-    )
-    return getDataFrame(anonymizedData)
+        anonymizedResult = anonymizeData(
+            originalData,
+            createArxPrivacyModels(
+                originalData, dMin, dMax, subsetData, javaApi
+            ),
+            javaApi,
+            None,
+            float(maxSuppressionRate),
+        )
+        anonymizedData = javaApi.Data.create(
+            anonymizedResult.getOutput(True).iterator()
+        )
+        return getDataFrame(anonymizedData)
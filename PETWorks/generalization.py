@@ -0,0 +1,181 @@
+from math import floor
+from os import PathLike
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from PETWorks.attributetypes import IDENTIFIER, QUASI_IDENTIFIER
+from PETWorks.hierarchy import SUPPRESSED_VALUE, CompiledHierarchy
+from PETWorks.table import (
+    EncodedTable,
+    isDatasetCacheEnabled,
+    loadCachedTable,
+)
+
+MAX_PACKED_KEY = 1 << 62
+MAX_BINCOUNT_KEYS = 1 << 18
+
+
+def __readTrimmedCsv(path: PathLike, delimiter: str) -> pd.DataFrame:
+    # Match ARX, which trims the header and every value it reads.
+    dataFrame = pd.read_csv(path, sep=delimiter, dtype=str, na_filter=False)
+    dataFrame.columns = dataFrame.columns.str.strip()
+    return dataFrame.apply(lambda column: column.str.strip())
+
+
+def readDataFrameFromCsv(
+    path: PathLike, delimiter: str, cache: bool = None
+) -> pd.DataFrame:
+    if cache is None:
+        cache = isDatasetCacheEnabled()
+    if cache:
+        return readEncodedTableFromCsv(path, delimiter, True).toDataFrame()
+    return __readTrimmedCsv(path, delimiter)
+
+
+def readEncodedTableFromCsv(
+    path: PathLike, delimiter: str, cache: bool = None
+) -> EncodedTable:
+    if cache is None:
+        cache = isDatasetCacheEnabled()
+    if cache:
+        return loadCachedTable(
+            path,
+            {"delimiter": delimiter, "trimmed": True},
+            lambda: __readTrimmedCsv(path, delimiter),
+        )
+    return EncodedTable.fromDataFrame(__readTrimmedCsv(path, delimiter))
+
+
+class Generalizer:
+    def __init__(
+        self,
+        originalData: pd.DataFrame,
+        hierarchies: Dict[str, CompiledHierarchy],
+        attributeTypes: Dict[str, str],
+    ):
+        self.originalData = originalData
+        self.hierarchies = hierarchies
+        self.attributeTypes = attributeTypes
+        # Level vectors follow the column order of the data, like ARX.
+        self.qiNames = sorted(
+            (
+                attributeName
+                for attributeName, attributeType in attributeTypes.items()
+                if attributeType == QUASI_IDENTIFIER
+            ),
+            key=originalData.columns.get_loc,
+        )
+
+        self.leafIds = {}
+        for qiName in self.qiNames:
+            leafIds = (
+                originalData[qiName]
+                .map(hierarchies[qiName].leafIds)
+                .to_numpy()
+            )
+            if pd.isna(leafIds).any():
+                raise ValueError(
+                    f"Values of {qiName} are missing from its hierarchy"
+                )
+            self.leafIds[qiName] = leafIds.astype(np.int64)
+
+        # Per-level codes of every row, so a level vector only gathers rows.
+        self.rowCodes = {
+            qiName: np.ascontiguousarray(
+                hierarchies[qiName].levelCodes[self.leafIds[qiName]].T
+            )
+            for qiName in self.qiNames
+        }
+
+    def __getClassKeys(self, levels: List[int]) -> Tuple[np.ndarray, int]:
+        classKeys = np.zeros(len(self.originalData), dtype=np.int64)
+        numOfKeys = 1
+        for qiName, level in zip(self.qiNames, levels):
+            numOfValues = len(self.hierarchies[qiName].levelValues[level])
+
+            if numOfKeys * numOfValues > MAX_PACKED_KEY:
+                _, classKeys = np.unique(classKeys, return_inverse=True)
+                classKeys = classKeys.reshape(-1)
+                numOfKeys = int(classKeys.max(initial=0)) + 1
+
+            numOfKeys *= numOfValues
+            classKeys *= numOfValues
+            classKeys += self.rowCodes[qiName][level]
+
+        return classKeys, numOfKeys
+
+    def getClassSizes(
+        self, levels: List[int]
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        classKeys, numOfKeys = self.__getClassKeys(levels)
+        if numOfKeys > MAX_BINCOUNT_KEYS:
+            _, classIds, classSizes = np.unique(
+                classKeys, return_inverse=True, return_counts=True
+            )
+            return classIds.reshape(-1), classSizes
+
+        # Ids follow the order of the keys, as np.unique numbers them.
+        keySizes = np.bincount(classKeys, minlength=numOfKeys)
+        isPresent = keySizes > 0
+        classIds = np.cumsum(isPresent) - 1
+        return classIds[classKeys], keySizes[isPresent]
+
+    def countClassSizes(self, levels: List[int]) -> np.ndarray:
+        classKeys, numOfKeys = self.__getClassKeys(levels)
+        if numOfKeys > MAX_BINCOUNT_KEYS:
+            return np.unique(classKeys, return_counts=True)[1]
+
+        classSizes = np.bincount(classKeys, minlength=numOfKeys)
+        return classSizes[classSizes > 0]
+
+    def getOutliers(
+        self, levels: List[int], k: int, suppressionLimit: float
+    ) -> Optional[np.ndarray]:
+        classIds, classSizes = self.getClassSizes(levels)
+        isOutlier = classSizes[classIds] < k
+
+        # ARX rounds the number of suppressible records down.
+        if isOutlier.sum() > floor(suppressionLimit * len(isOutlier)):
+            return None
+
+        return isOutlier
+
+    def apply(
+        self, levels: List[int], k: int = 1, suppressionLimit: float = 0.0
+    ) -> Optional[pd.DataFrame]:
+        isOutlier = self.getOutliers(levels, k, suppressionLimit)
+        if isOutlier is None:
+            return None
+
+        return self.generalize(levels, isOutlier)
+
+    def generalize(
+        self, levels: List[int], isOutlier: np.ndarray
+    ) -> pd.DataFrame:
+        generalizedData = self.originalData.copy()
+        for qiName, level in zip(self.qiNames, levels):
+            hierarchy = self.hierarchies[qiName]
+            generalizedValues = hierarchy.values[self.leafIds[qiName], level]
+            generalizedValues[isOutlier] = SUPPRESSED_VALUE
+            generalizedData[qiName] = generalizedValues
+
+        for attributeName, attributeType in self.attributeTypes.items():
+            if attributeType == IDENTIFIER:
+                generalizedData[attributeName] = SUPPRESSED_VALUE
+
+        return generalizedData
+
+
+def applyAnonymousLevelsNatively(
+    originalData: pd.DataFrame,
+    anonymousLevels: List[int],
+    hierarchies: Dict[str, CompiledHierarchy],
+    attributeTypes: Dict[str, str],
+    k: int = 1,
+    suppressionLimit: float = 0.0,
+) -> Optional[pd.DataFrame]:
+    return Generalizer(originalData, hierarchies, attributeTypes).apply(
+        anonymousLevels, k, suppressionLimit
+    )
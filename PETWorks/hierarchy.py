@@ -0,0 +1,182 @@
+from dataclasses import dataclass
+from os import PathLike, listdir, stat
+from os.path import abspath, join
+import re
+from threading import Lock
+from typing import Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+HIERARCHY_FILE_PATTERN = re.compile(r".*hierarchy_(.*?)\.csv")
+SUPPRESSED_VALUE = "*"
+
+
+@dataclass
+class CompiledHierarchy:
+    values: np.ndarray
+    leafIds: Dict[str, int]
+    levelCodes: np.ndarray
+    levelValues: List[np.ndarray]
+    levelMasks: Dict[str, int]
+
+    @property
+    def height(self) -> int:
+        return self.values.shape[1]
+
+
+@dataclass
+class _HierarchyCacheEntry:
+    directoryMtime: int
+    fileMtimes: Dict[str, Tuple[PathLike, int]]
+    hierarchies: Dict[str, CompiledHierarchy]
+
+
+__hierarchyCache: Dict[Tuple[str, str], _HierarchyCacheEntry] = {}
+__hierarchyCacheLock = Lock()
+
+
+def compileHierarchy(values: np.ndarray) -> CompiledHierarchy:
+    values = np.char.strip(np.asarray(values, dtype=str))
+    if values.ndim == 1:
+        values = values.reshape(-1, 1)
+
+    levelValues = []
+    levelCodes = np.empty(values.shape, dtype=np.int64)
+    levelMasks = {}
+    for level in range(values.shape[1]):
+        uniqueValues, codes = np.unique(values[:, level], return_inverse=True)
+        levelValues.append(uniqueValues)
+        levelCodes[:, level] = codes.reshape(-1)
+
+        for value in uniqueValues.tolist():
+            levelMasks[value] = levelMasks.get(value, 0) | (1 << level)
+
+    leafIds = {}
+    for leafId, leaf in enumerate(values[:, 0].tolist()):
+        leafIds.setdefault(leaf, leafId)
+
+    return CompiledHierarchy(
+        values, leafIds, levelCodes, levelValues, levelMasks
+    )
+
+
+def findAnonymousLevel(hierarchy: CompiledHierarchy, values: pd.Series) -> int:
+    uniqueValues = pd.unique(values)
+    levelMasks = np.array(
+        [hierarchy.levelMasks.get(value, 0) for value in uniqueValues],
+        dtype=np.int64,
+    )
+    commonLevelMask = int(
+        np.bitwise_and.reduce(levelMasks, initial=(1 << hierarchy.height) - 1)
+    )
+
+    if commonLevelMask == 0:
+        raise ValueError(
+            f"No single hierarchy level covers the values of {values.name}"
+        )
+
+    return (commonLevelMask & -commonLevelMask).bit_length() - 1
+
+
+def findAnonymousLevels(
+    anonymizedData: pd.DataFrame,
+    qiNames: List[str],
+    hierarchies: Dict[str, CompiledHierarchy],
+) -> List[int]:
+    isSuppressed = (anonymizedData[qiNames] == SUPPRESSED_VALUE).all(axis=1)
+    generalizedData = anonymizedData.loc[~isSuppressed, qiNames]
+
+    if generalizedData.empty:
+        return [hierarchies[qiName].height - 1 for qiName in qiNames]
+
+    return [
+        findAnonymousLevel(hierarchies[qiName], generalizedData[qiName])
+        for qiName in qiNames
+    ]
+
+
+def findHierarchyFiles(path: PathLike) -> Dict[str, PathLike]:
+    hierarchyFiles = {}
+    for filename in listdir(path):
+        result = HIERARCHY_FILE_PATTERN.match(filename)
+        if result is None:
+            continue
+
+        hierarchyFiles[result.group(1)] = join(path, filename)
+
+    return hierarchyFiles
+
+
+def __readHierarchyFile(path: PathLike, delimiter: str) -> np.ndarray:
+    return pd.read_csv(
+        path, sep=delimiter, header=None, dtype=str, na_filter=False
+    ).to_numpy(dtype=str)
+
+
+def __isCacheEntryValid(entry: _HierarchyCacheEntry, path: str) -> bool:
+    if stat(path).st_mtime_ns != entry.directoryMtime:
+        return False
+
+    try:
+        return all(
+            stat(hierarchyFile).st_mtime_ns == mtime
+            for hierarchyFile, mtime in entry.fileMtimes.values()
+        )
+    except FileNotFoundError:
+        return False
+
+
+def loadCompiledHierarchies(
+    path: PathLike, delimiter: str
+) -> Dict[str, CompiledHierarchy]:
+    path = abspath(path)
+    key = (path, delimiter)
+
+    with __hierarchyCacheLock:
+        entry = __hierarchyCache.get(key)
+        if entry is not None and __isCacheEntryValid(entry, path):
+            return dict(entry.hierarchies)
+
+        directoryMtime = stat(path).st_mtime_ns
+        fileMtimes = {}
+        hierarchies = {}
+        for attributeName, hierarchyFile in findHierarchyFiles(path).items():
+            fileMtimes[attributeName] = (
+                hierarchyFile,
+                stat(hierarchyFile).st_mtime_ns,
+            )
+            hierarchies[attributeName] = compileHierarchy(
+                __readHierarchyFile(hierarchyFile, delimiter)
+            )
+
+        __hierarchyCache[key] = _HierarchyCacheEntry(
+            directoryMtime, fileMtimes, hierarchies
+        )
+        return dict(hierarchies)
+
+
+def getHierarchySignature(
+    path: PathLike, delimiter: str
+) -> Tuple[str, str, int, Tuple[Tuple[str, PathLike, int], ...]]:
+    path = abspath(path)
+    loadCompiledHierarchies(path, delimiter)
+
+    with __hierarchyCacheLock:
+        entry = __hierarchyCache[(path, delimiter)]
+        return (
+            path,
+            delimiter,
+            entry.directoryMtime,
+            tuple(
+                (attributeName, hierarchyFile, mtime)
+                for attributeName, (hierarchyFile, mtime) in sorted(
+                    entry.fileMtimes.items()
+                )
+            ),
+        )
+
+
+def clearHierarchyCache() -> None:
+    with __hierarchyCacheLock:
+        __hierarchyCache.clear()
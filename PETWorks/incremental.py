@@ -0,0 +1,226 @@
+import json
+from collections import Counter
+from dataclasses import dataclass
+from os import PathLike
+from os.path import exists
+from typing import Dict, List, Optional, Set, Tuple
+
+import pandas as pd
+
+from PETWorks.arx import getAttributeNameByType
+from PETWorks.attributetypes import QUASI_IDENTIFIER
+from PETWorks.ldiversity import getLDiversityGroupings
+from PETWorks.table import readCsv
+
+ClassKey = Tuple
+
+
+@dataclass
+class ValidationUpdate:
+    k: int
+    l: Optional[int]
+    fulfillKAnonymity: bool
+    fulfillLDiversity: bool
+    kChangedClasses: Dict[ClassKey, bool]
+    lChangedClasses: Dict[str, Dict[ClassKey, bool]]
+
+
+def _toClassKey(key) -> ClassKey:
+    return key if isinstance(key, tuple) else (key,)
+
+
+def _replaceInHistogram(
+    histogram: Counter, oldValue: Optional[int], newValue: int
+) -> None:
+    if oldValue is not None:
+        histogram[oldValue] -= 1
+        if histogram[oldValue] == 0:
+            del histogram[oldValue]
+    histogram[newValue] += 1
+
+
+class IncrementalValidation:
+    def __init__(self, attributeTypes: Dict[str, str], k: int, l: int):
+        self.attributeTypes = attributeTypes
+        self.k = k
+        self.l = l
+        self.qiNames = getAttributeNameByType(attributeTypes, QUASI_IDENTIFIER)
+        self.groupings = getLDiversityGroupings(attributeTypes)
+
+        # Records whose QIs are all suppressed are left out of k, as in
+        # kanonymity.PETValidation.
+        self.classSizes: Dict[ClassKey, int] = {}
+        self.distinctValues: Dict[str, Dict[ClassKey, Set]] = {
+            sensitiveAttribute: {} for _, sensitiveAttribute in self.groupings
+        }
+
+        # Histograms of the class statistics give k and l without a scan.
+        self.__sizeHistogram = Counter()
+        self.__distinctHistograms = {
+            sensitiveAttribute: Counter()
+            for _, sensitiveAttribute in self.groupings
+        }
+
+    def __updateClassSizes(
+        self, newRows: pd.DataFrame
+    ) -> Dict[ClassKey, bool]:
+        isSuppressed = (newRows[self.qiNames] == "*").all(axis=1)
+        newClassSizes = newRows[~isSuppressed].groupby(self.qiNames).size()
+
+        changedClasses = {}
+        for key, size in zip(
+            newClassSizes.index.tolist(), newClassSizes.tolist()
+        ):
+            key = _toClassKey(key)
+            oldSize = self.classSizes.get(key)
+            newSize = (oldSize or 0) + size
+
+            self.classSizes[key] = newSize
+            _replaceInHistogram(self.__sizeHistogram, oldSize, newSize)
+
+            if oldSize is None or (oldSize >= self.k) != (newSize >= self.k):
+                changedClasses[key] = newSize >= self.k
+
+        return changedClasses
+
+    def __updateDistinctValues(
+        self, newRows: pd.DataFrame, columns: List[str], sensitiveAttribute
+    ) -> Dict[ClassKey, bool]:
+        distinctValues = self.distinctValues[sensitiveAttribute]
+        histogram = self.__distinctHistograms[sensitiveAttribute]
+
+        # Rows with a missing class value belong to no class, like groupby.
+        pairs = newRows[columns + [sensitiveAttribute]]
+        pairs = pairs[pairs[columns].notna().all(axis=1)].drop_duplicates()
+
+        oldCounts = {}
+        for pair in pairs.itertuples(index=False):
+            key = tuple(pair[:-1])
+            if key not in oldCounts:
+                values = distinctValues.get(key)
+                oldCounts[key] = None if values is None else len(values)
+                distinctValues.setdefault(key, set())
+
+            if pd.notna(pair[-1]):
+                distinctValues[key].add(pair[-1])
+
+        changedClasses = {}
+        for key, oldCount in oldCounts.items():
+            newCount = len(distinctValues[key])
+            if oldCount != newCount:
+                _replaceInHistogram(histogram, oldCount, newCount)
+
+            if oldCount is None or (oldCount >= self.l) != (
+                newCount >= self.l
+            ):
+                changedClasses[key] = newCount >= self.l
+
+        return changedClasses
+
+    def update(self, newRows: pd.DataFrame) -> ValidationUpdate:
+        kChangedClasses = self.__updateClassSizes(newRows)
+        lChangedClasses = {
+            sensitiveAttribute: self.__updateDistinctValues(
+                newRows, columns, sensitiveAttribute
+            )
+            for columns, sensitiveAttribute in self.groupings
+        }
+
+        k = min(self.__sizeHistogram, default=0)
+        lValues = [
+            lValue
+            for histogram in self.__distinctHistograms.values()
+            for lValue in histogram
+        ]
+        l = min(lValues, default=None)
+
+        return ValidationUpdate(
+            k=k,
+            l=l,
+            fulfillKAnonymity=k >= self.k,
+            fulfillLDiversity=l is None or l >= self.l,
+            kChangedClasses=kChangedClasses,
+            lChangedClasses=lChangedClasses,
+        )
+
+    def save(self, path: PathLike) -> None:
+        state = {
+            "attributeTypes": self.attributeTypes,
+            "k": self.k,
+            "l": self.l,
+            "classSizes": [
+                [list(key), size] for key, size in self.classSizes.items()
+            ],
+            "distinctValues": {
+                sensitiveAttribute: [
+                    [list(key), sorted(values, key=str)]
+                    for key, values in distinctValues.items()
+                ]
+                for sensitiveAttribute, distinctValues in (
+                    self.distinctValues.items()
+                )
+            },
+        }
+        with open(path, "w") as file:
+            json.dump(state, file)
+
+    @staticmethod
+    def load(path: PathLike) -> "IncrementalValidation":
+        with open(path) as file:
+            state = json.load(file)
+
+        validation = IncrementalValidation(
+            state["attributeTypes"], state["k"], state["l"]
+        )
+        for key, size in state["classSizes"]:
+            validation.classSizes[tuple(key)] = size
+            validation.__sizeHistogram[size] += 1
+
+        histograms = validation.__distinctHistograms
+        for sensitiveAttribute, histogram in histograms.items():
+            classValues = validation.distinctValues[sensitiveAttribute]
+            for key, values in state["distinctValues"][sensitiveAttribute]:
+                classValues[tuple(key)] = set(values)
+                histogram[len(values)] += 1
+
+        return validation
+
+
+def _describeChanges(changedClasses: Dict[ClassKey, bool]) -> List[dict]:
+    return [
+        {"class": list(key), "fulfill": fulfill}
+        for key, fulfill in changedClasses.items()
+    ]
+
+
+def PETValidation(state, appended, _, attributeTypes, k, l):
+    if exists(state):
+        validation = IncrementalValidation.load(state)
+        if validation.attributeTypes != attributeTypes:
+            raise ValueError(
+                f"{state} was built for different attribute types"
+            )
+        validation.k, validation.l = k, l
+    else:
+        validation = IncrementalValidation(attributeTypes, k, l)
+
+    update = validation.update(
+        readCsv(appended, ";", dtype=str, skipinitialspace=True)
+    )
+    validation.save(state)
+
+    return {
+        "k": k,
+        "fulfill k-anonymity": update.fulfillKAnonymity,
+        "l": l,
+        "fulfill l-diversity": update.fulfillLDiversity,
+        "changed classes": {
+            "k-anonymity": _describeChanges(update.kChangedClasses),
+            "l-diversity": {
+                sensitiveAttribute: _describeChanges(changedClasses)
+                for sensitiveAttribute, changedClasses in (
+                    update.lChangedClasses.items()
+                )
+            },
+        },
+    }
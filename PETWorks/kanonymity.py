@@ -1,6 +1,8 @@
 from PETWorks.arx import (
-    getAttributeNameByType,
     JavaApi,
+    PrivacyModel,
+    getAttributeNameByType,
+    javaApiSession,
     anonymizeData,
     getDataFrame,
     loadDataFromCsv,
@@ -8,58 +10,116 @@ from PETWorks.arx import (
     setDataHierarchies,
 )
 from PETWorks.attributetypes import QUASI_IDENTIFIER
+from PETWorks.lattice import (
+    ClassAggregates,
+    PrivacyCriterion,
+    anonymizeNatively,
+)
+from PETWorks.streaming import countClassSizes, readCsvInChunks
+from PETWorks.table import EncodedTable, asEncodedTable
+import numpy as np
 import pandas as pd
-from typing import Dict
+from os import PathLike
+from typing import Dict, List, Union
 
 
-def _measureKAnonymity(anonymized: pd.DataFrame, qiNames: list[str]) -> int:
-    suppressedValues = ["*"] * len(qiNames)
-    anonymized = anonymized.loc[
-        ~anonymized[qiNames].isin(suppressedValues).all(axis=1)
-    ]
-    return anonymized.groupby(qiNames).count().min().min()
+def measureKAnonymity(
+    anonymized: Union[pd.DataFrame, EncodedTable], qiNames: list[str]
+) -> int:
+    anonymized = asEncodedTable(anonymized)
+    classIds, _ = anonymized.getClassIds(qiNames)
 
+    isCounted = (classIds >= 0) & ~anonymized.isSuppressed(qiNames)
+    classSizes = np.bincount(classIds[isCounted])
+    return classSizes[classSizes > 0].min()
 
-def _validateKAnonymity(kValue: int, k: int) -> bool:
+
+def _measureKAnonymityInChunks(
+    anonymized: PathLike, qiNames: list[str], chunkSize: int
+) -> int:
+    chunks = (
+        chunk[~(chunk[qiNames] == "*").all(axis=1)]
+        for chunk in readCsvInChunks(
+            anonymized, ";", chunkSize, skipinitialspace=True
+        )
+    )
+    (classSizes,) = countClassSizes(chunks, [qiNames])
+    return classSizes.min()
+
+
+def validateKAnonymity(kValue: int, k: int) -> bool:
     return k <= kValue
 
 
-def PETValidation(foo, anonymized, bar, attributeTypes, k):
-    anonymized = pd.read_csv(anonymized, sep=";", skipinitialspace=True)
+def PETValidation(foo, anonymized, bar, attributeTypes, k, chunkSize=None):
     qiNames = list(getAttributeNameByType(attributeTypes, QUASI_IDENTIFIER))
 
-    kValue = int(_measureKAnonymity(anonymized, qiNames))
-    fulFillKAnonymity = _validateKAnonymity(kValue, k)
+    if chunkSize:
+        kValue = int(
+            _measureKAnonymityInChunks(anonymized, qiNames, chunkSize)
+        )
+    else:
+        anonymized = EncodedTable.fromCsv(
+            anonymized, ";", skipinitialspace=True
+        )
+        kValue = int(measureKAnonymity(anonymized, qiNames))
+    fulFillKAnonymity = validateKAnonymity(kValue, k)
 
     return {"k": k, "fulfill k-anonymity": fulFillKAnonymity}
 
 
+class KAnonymityCriterion(PrivacyCriterion):
+    def __init__(self, k: int):
+        self.k = k
+
+    def findViolatingClasses(self, aggregates: ClassAggregates) -> np.ndarray:
+        return aggregates.classSizes < self.k
+
+
+def createArxPrivacyModels(k: int, javaApi: JavaApi) -> List[PrivacyModel]:
+    return [javaApi.KAnonymity(k)]
+
+
 def PETAnonymization(
     originalData: str,
     dataHierarchy: str,
     attributeTypes: Dict[str, str],
     maxSuppressionRate: float,
     k: int,
+    engine: str = "arx",
 ) -> pd.DataFrame:
-    javaApi = JavaApi()
-    originalData = loadDataFromCsv(
-        originalData, javaApi.StandardCharsets.UTF_8, ";", javaApi
-    )
+    if engine == "native":
+        return anonymizeNatively(
+            originalData,
+            dataHierarchy,
+            attributeTypes,
+            float(maxSuppressionRate),
+            lambda _: [KAnonymityCriterion(k)],
+        )
+    if engine != "arx":
+        raise ValueError(f"Unsupported engine: {engine}")
 
-    dataHierarchy = loadDataHierarchy(
-        dataHierarchy, javaApi.StandardCharsets.UTF_8, ";", javaApi
-    )
+    with javaApiSession() as javaApi:
+        originalData = loadDataFromCsv(
+            originalData, javaApi.StandardCharsets.UTF_8, ";", javaApi
+        )
 
-    setDataHierarchies(originalData, dataHierarchy, attributeTypes, javaApi)
+        dataHierarchy = loadDataHierarchy(
+            dataHierarchy, javaApi.StandardCharsets.UTF_8, ";", javaApi
+        )
 
-    anonymizedResult = anonymizeData(
-        originalData,
-        [javaApi.KAnonymity(k)],
-        javaApi,
-        None,
-        float(maxSuppressionRate),
-    )
-    anonymizedData = javaApi.Data.create(
-        anonymizedResult.getOutput(True).iterator()
-    )
-    return getDataFrame(anonymizedData)
+        setDataHierarchies(
+            originalData, dataHierarchy, attributeTypes, javaApi
+        )
+
+        anonymizedResult = anonymizeData(
+            originalData,
+            createArxPrivacyModels(k, javaApi),
+            javaApi,
+            None,
+            float(maxSuppressionRate),
+        )
+        anonymizedData = javaApi.Data.create(
+            anonymizedResult.getOutput(True).iterator()
+        )
+        return getDataFrame(anonymizedData)
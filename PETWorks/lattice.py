@@ -0,0 +1,344 @@
+from abc import ABC, abstractmethod
+from math import floor
+from os import PathLike
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from PETWorks.generalization import Generalizer, readDataFrameFromCsv
+from PETWorks.hierarchy import loadCompiledHierarchies
+
+UNBOUNDED_K = np.iinfo(np.int64).max
+
+
+class Lattice:
+    def __init__(self, heights: List[int]):
+        self.heights = heights
+        self.nodes = np.indices(heights).reshape(len(heights), -1).T
+
+        # Node ids are row-major, so a successor is one stride away.
+        self.strides = [
+            int(np.prod(heights[dimension + 1 :], dtype=np.int64))
+            for dimension in range(len(heights))
+        ]
+
+        levelSums = self.nodes.sum(axis=1)
+        self.order = np.argsort(levelSums, kind="stable")
+        self.levelStarts = np.searchsorted(
+            levelSums[self.order], np.arange(sum(heights) - len(heights) + 2)
+        )
+
+    def __len__(self) -> int:
+        return len(self.nodes)
+
+    def iterateLevels(self):
+        for start, end in zip(self.levelStarts[:-1], self.levelStarts[1:]):
+            yield self.order[start:end]
+
+
+def getMaxKValues(
+    classSizes: np.ndarray, suppressionLimits: np.ndarray
+) -> np.ndarray:
+    sortedSizes = np.sort(classSizes)
+    outliers = np.concatenate(([0], np.cumsum(sortedSizes)))
+
+    # The smallest classes are suppressed first. A node stays k-anonymous
+    # while every class smaller than k fits into the suppression limit.
+    numOfSuppressed = np.searchsorted(outliers, suppressionLimits, "right") - 1
+    isFullySuppressed = numOfSuppressed >= len(sortedSizes)
+    return np.where(
+        isFullySuppressed,
+        UNBOUNDED_K,
+        sortedSizes[np.minimum(numOfSuppressed, len(sortedSizes) - 1)],
+    )
+
+
+def searchMaxKValues(
+    generalizer: Generalizer,
+    lattice: Lattice,
+    suppressionLimits: np.ndarray,
+    requiredKValues: np.ndarray,
+) -> np.ndarray:
+    maxKValues = np.zeros((len(lattice), len(suppressionLimits)), np.int64)
+
+    for nodeIds in lattice.iterateLevels():
+        # Nodes whose predecessors already satisfy every required k are
+        # k-anonymous by monotonicity and are not evaluated.
+        needsCheck = (maxKValues[nodeIds] < requiredKValues).any(axis=1)
+        for nodeId in nodeIds[needsCheck]:
+            classSizes = generalizer.countClassSizes(lattice.nodes[nodeId])
+            maxKValues[nodeId] = getMaxKValues(classSizes, suppressionLimits)
+
+        for dimension, stride in enumerate(lattice.strides):
+            hasSuccessor = (
+                lattice.nodes[nodeIds, dimension]
+                < lattice.heights[dimension] - 1
+            )
+            predecessorIds = nodeIds[hasSuccessor]
+            successorIds = predecessorIds + stride
+            maxKValues[successorIds] = np.maximum(
+                maxKValues[successorIds], maxKValues[predecessorIds]
+            )
+
+    return maxKValues
+
+
+def _getLattice(generalizer: Generalizer) -> Lattice:
+    return Lattice(
+        [
+            generalizer.hierarchies[qiName].height
+            for qiName in generalizer.qiNames
+        ]
+    )
+
+
+def findKAnonymousLevels(
+    generalizer: Generalizer, configs: List[Tuple[float, int]]
+) -> Dict[Tuple[float, int], List[Tuple[int]]]:
+    lattice = _getLattice(generalizer)
+
+    numOfDataRow = len(generalizer.originalData)
+    suppressionRates = sorted({rate for rate, _ in configs})
+    rateIndices = {rate: index for index, rate in enumerate(suppressionRates)}
+
+    suppressionLimits = np.array(
+        [floor(rate * numOfDataRow) for rate in suppressionRates], np.int64
+    )
+    requiredKValues = np.zeros(len(suppressionRates), np.int64)
+    for rate, k in configs:
+        rateIndex = rateIndices[rate]
+        requiredKValues[rateIndex] = max(requiredKValues[rateIndex], int(k))
+
+    maxKValues = searchMaxKValues(
+        generalizer, lattice, suppressionLimits, requiredKValues
+    )
+
+    orderedNodes = lattice.nodes[lattice.order]
+    orderedMaxKValues = maxKValues[lattice.order]
+    return {
+        (rate, k): [
+            tuple(levels)
+            for levels in orderedNodes[
+                orderedMaxKValues[:, rateIndices[rate]] >= int(k)
+            ].tolist()
+        ]
+        for rate, k in configs
+    }
+
+
+class LossMetric:
+    def __init__(self, generalizer: Generalizer):
+        self.generalizer = generalizer
+        self.numOfRows = len(generalizer.originalData)
+
+        # The loss of a generalized value is the share of the other leaves
+        # it covers, as in the loss metric of ARX.
+        self.leafLosses = {}
+        self.generalizationLosses = {}
+        for qiName in generalizer.qiNames:
+            levelCodes = generalizer.hierarchies[qiName].levelCodes
+            numOfLeaves = len(levelCodes)
+
+            leafLosses = np.zeros(levelCodes.T.shape)
+            for level, codes in enumerate(levelCodes.T):
+                coveredLeaves = np.bincount(codes)[codes]
+                if numOfLeaves > 1:
+                    leafLosses[level] = (coveredLeaves - 1) / (numOfLeaves - 1)
+
+            leafCounts = np.bincount(
+                generalizer.leafIds[qiName], minlength=numOfLeaves
+            )
+            self.leafLosses[qiName] = leafLosses
+            self.generalizationLosses[qiName] = (
+                leafLosses @ leafCounts / max(self.numOfRows, 1)
+            )
+
+    @staticmethod
+    def aggregate(losses: List[float]) -> float:
+        # The geometric mean of ARX, shifted by one so that a lossless
+        # attribute does not zero the others.
+        return float(np.expm1(np.log1p(losses).mean()))
+
+    def getLowerBound(self, levels: List[int]) -> float:
+        # Suppressing a record loses at least as much as generalizing it.
+        return self.aggregate(
+            [
+                self.generalizationLosses[qiName][level]
+                for qiName, level in zip(self.generalizer.qiNames, levels)
+            ]
+        )
+
+    def measure(self, levels: List[int], isOutlier: np.ndarray) -> float:
+        losses = []
+        for qiName, level in zip(self.generalizer.qiNames, levels):
+            outlierLosses = self.leafLosses[qiName][level][
+                self.generalizer.leafIds[qiName][isOutlier]
+            ]
+            losses.append(
+                self.generalizationLosses[qiName][level]
+                + (len(outlierLosses) - outlierLosses.sum())
+                / max(self.numOfRows, 1)
+            )
+
+        return self.aggregate(losses)
+
+
+def _findLeastLossLevels(
+    generalizer: Generalizer,
+    candidates: List[List[int]],
+    findOutliers: Callable[[List[int]], Optional[np.ndarray]],
+) -> Optional[Tuple[List[int], np.ndarray]]:
+    # The loss is not monotonic once records are suppressed, so every
+    # anonymous node is a candidate. They are visited by their lower bound,
+    # which stops the search at the first bound above the best loss.
+    lossMetric = LossMetric(generalizer)
+    lowerBounds = [lossMetric.getLowerBound(levels) for levels in candidates]
+
+    optimum, minLoss = None, np.inf
+    for index in np.argsort(lowerBounds, kind="stable"):
+        if lowerBounds[index] >= minLoss:
+            break
+
+        levels = candidates[index]
+        isOutlier = findOutliers(levels)
+        if isOutlier is None:
+            continue
+
+        loss = lossMetric.measure(levels, isOutlier)
+        if loss < minLoss:
+            optimum, minLoss = (levels, isOutlier), loss
+
+    return optimum
+
+
+def factorizeValues(values: pd.Series) -> Tuple[np.ndarray, np.ndarray]:
+    codes, uniqueValues = pd.factorize(values, sort=True)
+    return codes, np.asarray(uniqueValues)
+
+
+class ClassAggregates:
+    def __init__(
+        self,
+        classIds: np.ndarray,
+        classSizes: np.ndarray,
+        originalData: pd.DataFrame,
+        valueCodes: Dict[str, np.ndarray],
+    ):
+        self.classIds = classIds
+        self.classSizes = classSizes
+        self.originalData = originalData
+        self.valueCodes = valueCodes
+        self.__valueCounts = {}
+
+    def countValues(
+        self, attributeName: str
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        # Every criterion on an attribute reads the same sparse histogram of
+        # its values per class, sorted by class.
+        if attributeName not in self.__valueCounts:
+            if attributeName not in self.valueCodes:
+                self.valueCodes[attributeName] = factorizeValues(
+                    self.originalData[attributeName]
+                )[0]
+            valueCodes = self.valueCodes[attributeName]
+
+            isPresent = valueCodes >= 0
+            numOfValues = int(valueCodes.max(initial=-1)) + 1
+            pairs, pairCounts = np.unique(
+                self.classIds[isPresent] * numOfValues + valueCodes[isPresent],
+                return_counts=True,
+            )
+            self.__valueCounts[attributeName] = (
+                pairs // max(numOfValues, 1),
+                pairs % max(numOfValues, 1),
+                pairCounts,
+            )
+
+        return self.__valueCounts[attributeName]
+
+
+class PrivacyCriterion(ABC):
+    # Whether generalizing a node keeps it anonymous under suppression, which
+    # lets the search tag successors without checking them.
+    isMonotonicWithSuppression = True
+
+    @abstractmethod
+    def findViolatingClasses(self, aggregates: ClassAggregates) -> np.ndarray:
+        pass
+
+
+def findOptimalLevels(
+    generalizer: Generalizer,
+    criteria: List[PrivacyCriterion],
+    suppressionRate: float,
+) -> Optional[Tuple[List[int], np.ndarray]]:
+    lattice = _getLattice(generalizer)
+    suppressionLimit = floor(suppressionRate * len(generalizer.originalData))
+    valueCodes = {}
+
+    def findOutliers(levels: List[int]) -> Optional[np.ndarray]:
+        classIds, classSizes = generalizer.getClassSizes(levels)
+        aggregates = ClassAggregates(
+            classIds, classSizes, generalizer.originalData, valueCodes
+        )
+
+        isViolating = np.zeros(len(classSizes), dtype=bool)
+        for criterion in criteria:
+            isViolating |= criterion.findViolatingClasses(aggregates)
+
+        # Records of violating classes are suppressed, as ARX does.
+        isOutlier = isViolating[classIds]
+        if isOutlier.sum() > suppressionLimit:
+            return None
+        return isOutlier
+
+    isMonotonic = suppressionLimit == 0 or all(
+        criterion.isMonotonicWithSuppression for criterion in criteria
+    )
+    if not isMonotonic:
+        return _findLeastLossLevels(
+            generalizer, lattice.nodes[lattice.order].tolist(), findOutliers
+        )
+
+    isAnonymous = np.zeros(len(lattice), dtype=bool)
+    for nodeIds in lattice.iterateLevels():
+        # Successors of anonymous nodes are anonymous and are not checked.
+        for nodeId in nodeIds[~isAnonymous[nodeIds]]:
+            isAnonymous[nodeId] = (
+                findOutliers(lattice.nodes[nodeId]) is not None
+            )
+
+        for dimension, stride in enumerate(lattice.strides):
+            hasSuccessor = (
+                lattice.nodes[nodeIds, dimension]
+                < lattice.heights[dimension] - 1
+            )
+            predecessorIds = nodeIds[hasSuccessor]
+            isAnonymous[predecessorIds + stride] |= isAnonymous[predecessorIds]
+
+    candidates = lattice.nodes[lattice.order][
+        isAnonymous[lattice.order]
+    ].tolist()
+    return _findLeastLossLevels(generalizer, candidates, findOutliers)
+
+
+def anonymizeNatively(
+    originalData: PathLike,
+    dataHierarchy: PathLike,
+    attributeTypes: Dict[str, str],
+    maxSuppressionRate: float,
+    createCriteria: Callable[[Generalizer], List[PrivacyCriterion]],
+) -> pd.DataFrame:
+    generalizer = Generalizer(
+        readDataFrameFromCsv(originalData, ";"),
+        loadCompiledHierarchies(dataHierarchy, ";"),
+        attributeTypes,
+    )
+    optimum = findOptimalLevels(
+        generalizer, createCriteria(generalizer), maxSuppressionRate
+    )
+    if optimum is None:
+        return pd.DataFrame()
+
+    return generalizer.generalize(*optimum)
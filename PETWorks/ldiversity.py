@@ -1,9 +1,13 @@
-from typing import Dict
+from os import PathLike
+from typing import Dict, List, Tuple, Union
 
+import numpy as np
 import pandas as pd
 
 from PETWorks.arx import (
     JavaApi,
+    PrivacyModel,
+    javaApiSession,
     anonymizeData,
     getDataFrame,
     loadDataFromCsv,
@@ -11,15 +15,26 @@ from PETWorks.arx import (
     setDataHierarchies,
 )
 from PETWorks.attributetypes import QUASI_IDENTIFIER, SENSITIVE_ATTRIBUTE
+from PETWorks.generalization import readEncodedTableFromCsv
+from PETWorks.lattice import (
+    ClassAggregates,
+    PrivacyCriterion,
+    anonymizeNatively,
+)
+from PETWorks.parallel import runInParallel
+from PETWorks.streaming import (
+    countClassSizes,
+    countDistinctValues,
+    readStrippedCsvInChunks,
+)
+from PETWorks.table import EncodedTable, asEncodedTable
 
 
-def measureLDiversity(
-    anonymizedData: pd.DataFrame,
+def getLDiversityGroupings(
     attributeTypes: Dict[str, str],
-) -> list[int]:
+) -> List[Tuple[List[str], str]]:
     qis = []
     sensitiveAttributes = []
-    lValues = []
 
     for attribute, value in attributeTypes.items():
         if value == QUASI_IDENTIFIER:
@@ -27,16 +42,52 @@ def measureLDiversity(
         if value == SENSITIVE_ATTRIBUTE:
             sensitiveAttributes.append(attribute)
 
+    groupings = []
     for index in range(len(sensitiveAttributes)):
         columns = (
             qis
             + sensitiveAttributes[:index]
             + sensitiveAttributes[index + 1:]
         )
-        groups = anonymizedData.groupby(columns)
+        groupings.append((columns, sensitiveAttributes[index]))
+
+    return groupings
 
-        sensitiveAttribute = sensitiveAttributes[index]
-        lValues += [group[sensitiveAttribute].nunique() for _, group in groups]
+
+def measureLDiversity(
+    anonymizedData: Union[pd.DataFrame, EncodedTable],
+    attributeTypes: Dict[str, str],
+    numOfProcess: int = 1,
+) -> list[int]:
+    anonymizedData = asEncodedTable(anonymizedData)
+    tasks = [
+        (anonymizedData.countDistinctValues, (columns, sensitiveAttribute))
+        for columns, sensitiveAttribute in getLDiversityGroupings(
+            attributeTypes
+        )
+    ]
+
+    lValues = []
+    for distinctValues in runInParallel(tasks, numOfProcess):
+        lValues += distinctValues.tolist()
+
+    return lValues
+
+
+def measureLDiversityInChunks(
+    anonymized: PathLike, attributeTypes: Dict[str, str], chunkSize: int
+) -> list[int]:
+    groupings = []
+    for columns, sensitiveAttribute in getLDiversityGroupings(attributeTypes):
+        groupings += [columns, columns + [sensitiveAttribute]]
+
+    counts = countClassSizes(
+        readStrippedCsvInChunks(anonymized, ";", chunkSize), groupings
+    )
+
+    lValues = []
+    for classSizes, valueCounts in zip(counts[::2], counts[1::2]):
+        lValues += countDistinctValues(classSizes, valueCounts).tolist()
 
     return lValues
 
@@ -45,48 +96,102 @@ def validateLDiversity(lValues: list[int], lLimit: int) -> bool:
     return all(value >= lLimit for value in lValues)
 
 
-def PETValidation(original, anonymized, _, attributeTypes, l):
-    anonymizedDataFrame = pd.read_csv(anonymized, sep=";")
-
-    lValues = measureLDiversity(anonymizedDataFrame, attributeTypes)
+def PETValidation(
+    original,
+    anonymized,
+    _,
+    attributeTypes,
+    l,
+    chunkSize=None,
+    numOfProcess=1,
+):
+    if chunkSize:
+        lValues = measureLDiversityInChunks(
+            anonymized, attributeTypes, chunkSize
+        )
+    else:
+        anonymizedTable = readEncodedTableFromCsv(anonymized, ";")
+        lValues = measureLDiversity(
+            anonymizedTable, attributeTypes, numOfProcess
+        )
     fulfillLDiversity = validateLDiversity(lValues, l)
 
     return {"l": l, "fulfill l-diversity": fulfillLDiversity}
 
 
+class DistinctLDiversityCriterion(PrivacyCriterion):
+    def __init__(self, sensitiveAttribute: str, l: int):
+        self.sensitiveAttribute = sensitiveAttribute
+        self.l = l
+
+    def findViolatingClasses(self, aggregates: ClassAggregates) -> np.ndarray:
+        pairClassIds, _, _ = aggregates.countValues(self.sensitiveAttribute)
+        distinctValues = np.bincount(
+            pairClassIds, minlength=len(aggregates.classSizes)
+        )
+        return distinctValues < self.l
+
+
+def _createLDiversityCriteria(
+    attributeTypes: Dict[str, str], l: int
+) -> List[PrivacyCriterion]:
+    return [
+        DistinctLDiversityCriterion(attributeName, l)
+        for attributeName, attributeType in attributeTypes.items()
+        if attributeType == SENSITIVE_ATTRIBUTE
+    ]
+
+
+def createArxPrivacyModels(
+    attributeTypes: Dict[str, str], l: int, javaApi: JavaApi
+) -> List[PrivacyModel]:
+    return [
+        javaApi.DistinctLDiversity(attributeName, l)
+        for attributeName, attributeType in attributeTypes.items()
+        if attributeType == SENSITIVE_ATTRIBUTE
+    ]
+
+
 def PETAnonymization(
     originalData: str,
     dataHierarchy: str,
     attributeTypes: Dict[str, str],
     maxSuppressionRate: float,
     l: int,
+    engine: str = "arx",
 ) -> pd.DataFrame:
-    javaApi = JavaApi()
-    originalData = loadDataFromCsv(
-        originalData, javaApi.StandardCharsets.UTF_8, ";", javaApi
-    )
+    if engine == "native":
+        return anonymizeNatively(
+            originalData,
+            dataHierarchy,
+            attributeTypes,
+            float(maxSuppressionRate),
+            lambda _: _createLDiversityCriteria(attributeTypes, l),
+        )
+    if engine != "arx":
+        raise ValueError(f"Unsupported engine: {engine}")
 
-    dataHierarchy = loadDataHierarchy(
-        dataHierarchy, javaApi.StandardCharsets.UTF_8, ";", javaApi
-    )
+    with javaApiSession() as javaApi:
+        originalData = loadDataFromCsv(
+            originalData, javaApi.StandardCharsets.UTF_8, ";", javaApi
+        )
 
-    setDataHierarchies(
-        originalData, dataHierarchy, attributeTypes, javaApi, True
-    )
+        dataHierarchy = loadDataHierarchy(
+            dataHierarchy, javaApi.StandardCharsets.UTF_8, ";", javaApi
+        )
 
-    privacyModels = []
-    for attributeName, attributeType in attributeTypes.items():
-        if attributeType == SENSITIVE_ATTRIBUTE:
-            privacyModels.append(javaApi.DistinctLDiversity(attributeName, l))
-
-    anonymizedResult = anonymizeData(
-        originalData,
-        privacyModels,
-        javaApi,
-        None,
-        float(maxSuppressionRate),
-    )
-    anonymizedData = javaApi.Data.create(
-        anonymizedResult.getOutput(True).iterator()
-    )
-    return getDataFrame(anonymizedData)
+        setDataHierarchies(
+            originalData, dataHierarchy, attributeTypes, javaApi, True
+        )
+
+        anonymizedResult = anonymizeData(
+            originalData,
+            createArxPrivacyModels(attributeTypes, l, javaApi),
+            javaApi,
+            None,
+            float(maxSuppressionRate),
+        )
+        anonymizedData = javaApi.Data.create(
+            anonymizedResult.getOutput(True).iterator()
+        )
+        return getDataFrame(anonymizedData)
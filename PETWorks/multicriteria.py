@@ -0,0 +1,52 @@
+from os import PathLike
+from typing import Dict, List
+
+import pandas as pd
+
+from PETWorks.generalization import Generalizer
+from PETWorks.kanonymity import KAnonymityCriterion
+from PETWorks.lattice import PrivacyCriterion, anonymizeNatively
+from PETWorks.ldiversity import _createLDiversityCriteria
+from PETWorks.tcloseness import _createTClosenessCriteria
+
+SUPPORTED_TECHS = ["k-anonymity", "l-diversity", "t-closeness"]
+
+
+def PETAnonymization(
+    originalData: PathLike,
+    dataHierarchy: PathLike,
+    attributeTypes: Dict[str, str],
+    maxSuppressionRate: float,
+    techs: List[str],
+    engine: str = "native",
+    **parameters,
+) -> pd.DataFrame:
+    unknownTechs = [tech for tech in techs if tech not in SUPPORTED_TECHS]
+    if unknownTechs:
+        raise ValueError(f"Unsupported techs: {', '.join(unknownTechs)}")
+    if engine != "native":
+        raise ValueError(f"Unsupported engine for several techs: {engine}")
+
+    # Every criterion is checked on each node of one lattice search, from
+    # the class sizes and value histograms the node shares between them.
+    def createCriteria(generalizer: Generalizer) -> List[PrivacyCriterion]:
+        criteria = []
+        if "k-anonymity" in techs:
+            criteria.append(KAnonymityCriterion(parameters["k"]))
+        if "l-diversity" in techs:
+            criteria += _createLDiversityCriteria(
+                attributeTypes, parameters["l"]
+            )
+        if "t-closeness" in techs:
+            criteria += _createTClosenessCriteria(
+                generalizer, attributeTypes, parameters["t"]
+            )
+        return criteria
+
+    return anonymizeNatively(
+        originalData,
+        dataHierarchy,
+        attributeTypes,
+        float(maxSuppressionRate),
+        createCriteria,
+    )
@@ -0,0 +1,239 @@
+from os import PathLike
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+from PETWorks.arx import getAttributeNameByType
+from PETWorks.attributetypes import QUASI_IDENTIFIER, SENSITIVE_ATTRIBUTE
+from PETWorks.dpresence import measureDPresence, validateDPresence
+from PETWorks.generalization import Generalizer, readDataFrameFromCsv
+from PETWorks.hierarchy import (
+    CompiledHierarchy,
+    findAnonymousLevels,
+    loadCompiledHierarchies,
+)
+from PETWorks.kanonymity import measureKAnonymity, validateKAnonymity
+from PETWorks.ldiversity import getLDiversityGroupings, validateLDiversity
+from PETWorks.parallel import runInParallel
+from PETWorks.profitability import (
+    measureProfitabilityPayoffAcceptingAttack,
+    measureProfitabilityPayoffNoAttack,
+)
+from PETWorks.table import EncodedTable
+from PETWorks.tcloseness import measureTCloseness, validateTCloseness
+
+SUPPORTED_TECHS = [
+    "k-anonymity",
+    "l-diversity",
+    "t-closeness",
+    "d-presence",
+    "profitability",
+]
+TECHS_WITH_ORIGINAL = {"t-closeness", "d-presence"}
+
+
+def measureClassSizes(
+    anonymizedData: EncodedTable, qiNames: List[str]
+) -> Dict[str, float]:
+    classIds, _ = anonymizedData.getClassIds(qiNames)
+    isSuppressed = anonymizedData.isSuppressed(qiNames)
+
+    classSizes = np.bincount(classIds[(classIds >= 0) & ~isSuppressed])
+    classSizes = classSizes[classSizes > 0]
+    if len(classSizes) == 0:
+        classSizes = np.zeros(1, dtype=np.int64)
+
+    return {
+        "number of classes": int(np.count_nonzero(classSizes)),
+        "min": int(classSizes.min()),
+        "max": int(classSizes.max()),
+        "average": float(classSizes.mean()),
+        "suppressed records": int(isSuppressed.sum()),
+    }
+
+
+def _measureDPresence(
+    originalData: pd.DataFrame,
+    anonymizedData: pd.DataFrame,
+    hierarchies: Dict[str, CompiledHierarchy],
+    attributeTypes: Dict[str, str],
+) -> list[float]:
+    generalizer = Generalizer(originalData, hierarchies, attributeTypes)
+    anonymizedPopulation = generalizer.apply(
+        findAnonymousLevels(anonymizedData, generalizer.qiNames, hierarchies)
+    )
+    return measureDPresence(
+        anonymizedPopulation, anonymizedData, attributeTypes
+    )
+
+
+def _measureProfitability(
+    anonymizedData: EncodedTable,
+    qiNames: List[str],
+    allowAttack: bool,
+    adversaryCost: float,
+    adversaryGain: float,
+    publisherLost: float,
+    publisherBenefit: float,
+) -> bool:
+    if allowAttack:
+        return bool(
+            measureProfitabilityPayoffAcceptingAttack(
+                anonymizedData, qiNames, publisherLost, publisherBenefit
+            )
+            > 0
+        )
+
+    return bool(
+        measureProfitabilityPayoffNoAttack(
+            anonymizedData, qiNames, adversaryCost, adversaryGain
+        )
+        <= 0
+    )
+
+
+def PETValidation(
+    original: PathLike,
+    anonymized: PathLike,
+    techs: List[str],
+    dataHierarchy: PathLike = None,
+    attributeTypes: Dict[str, str] = None,
+    numOfProcess: int = 1,
+    **parameters,
+) -> Dict[str, dict]:
+    unknownTechs = [tech for tech in techs if tech not in SUPPORTED_TECHS]
+    if unknownTechs:
+        raise ValueError(f"Unsupported techs: {', '.join(unknownTechs)}")
+
+    # Read and encode the release once; every metric below groups it by the
+    # same cached class ids.
+    anonymizedData = readDataFrameFromCsv(anonymized, ";")
+    anonymizedTable = EncodedTable.fromDataFrame(anonymizedData)
+
+    qiNames = getAttributeNameByType(attributeTypes, QUASI_IDENTIFIER)
+    sensitiveAttributes = getAttributeNameByType(
+        attributeTypes, SENSITIVE_ATTRIBUTE
+    )
+
+    if TECHS_WITH_ORIGINAL.intersection(techs):
+        hierarchies = loadCompiledHierarchies(dataHierarchy, ";")
+        originalData = readDataFrameFromCsv(original, ";")
+
+    tasks = {}
+    if "k-anonymity" in techs:
+        tasks["k-anonymity"] = [
+            (measureKAnonymity, (anonymizedTable, qiNames))
+        ]
+
+    if "l-diversity" in techs:
+        tasks["l-diversity"] = [
+            (anonymizedTable.countDistinctValues, grouping)
+            for grouping in getLDiversityGroupings(attributeTypes)
+        ]
+
+    if "t-closeness" in techs:
+        # Empty cells are missing values, as pandas reads them by default.
+        originalValues = originalData.mask(originalData == "")
+        tasks["t-closeness"] = [
+            (
+                measureTCloseness,
+                (
+                    originalValues,
+                    anonymizedTable,
+                    sensitiveAttribute,
+                    qiNames,
+                    hierarchies[sensitiveAttribute].values,
+                ),
+            )
+            for sensitiveAttribute in sensitiveAttributes
+        ]
+
+    if "d-presence" in techs:
+        tasks["d-presence"] = [
+            (
+                _measureDPresence,
+                (originalData, anonymizedData, hierarchies, attributeTypes),
+            )
+        ]
+
+    if "profitability" in techs:
+        tasks["profitability"] = [
+            (
+                _measureProfitability,
+                (
+                    anonymizedTable,
+                    qiNames,
+                    parameters["allowAttack"],
+                    parameters["adversaryCost"],
+                    parameters["adversaryGain"],
+                    parameters["publisherLost"],
+                    parameters["publisherBenefit"],
+                ),
+            )
+        ]
+
+    tasks["class sizes"] = [(measureClassSizes, (anonymizedTable, qiNames))]
+
+    # Group before the measurements fan out, so that every worker inherits
+    # the class ids instead of computing them again.
+    anonymizedTable.getClassIds(qiNames)
+    results = iter(runInParallel(sum(tasks.values(), []), numOfProcess))
+    measurements = {
+        name: [next(results) for _ in taskGroup]
+        for name, taskGroup in tasks.items()
+    }
+
+    result = {}
+    for tech in techs:
+        values = measurements[tech]
+        if tech == "k-anonymity":
+            k = parameters["k"]
+            result[tech] = {
+                "k": k,
+                "fulfill k-anonymity": validateKAnonymity(int(values[0]), k),
+            }
+
+        elif tech == "l-diversity":
+            l = parameters["l"]
+            lValues = [
+                lValue
+                for distinctValues in values
+                for lValue in distinctValues.tolist()
+            ]
+            result[tech] = {
+                "l": l,
+                "fulfill l-diversity": validateLDiversity(lValues, l),
+            }
+
+        elif tech == "t-closeness":
+            tLimit = float(parameters["tLimit"])
+            result[tech] = {
+                "t": tLimit,
+                "fulfill t-closeness": all(
+                    validateTCloseness(t, tLimit) for t in values
+                ),
+            }
+
+        elif tech == "d-presence":
+            dMin, dMax = parameters["dMin"], parameters["dMax"]
+            result[tech] = {
+                "dMin": dMin,
+                "dMax": dMax,
+                "d-presence": validateDPresence(
+                    values[0], float(dMin), float(dMax)
+                ),
+            }
+
+        elif tech == "profitability":
+            result[tech] = {
+                "allow attack": parameters["allowAttack"],
+                "adversary's cost": parameters["adversaryCost"],
+                "adversary's gain": parameters["adversaryGain"],
+                "publisher's loss": parameters["publisherLost"],
+                "publisher's benefit": parameters["publisherBenefit"],
+                "isProfitable": values[0],
+            }
+
+    result["class sizes"] = measurements["class sizes"][0]
+    return result
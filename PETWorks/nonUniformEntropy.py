@@ -1,6 +1,6 @@
 from PETWorks.arx import (
     Data,
-    JavaApi,
+    javaApiSession,
     UtilityMetrics,
     loadDataFromCsv,
     loadDataHierarchy,
@@ -13,21 +13,20 @@ def _measureNonUniformEntropy(original: Data, anonymized: Data) -> float:
 
 
 def PETValidation(original, anonymized, _, dataHierarchy, attributeTypes):
-    javaApi = JavaApi()
-
-    dataHierarchy = loadDataHierarchy(
-        dataHierarchy, javaApi.StandardCharsets.UTF_8, ";", javaApi
-    )
-
-    original = loadDataFromCsv(
-        original, javaApi.StandardCharsets.UTF_8, ";", javaApi
-    )
-    anonymized = loadDataFromCsv(
-        anonymized, javaApi.StandardCharsets.UTF_8, ";", javaApi
-    )
-
-    setDataHierarchies(original, dataHierarchy, attributeTypes, javaApi)
-    setDataHierarchies(anonymized, dataHierarchy, attributeTypes, javaApi)
-
-    nonUniformEntropy = _measureNonUniformEntropy(original, anonymized)
-    return {"Non-Uniform Entropy": nonUniformEntropy}
+    with javaApiSession() as javaApi:
+        dataHierarchy = loadDataHierarchy(
+            dataHierarchy, javaApi.StandardCharsets.UTF_8, ";", javaApi
+        )
+
+        original = loadDataFromCsv(
+            original, javaApi.StandardCharsets.UTF_8, ";", javaApi
+        )
+        anonymized = loadDataFromCsv(
+            anonymized, javaApi.StandardCharsets.UTF_8, ";", javaApi
+        )
+
+        setDataHierarchies(original, dataHierarchy, attributeTypes, javaApi)
+        setDataHierarchies(anonymized, dataHierarchy, attributeTypes, javaApi)
+
+        nonUniformEntropy = _measureNonUniformEntropy(original, anonymized)
+        return {"Non-Uniform Entropy": nonUniformEntropy}
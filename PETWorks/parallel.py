@@ -0,0 +1,30 @@
+from multiprocessing import get_all_start_methods, get_context
+from typing import Any, Callable, List, Tuple
+
+Task = Tuple[Callable, tuple]
+
+__tasks = None
+
+
+def __initializeWorker(tasks: List[Task]) -> None:
+    global __tasks
+    __tasks = tasks
+
+
+def __runTask(index: int) -> Any:
+    function, arguments = __tasks[index]
+    return function(*arguments)
+
+
+def runInParallel(tasks: List[Task], numOfProcess: int = 1) -> List[Any]:
+    numOfProcess = min(numOfProcess, len(tasks))
+    if numOfProcess <= 1 or "fork" not in get_all_start_methods():
+        return [function(*arguments) for function, arguments in tasks]
+
+    # Forked workers inherit the tasks and the encoded tables they refer to,
+    # so only the task indices and the results are pickled. The tasks are
+    # handed to each pool's own workers, so concurrent calls stay apart.
+    with get_context("fork").Pool(
+        numOfProcess, initializer=__initializeWorker, initargs=(tasks,)
+    ) as pool:
+        return pool.map(__runTask, range(len(tasks)), chunksize=1)
@@ -1,6 +1,6 @@
 from PETWorks.arx import (
     Data,
-    JavaApi,
+    javaApiSession,
     UtilityMetrics,
     loadDataFromCsv,
     loadDataHierarchy,
@@ -13,21 +13,20 @@ def _measurePrecision(original: Data, anonymized: Data) -> float:
 
 
 def PETValidation(original, anonymized, _, dataHierarchy, attributeTypes):
-    javaApi = JavaApi()
-
-    dataHierarchy = loadDataHierarchy(
-        dataHierarchy, javaApi.StandardCharsets.UTF_8, ";", javaApi
-    )
-
-    original = loadDataFromCsv(
-        original, javaApi.StandardCharsets.UTF_8, ";", javaApi
-    )
-    anonymized = loadDataFromCsv(
-        anonymized, javaApi.StandardCharsets.UTF_8, ";", javaApi
-    )
-
-    setDataHierarchies(original, dataHierarchy, attributeTypes, javaApi)
-    setDataHierarchies(anonymized, dataHierarchy, attributeTypes, javaApi)
-
-    precision = _measurePrecision(original, anonymized)
-    return {"precision": precision}
+    with javaApiSession() as javaApi:
+        dataHierarchy = loadDataHierarchy(
+            dataHierarchy, javaApi.StandardCharsets.UTF_8, ";", javaApi
+        )
+
+        original = loadDataFromCsv(
+            original, javaApi.StandardCharsets.UTF_8, ";", javaApi
+        )
+        anonymized = loadDataFromCsv(
+            anonymized, javaApi.StandardCharsets.UTF_8, ";", javaApi
+        )
+
+        setDataHierarchies(original, dataHierarchy, attributeTypes, javaApi)
+        setDataHierarchies(anonymized, dataHierarchy, attributeTypes, javaApi)
+
+        precision = _measurePrecision(original, anonymized)
+        return {"precision": precision}
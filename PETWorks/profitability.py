@@ -1,45 +1,100 @@
-from typing import List
+from os import PathLike
+from typing import List, Tuple, Union
 from PETWorks.arx import (
     getAttributeNameByType,
 )
 from PETWorks.attributetypes import QUASI_IDENTIFIER
+from PETWorks.generalization import readEncodedTableFromCsv
+from PETWorks.streaming import countClassSizes, readStrippedCsvInChunks
+from PETWorks.table import EncodedTable, asEncodedTable
 
+import numpy as np
 import pandas as pd
 
 
-def _measureProfitabilityPayoffAcceptingAttack(
-    anonymizedData: pd.DataFrame,
-    qiNames: List[str],
+def computeProfitabilityPayoffAcceptingAttack(
+    classSizes: np.ndarray,
+    numOfRows: int,
     publisherLost: float,
     publisherBenefit: float,
-):
-    probabilityOfSuccess = 1 / (anonymizedData.groupby(qiNames).size())
+) -> float:
+    probabilityOfSuccess = 1 / classSizes
 
-    publisherTotalGain = publisherBenefit * len(anonymizedData)
+    publisherTotalGain = publisherBenefit * numOfRows
     publisherTotalLost = (publisherLost * probabilityOfSuccess).sum()
 
     return publisherTotalGain - publisherTotalLost
 
 
-def _measureProfitabilityPayoffNoAttack(
-    anonymizedData: pd.DataFrame,
-    qiNames: List[str],
+def computeProfitabilityPayoffNoAttack(
+    classSizes: np.ndarray,
+    numOfRows: int,
     adversaryCost: float,
     adversaryGain: float,
 ) -> float:
-    anonymizedData["probabilityOfSuccess"] = 1 / (
-        anonymizedData.groupby(qiNames).transform("size").astype(float)
-    )
+    probabilityOfSuccess = 1 / classSizes
 
+    # Every record of a class has the same chance of being re-identified.
     adversaryTotalGain = (
-        anonymizedData["probabilityOfSuccess"] * adversaryGain
+        classSizes * probabilityOfSuccess * adversaryGain
     ).sum()
 
-    adversaryTotalCost = len(anonymizedData) * adversaryCost
+    adversaryTotalCost = numOfRows * adversaryCost
 
     return adversaryTotalGain - adversaryTotalCost
 
 
+def _countClassSizes(
+    anonymizedData: Union[pd.DataFrame, EncodedTable], qiNames: List[str]
+) -> Tuple[np.ndarray, int]:
+    anonymizedData = asEncodedTable(anonymizedData)
+    classSizes = anonymizedData.getClassSizes(qiNames).astype(float)
+    return classSizes, len(anonymizedData)
+
+
+def _countClassSizesInChunks(
+    subset: PathLike, qiNames: List[str], chunkSize: int
+) -> Tuple[np.ndarray, int]:
+    numOfRows = 0
+
+    def countRows(chunks):
+        nonlocal numOfRows
+        for chunk in chunks:
+            numOfRows += len(chunk)
+            yield chunk
+
+    (classSizes,) = countClassSizes(
+        countRows(readStrippedCsvInChunks(subset, ";", chunkSize)), [qiNames]
+    )
+    return classSizes.to_numpy(dtype=float), numOfRows
+
+
+def measureProfitabilityPayoffAcceptingAttack(
+    anonymizedData: Union[pd.DataFrame, EncodedTable],
+    qiNames: List[str],
+    publisherLost: float,
+    publisherBenefit: float,
+) -> float:
+    return computeProfitabilityPayoffAcceptingAttack(
+        *_countClassSizes(anonymizedData, qiNames),
+        publisherLost,
+        publisherBenefit,
+    )
+
+
+def measureProfitabilityPayoffNoAttack(
+    anonymizedData: Union[pd.DataFrame, EncodedTable],
+    qiNames: List[str],
+    adversaryCost: float,
+    adversaryGain: float,
+) -> float:
+    return computeProfitabilityPayoffNoAttack(
+        *_countClassSizes(anonymizedData, qiNames),
+        adversaryCost,
+        adversaryGain,
+    )
+
+
 def PETValidation(
     original,
     subset,
@@ -51,21 +106,30 @@ def PETValidation(
     adversaryGain,
     publisherLost,
     publisherBenefit,
+    chunkSize=None,
 ):
-    subset = pd.read_csv(subset, sep=";")
     qiNames = getAttributeNameByType(attributeTypes, QUASI_IDENTIFIER)
 
+    if chunkSize:
+        classSizes, numOfRows = _countClassSizesInChunks(
+            subset, qiNames, chunkSize
+        )
+    else:
+        classSizes, numOfRows = _countClassSizes(
+            readEncodedTableFromCsv(subset, ";"), qiNames
+        )
+
     if allowAttack:
         isProfitable = bool(
-            _measureProfitabilityPayoffAcceptingAttack(
-                subset, qiNames, publisherLost, publisherBenefit
+            computeProfitabilityPayoffAcceptingAttack(
+                classSizes, numOfRows, publisherLost, publisherBenefit
             )
             > 0
         )
     else:
         isProfitable = bool(
-            _measureProfitabilityPayoffNoAttack(
-                subset, qiNames, adversaryCost, adversaryGain
+            computeProfitabilityPayoffNoAttack(
+                classSizes, numOfRows, adversaryCost, adversaryGain
             )
             <= 0
         )
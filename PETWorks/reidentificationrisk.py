@@ -1,4 +1,10 @@
-from PETWorks.arx import Data, loadDataFromCsv, createJavaGateway, JavaApi
+from PETWorks.arx import (
+    Data,
+    loadDataFromCsv,
+    createJavaGateway,
+    JavaApi,
+    javaApiSession,
+)
 from py4j.java_collections import JavaClass
 
 RiskModelSampleRisks = JavaClass
@@ -28,10 +34,12 @@ def _measureReidentificationRisk(
 
 
 def PETValidation(data, *_):
-    javaApi = JavaApi()
-    data = loadDataFromCsv(data, javaApi.StandardCharsets.UTF_8, ";", javaApi)
+    with javaApiSession() as javaApi:
+        data = loadDataFromCsv(
+            data, javaApi.StandardCharsets.UTF_8, ";", javaApi
+        )
 
-    _applyDefinition(data, javaApi)
+        _applyDefinition(data, javaApi)
 
-    risk = _measureReidentificationRisk(data, javaApi)
-    return {"Re-identification Risk": risk.getHighestRisk()}
+        risk = _measureReidentificationRisk(data, javaApi)
+        return {"Re-identification Risk": risk.getHighestRisk()}
@@ -1,22 +1,19 @@
 import numpy as np
 from os import PathLike
-from typing import Dict, Generator, Iterator, Tuple
+from typing import Dict, Generator, Iterator, List, Tuple
 from dataclasses import dataclass
-from collections import namedtuple
 from PETWorks.report import AnonymityConfig
 from PETWorks.arx import (
     Data,
     getDataFrame,
     UtilityMetrics,
-    convertJavaListToList,
-    setDataHierarchies,
-    anonymizeData,
-    JavaApi,
-    loadDataHierarchy,
-    setDataHierarchies,
     getAttributeNameByType,
 )
 from PETWorks.attributetypes import QUASI_IDENTIFIER, SENSITIVE_ATTRIBUTE
+from PETWorks.generalization import Generalizer, readDataFrameFromCsv
+from PETWorks.hierarchy import loadCompiledHierarchies
+from PETWorks.lattice import findKAnonymousLevels
+from PETWorks.table import EncodedTable, countSharedClasses
 
 
 import pandas as pd
@@ -28,9 +25,7 @@ from PETWorks.tcloseness import (
     measureTCloseness,
 )
 from PETWorks.ldiversity import measureLDiversity
-from PETWorks.profitability import _measureProfitabilityPayoffNoAttack
-
-from py4j.java_gateway import Py4JJavaError
+from PETWorks.profitability import measureProfitabilityPayoffNoAttack
 
 
 @dataclass
@@ -56,33 +51,20 @@ class Metrics:
             for attributeName, attributeType in attributeTypes.items()
             if attributeType == QUASI_IDENTIFIER
         ]
-        qiIndices = [
-            originalData.columns.get_loc(qiName) for qiName in qiNames
-        ]
-
-        groupedData = originalData.groupby(qiNames)
-        groupedSubset = anonymizedSubset.groupby(qiNames)
-
-        deltaValues = []
-        for _, subsetGroup in groupedSubset:
-            count = 0
-            pcount = 0
 
-            subsetGroupList = subsetGroup.values.tolist()
-            count = len(subsetGroupList)
-
-            for _, dataGroup in groupedData:
-                dataGroupList = dataGroup.values.tolist()
+        dataCounts, subsetCounts = countSharedClasses(
+            originalData, anonymizedSubset, qiNames
+        )
 
-                pcount = len(dataGroup)
-                for index in qiIndices:
-                    if subsetGroupList[0][index] != dataGroupList[0][index]:
-                        pcount = 0
+        isMatched = (subsetCounts > 0) & (dataCounts > 0)
+        deltaValues = (
+            subsetCounts[isMatched] / dataCounts[isMatched]
+        ).tolist()
 
-                if pcount > 0:
-                    deltaValues.append(count / pcount)
-                else:
-                    deltaValues.append(0)
+        # Every unmatched pair of subset and data groups counts as zero.
+        numOfPairs = (subsetCounts > 0).sum() * (dataCounts > 0).sum()
+        if len(deltaValues) < numOfPairs:
+            deltaValues.append(0)
 
         return 1 - max(deltaValues)
 
@@ -93,11 +75,15 @@ class Metrics:
         k: int,
         attributeTypes: Dict[str, str],
         dataHierarchy: Dict[str, np.chararray],
+        originalDataFrame: pd.DataFrame = None,
+        anonymizedDataFrame: pd.DataFrame = None,
     ) -> "Metrics":
         utility = UtilityMetrics.evaluate(originalData, anonymizedData)
 
-        originalDataFrame = getDataFrame(originalData)
-        anonymizedDataFrame = getDataFrame(anonymizedData)
+        if originalDataFrame is None:
+            originalDataFrame = getDataFrame(originalData)
+        if anonymizedDataFrame is None:
+            anonymizedDataFrame = getDataFrame(anonymizedData)
 
         sensitiveAttributes = getAttributeNameByType(
             attributeTypes, SENSITIVE_ATTRIBUTE
@@ -110,11 +96,14 @@ class Metrics:
             originalDataFrame, anonymizedDataFrame, attributeTypes
         )
 
+        # Encode once, so every metric below shares the class ids.
+        anonymizedTable = EncodedTable.fromDataFrame(anonymizedDataFrame)
+
         t = 1 - max(
             [
                 measureTCloseness(
                     originalDataFrame,
-                    anonymizedDataFrame,
+                    anonymizedTable,
                     sensitive,
                     qiNames,
                     dataHierarchy[sensitive],
@@ -124,10 +113,10 @@ class Metrics:
             default=1,
         )
 
-        lLimit = min(measureLDiversity(anonymizedDataFrame, attributeTypes))
+        lLimit = min(measureLDiversity(anonymizedTable, attributeTypes))
 
-        profitability = _measureProfitabilityPayoffNoAttack(
-            anonymizedDataFrame, qiNames, 4, 200000 / len(anonymizedDataFrame)
+        profitability = measureProfitabilityPayoffNoAttack(
+            anonymizedTable, qiNames, 4, 200000 / len(anonymizedTable)
         )
 
         return Metrics(
@@ -143,85 +132,68 @@ class Metrics:
         )
 
 
-__javaApi = None
-
+MAX_SUPPRESSION_RATES_PER_SEARCH = 256
 
-def __setupJavaGateway():
-    global __javaApi
-    __javaApi = JavaApi()
+__generalizer = None
 
 
-def __filterWithKAnonymity(args: Tuple):
-    pathToOriginalData, pathToHierarchy, suppressRate, k = args
-
-    originalData = __javaApi.Data.create(
-        pathToOriginalData, __javaApi.StandardCharsets.UTF_8, ";"
-    )
-
-    hierarchies = loadDataHierarchy(
-        pathToHierarchy, __javaApi.StandardCharsets.UTF_8, ";", __javaApi
-    )
-
+def __setupGeneralizer(
+    pathToOriginalData: PathLike, pathToHierarchy: PathLike
+) -> None:
+    global __generalizer
+    hierarchies = loadCompiledHierarchies(pathToHierarchy, ";")
     attributeTypes = {key: QUASI_IDENTIFIER for key, _ in hierarchies.items()}
 
-    setDataHierarchies(originalData, hierarchies, attributeTypes, __javaApi)
-
-    privacyModels = [__javaApi.KAnonymity(k)]
-
-    try:
-        anonymizedResult = anonymizeData(
-            originalData, privacyModels, __javaApi, None, suppressRate
-        )
-    except Py4JJavaError:
-        return
-
-    if not anonymizedResult:
-        return None
-
-    anonymizedSolutions = anonymizedResult.getLattice().getLevels()
-
-    levels = set()
-    for level in anonymizedSolutions:
-        for node in level:
-            if str(node.getAnonymity()) != "ANONYMOUS":
-                continue
-
-            try:
-                anonymizingLevel = convertJavaListToList(
-                    node.getTransformation()
-                )
-            except Py4JJavaError:
-                pass
-
-            levels.add(anonymizingLevel)
-
-    return (suppressRate, k, levels)
+    __generalizer = Generalizer(
+        readDataFrameFromCsv(pathToOriginalData, ";"),
+        hierarchies,
+        attributeTypes,
+    )
 
 
-Combination = namedtuple("Combination", "suppressionRate k")
+def __filterWithKAnonymity(
+    configs: List[Tuple[float, int]],
+) -> Dict[Tuple[float, int], List[Tuple[int]]]:
+    return findKAnonymousLevels(__generalizer, configs)
 
 
 def filterWithKAnonymityParallelly(
     originalData: PathLike,
     dataHierarchy: PathLike,
     configs: Iterator[AnonymityConfig],
-    numOfProcess: int = (cpu_count() - 1),
+    numOfProcess: int = max(cpu_count() - 1, 1),
 ) -> Generator[Tuple, None, None]:
-    pool = Pool(numOfProcess, __setupJavaGateway)
-
-    argumentSets = (
-        (originalData, dataHierarchy, config.suppressionLimit, config.k)
-        for config in configs
-    )
+    configs = [(config.suppressionLimit, config.k) for config in configs]
 
-    asyncResults = pool.imap(
-        __filterWithKAnonymity, argumentSets, chunksize=30
-    )
+    # One lattice search answers every k of a batch of suppression rates.
+    configsByRate = {}
+    for suppressionLimit, k in configs:
+        configsByRate.setdefault(suppressionLimit, []).append(
+            (suppressionLimit, k)
+        )
+    rateGroups = list(configsByRate.values())
+    argumentSets = [
+        sum(rateGroups[start : start + MAX_SUPPRESSION_RATES_PER_SEARCH], [])
+        for start in range(
+            0, len(rateGroups), MAX_SUPPRESSION_RATES_PER_SEARCH
+        )
+    ]
+
+    anonymousLevels = {}
+    with Pool(
+        numOfProcess,
+        __setupGeneralizer,
+        (originalData, dataHierarchy),
+    ) as pool:
+        for result in pool.imap_unordered(
+            __filterWithKAnonymity, argumentSets
+        ):
+            anonymousLevels.update(result)
 
     fullConfigs = (
         AnonymityConfig(suppressionLimit, k, level)
-        for suppressionLimit, k, levels in asyncResults
-        for level in levels
+        for suppressionLimit, k in configs
+        for level in anonymousLevels[(suppressionLimit, k)]
     )
 
     yield from fullConfigs
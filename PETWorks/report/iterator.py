@@ -1,32 +1,55 @@
 from PETWorks.report import *
 
-from itertools import product
 from os import PathLike
-from typing import Generator, List
-import pandas as pd
+from typing import List, Sequence, Union
 
+READ_CHUNK_SIZE = 1 << 20
 
-def __generateSuppressionLimits(step: float) -> List[float]:
-    return [(i / step) for i in range(0, step + 1)]
 
+def __countDataRows(originalData: PathLike) -> int:
+    numOfLines = 0
+    lastByte = b"\n"
+    with open(originalData, "rb") as file:
+        for chunk in iter(lambda: file.read(READ_CHUNK_SIZE), b""):
+            numOfLines += chunk.count(b"\n")
+            lastByte = chunk[-1:]
 
-def __generateKValues(maxK: int) -> List[int]:
-    return list(range(1, maxK + 1))
+    if lastByte != b"\n":
+        numOfLines += 1
 
+    # The first line is the header.
+    return max(numOfLines - 1, 0)
 
-def generateConfigs(
-    originalData: PathLike,
-) -> Generator[AnonymityConfig, None, None]:
-    numOfDataRow = len(pd.read_csv(originalData, sep=";"))
 
-    suppressionLimits = __generateSuppressionLimits(numOfDataRow)
-    kValues = __generateKValues(numOfDataRow)
+class AnonymityConfigSpace(Sequence):
+    def __init__(self, numOfDataRow: int):
+        self.numOfDataRow = numOfDataRow
+        self.numOfSuppressionLimits = numOfDataRow + 1
+        self.numOfKValues = numOfDataRow
 
-    total = len(suppressionLimits) * len(kValues)
+    def __len__(self) -> int:
+        return self.numOfSuppressionLimits * self.numOfKValues
 
-    configs = (
-        AnonymityConfig(suppressionLimit, k, None)
-        for suppressionLimit, k in product(suppressionLimits, kValues)
-    )
+    def __getitem__(
+        self, index: Union[int, slice]
+    ) -> Union[AnonymityConfig, List[AnonymityConfig]]:
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
 
-    return total, configs
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("config index out of range")
+
+        suppressionIndex, kIndex = divmod(index, self.numOfKValues)
+        return AnonymityConfig(
+            suppressionIndex / self.numOfDataRow, kIndex + 1, None
+        )
+
+    def sample(self, count: int) -> List[AnonymityConfig]:
+        step = max((len(self) - 1) // max(count - 1, 1), 1)
+        return self[: step * count : step]
+
+
+def generateConfigs(originalData: PathLike) -> AnonymityConfigSpace:
+    return AnonymityConfigSpace(__countDataRows(originalData))
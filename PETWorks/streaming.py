@@ -0,0 +1,62 @@
+from os import PathLike
+from typing import Generator, Iterable, List
+
+import numpy as np
+import pandas as pd
+
+
+def readCsvInChunks(
+    path: PathLike, delimiter: str, chunkSize: int, **options
+) -> Generator[pd.DataFrame, None, None]:
+    # Values are read as text, so that every chunk groups them alike.
+    with pd.read_csv(
+        path, sep=delimiter, dtype=str, chunksize=chunkSize, **options
+    ) as reader:
+        yield from reader
+
+
+def readStrippedCsvInChunks(
+    path: PathLike, delimiter: str, chunkSize: int
+) -> Generator[pd.DataFrame, None, None]:
+    for chunk in readCsvInChunks(path, delimiter, chunkSize, na_filter=False):
+        chunk.columns = chunk.columns.str.strip()
+        yield chunk.apply(lambda column: column.str.strip())
+
+
+def _mergeCounts(partialCounts: List[pd.Series]) -> pd.Series:
+    counts = pd.concat(partialCounts)
+    return counts.groupby(level=list(range(counts.index.nlevels))).sum()
+
+
+def countClassSizes(
+    chunks: Iterable[pd.DataFrame], groupings: List[List[str]]
+) -> List[pd.Series]:
+    # Only the sizes of the classes are kept, never the rows of a chunk.
+    # Partial counts are merged once they outgrow the merged ones, so the
+    # memory stays proportional to the number of classes.
+    partialCounts = [[] for _ in groupings]
+    numOfMergedClasses = [0] * len(groupings)
+    for chunk in chunks:
+        for index, columnNames in enumerate(groupings):
+            partialCounts[index].append(chunk.groupby(columnNames).size())
+
+            numOfClasses = sum(map(len, partialCounts[index]))
+            if numOfClasses >= 2 * numOfMergedClasses[index]:
+                mergedCounts = _mergeCounts(partialCounts[index])
+                partialCounts[index] = [mergedCounts]
+                numOfMergedClasses[index] = len(mergedCounts)
+
+    return [
+        _mergeCounts(counts) if counts else pd.Series(dtype=np.int64)
+        for counts in partialCounts
+    ]
+
+
+def countDistinctValues(
+    classSizes: pd.Series, valueCounts: pd.Series
+) -> pd.Series:
+    # Classes whose values are all missing still count, with no value.
+    distinctValues = valueCounts.groupby(
+        level=list(range(classSizes.index.nlevels))
+    ).size()
+    return distinctValues.reindex(classSizes.index, fill_value=0)
@@ -0,0 +1,266 @@
+import json
+from hashlib import sha1
+from os import PathLike, chmod, environ, makedirs, rename, stat
+from os.path import basename, dirname, join
+from shutil import rmtree
+from tempfile import mkdtemp
+from typing import Callable, Dict, List, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+MAX_PACKED_KEY = 1 << 62
+DATASET_CACHE_VARIABLE = "PETWORKS_DATASET_CACHE"
+DATASET_CACHE_METADATA = "metadata.json"
+
+
+def _encodeColumn(column: pd.Series) -> Tuple[np.ndarray, pd.Index]:
+    try:
+        codes, codebook = pd.factorize(column, sort=True)
+    except TypeError:
+        codes, codebook = pd.factorize(column)
+
+    # Missing values keep the code -1, as in pandas.factorize.
+    dtype = np.min_scalar_type(-len(codebook) - 1)
+    return codes.astype(dtype), pd.Index(codebook)
+
+
+class EncodedTable:
+    def __init__(
+        self, codes: Dict[str, np.ndarray], codebooks: Dict[str, pd.Index]
+    ):
+        self.codes = codes
+        self.codebooks = codebooks
+        self.__classIdCache = {}
+
+    @staticmethod
+    def fromDataFrame(dataFrame: pd.DataFrame) -> "EncodedTable":
+        codes = {}
+        codebooks = {}
+        for columnName, column in dataFrame.items():
+            codes[columnName], codebooks[columnName] = _encodeColumn(column)
+
+        return EncodedTable(codes, codebooks)
+
+    @staticmethod
+    def fromCsv(
+        path: PathLike, delimiter: str, cache: bool = None, **options
+    ) -> "EncodedTable":
+        def readDataFrame() -> pd.DataFrame:
+            return pd.read_csv(path, sep=delimiter, **options)
+
+        if cache is None:
+            cache = isDatasetCacheEnabled()
+        if cache:
+            return loadCachedTable(
+                path, {"delimiter": delimiter, **options}, readDataFrame
+            )
+        return EncodedTable.fromDataFrame(readDataFrame())
+
+    def save(self, directory: PathLike) -> None:
+        for index, columnName in enumerate(self.codes):
+            np.save(
+                join(directory, f"codes-{index}.npy"), self.codes[columnName]
+            )
+
+            # Text is stored as fixed-width unicode, which needs no pickle.
+            # Any other object would come back as its text, so it is refused.
+            codebook = self.codebooks[columnName].to_numpy()
+            if codebook.dtype == object:
+                if not all(isinstance(value, str) for value in codebook):
+                    raise TypeError(
+                        f"Column {columnName} holds values that are not text"
+                    )
+                codebook = codebook.astype(str)
+            np.save(join(directory, f"codebook-{index}.npy"), codebook)
+
+    @staticmethod
+    def load(directory: PathLike, columns: List[str]) -> "EncodedTable":
+        # Codes are mapped rather than read, so that every process opening
+        # the same table shares its pages.
+        codes = {}
+        codebooks = {}
+        for index, columnName in enumerate(columns):
+            codes[columnName] = np.load(
+                join(directory, f"codes-{index}.npy"), mmap_mode="r"
+            )
+            codebooks[columnName] = pd.Index(
+                np.load(join(directory, f"codebook-{index}.npy"))
+            )
+
+        return EncodedTable(codes, codebooks)
+
+    def __len__(self) -> int:
+        return len(next(iter(self.codes.values()), ()))
+
+    @property
+    def columns(self) -> List[str]:
+        return list(self.codes)
+
+    def getCode(self, columnName: str, value) -> int:
+        return int(self.codebooks[columnName].get_indexer([value])[0])
+
+    def decode(self, columnName: str) -> pd.Series:
+        codebook = pd.Series(self.codebooks[columnName], name=columnName)
+        return codebook.reindex(self.codes[columnName]).reset_index(drop=True)
+
+    def toDataFrame(self) -> pd.DataFrame:
+        return pd.DataFrame(
+            {columnName: self.decode(columnName) for columnName in self.codes}
+        )
+
+    def isSuppressed(self, columnNames: List[str], value: str = "*"):
+        isSuppressed = np.ones(len(self), dtype=bool)
+        for columnName in columnNames:
+            isSuppressed &= self.codes[columnName] == self.getCode(
+                columnName, value
+            )
+        return isSuppressed
+
+    def getClassIds(self, columnNames: List[str]) -> Tuple[np.ndarray, int]:
+        key = tuple(columnNames)
+        if key not in self.__classIdCache:
+            self.__classIdCache[key] = self.__computeClassIds(columnNames)
+        return self.__classIdCache[key]
+
+    def __computeClassIds(
+        self, columnNames: List[str]
+    ) -> Tuple[np.ndarray, int]:
+        isComplete = np.ones(len(self), dtype=bool)
+        packedKeys = np.zeros(len(self), dtype=np.int64)
+        numOfKeys = 1
+        for columnName in columnNames:
+            codes = self.codes[columnName]
+            numOfValues = max(len(self.codebooks[columnName]), 1)
+
+            if numOfKeys * numOfValues > MAX_PACKED_KEY:
+                _, packedKeys = np.unique(packedKeys, return_inverse=True)
+                packedKeys = packedKeys.reshape(-1)
+                numOfKeys = int(packedKeys.max(initial=0)) + 1
+
+            isComplete &= codes >= 0
+            numOfKeys *= numOfValues
+            packedKeys = packedKeys * numOfValues + codes
+
+        # Rows with a missing key value belong to no class, like groupby.
+        classIds = np.full(len(self), -1, dtype=np.int64)
+        uniqueKeys, classIds[isComplete] = np.unique(
+            packedKeys[isComplete], return_inverse=True
+        )
+        return classIds, len(uniqueKeys)
+
+    def getClassSizes(self, columnNames: List[str]) -> np.ndarray:
+        classIds, numOfClasses = self.getClassIds(columnNames)
+        return np.bincount(classIds[classIds >= 0], minlength=numOfClasses)
+
+    def countDistinctValues(
+        self, columnNames: List[str], valueColumnName: str
+    ) -> np.ndarray:
+        classIds, numOfClasses = self.getClassIds(columnNames)
+        valueCodes = self.codes[valueColumnName].astype(np.int64)
+        numOfValues = max(len(self.codebooks[valueColumnName]), 1)
+
+        isPresent = (classIds >= 0) & (valueCodes >= 0)
+        pairs = np.unique(
+            classIds[isPresent] * numOfValues + valueCodes[isPresent]
+        )
+        return np.bincount(pairs // numOfValues, minlength=numOfClasses)
+
+
+def asEncodedTable(data: Union[pd.DataFrame, EncodedTable]) -> EncodedTable:
+    if isinstance(data, EncodedTable):
+        return data
+    return EncodedTable.fromDataFrame(data)
+
+
+def countSharedClasses(
+    populationTable: pd.DataFrame,
+    sampleTable: pd.DataFrame,
+    qiNames: List[str],
+) -> Tuple[np.ndarray, np.ndarray]:
+    # Encode both tables together so that their class ids agree.
+    combinedTable = EncodedTable.fromDataFrame(
+        pd.concat(
+            [populationTable[qiNames], sampleTable[qiNames]],
+            ignore_index=True,
+        )
+    )
+    classIds, numOfClasses = combinedTable.getClassIds(qiNames)
+    populationClassIds = classIds[: len(populationTable)]
+    sampleClassIds = classIds[len(populationTable) :]
+
+    populationCounts = np.bincount(
+        populationClassIds[populationClassIds >= 0], minlength=numOfClasses
+    )
+    sampleCounts = np.bincount(
+        sampleClassIds[sampleClassIds >= 0], minlength=numOfClasses
+    )
+    return populationCounts, sampleCounts
+
+
+def readCsv(
+    path: PathLike, delimiter: str, cache: bool = None, **options
+) -> pd.DataFrame:
+    if cache is None:
+        cache = isDatasetCacheEnabled()
+    if cache:
+        return EncodedTable.fromCsv(
+            path, delimiter, True, **options
+        ).toDataFrame()
+    return pd.read_csv(path, sep=delimiter, **options)
+
+
+def isDatasetCacheEnabled() -> bool:
+    return environ.get(DATASET_CACHE_VARIABLE, "") not in ("", "0")
+
+
+def __getCacheDirectory(path: PathLike, readOptions: dict) -> str:
+    optionKey = sha1(
+        json.dumps(readOptions, sort_keys=True, default=str).encode()
+    ).hexdigest()[:16]
+    return join(dirname(path), f".{basename(path)}.cache", optionKey)
+
+
+def __getFileStamp(path: PathLike) -> Dict[str, int]:
+    status = stat(path)
+    return {"mtime": status.st_mtime_ns, "size": status.st_size}
+
+
+def loadCachedTable(
+    path: PathLike,
+    readOptions: dict,
+    readDataFrame: Callable[[], pd.DataFrame],
+) -> EncodedTable:
+    cacheDirectory = __getCacheDirectory(path, readOptions)
+    fileStamp = __getFileStamp(path)
+
+    try:
+        with open(join(cacheDirectory, DATASET_CACHE_METADATA)) as file:
+            metadata = json.load(file)
+        if metadata["file"] == fileStamp:
+            return EncodedTable.load(cacheDirectory, metadata["columns"])
+    except (OSError, ValueError, KeyError):
+        pass
+
+    table = EncodedTable.fromDataFrame(readDataFrame())
+
+    # Write into a scratch directory first, so that readers never see a
+    # partially written cache.
+    try:
+        makedirs(dirname(cacheDirectory), exist_ok=True)
+        scratchDirectory = mkdtemp(dir=dirname(cacheDirectory))
+        chmod(scratchDirectory, 0o755)
+    except OSError:
+        return table
+
+    try:
+        table.save(scratchDirectory)
+        with open(join(scratchDirectory, DATASET_CACHE_METADATA), "w") as file:
+            json.dump({"file": fileStamp, "columns": table.columns}, file)
+
+        rmtree(cacheDirectory, ignore_errors=True)
+        rename(scratchDirectory, cacheDirectory)
+    except (OSError, TypeError):
+        rmtree(scratchDirectory, ignore_errors=True)
+
+    return table
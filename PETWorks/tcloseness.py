@@ -1,144 +1,287 @@
+from os import PathLike
+
 import pandas as pd
 
 from PETWorks.arx import (
+    Hierarchy,
+    JavaApi,
+    PrivacyModel,
     loadDataHierarchyNatively,
     getAttributeNameByType,
     loadDataFromCsv,
     loadDataHierarchy,
     setDataHierarchies,
-    JavaApi,
+    javaApiSession,
     getDataFrame,
     anonymizeData,
 )
 from PETWorks.attributetypes import SENSITIVE_ATTRIBUTE, QUASI_IDENTIFIER
+from PETWorks.generalization import Generalizer
+from PETWorks.lattice import (
+    ClassAggregates,
+    PrivacyCriterion,
+    anonymizeNatively,
+    factorizeValues,
+)
+from PETWorks.parallel import runInParallel
+from PETWorks.table import EncodedTable, asEncodedTable, readCsv
 import numpy as np
-from math import fabs
-from typing import Dict
+from typing import Dict, Iterator, List, NamedTuple, Optional, Union
 
+MAX_DISTRIBUTION_BATCH_SIZE = 1 << 22
 
-def _computeHierarchicalDistance(
-    dataDistribution: dict[str, float],
-    groupDistribution: dict[str, float],
+
+class _HierarchyLevel(NamedTuple):
+    numOfNodes: int
+    childOrder: np.ndarray
+    childStarts: np.ndarray
+    hasChildren: np.ndarray
+
+
+def _compileHierarchy(
     sensitiveHierarchy: np.chararray,
-) -> float:
+) -> List[_HierarchyLevel]:
     hierarchyWidth, hierarchyHeight = sensitiveHierarchy.shape
 
-    extraArray = np.zeros((hierarchyWidth, hierarchyHeight), dtype=np.float32)
-    costArray = np.zeros((hierarchyWidth, hierarchyHeight), dtype=np.float32)
+    # Every row is a leaf node. Upper nodes are represented by the first row
+    # carrying their value, and each level maps its children to a parent.
+    levels = []
+    representativeRows = np.arange(hierarchyWidth)
+    for currentHeight in range(1, hierarchyHeight):
+        uniqueValues, firstRows, rowCodes = np.unique(
+            sensitiveHierarchy[:, currentHeight],
+            return_index=True,
+            return_inverse=True,
+        )
+        parentIndices = rowCodes.reshape(-1)[representativeRows]
+
+        numOfNodes = len(uniqueValues)
+        numOfChildren = np.bincount(parentIndices, minlength=numOfNodes)
+        hasChildren = numOfChildren > 0
+        childStarts = (np.cumsum(numOfChildren) - numOfChildren)[hasChildren]
+
+        levels.append(
+            _HierarchyLevel(
+                numOfNodes,
+                np.argsort(parentIndices, kind="stable"),
+                childStarts,
+                hasChildren,
+            )
+        )
+        representativeRows = firstRows
 
-    # loop through hierarchy height from 0
-    for currentHeight in range(hierarchyHeight):
-        for rowIndex in range(hierarchyWidth):
-            # if leaf
-            if currentHeight == 0:
-                costArray[rowIndex, currentHeight] = 0.0
+    return levels
 
-                value = sensitiveHierarchy[rowIndex, 0]
-                extra = groupDistribution.get(value, 0) - dataDistribution.get(
-                    value, 0
-                )
-                extraArray[rowIndex, currentHeight] = extra
-                continue
-
-            # if not leaf
-            uniqueValues = np.unique(sensitiveHierarchy[:, currentHeight])
-            for value in uniqueValues:
-                rowIndicesWithMatchedValue = np.where(
-                    sensitiveHierarchy[:, currentHeight] == value
-                )[0]
-                extraSubset = extraArray[
-                    rowIndicesWithMatchedValue, currentHeight - 1
-                ]
-                maskForPositiveExtras = extraSubset > 0
-                maskForNegativeExtras = extraSubset < 0
-
-                positiveExtrasSum = np.sum(extraSubset[maskForPositiveExtras])
-                negativeExtrasSum = -1 * np.sum(
-                    extraSubset[maskForNegativeExtras]
-                )
 
-                extraArray[rowIndicesWithMatchedValue[0], currentHeight] = (
-                    positiveExtrasSum - negativeExtrasSum
-                )
+def _sumByParent(values: np.ndarray, level: _HierarchyLevel) -> np.ndarray:
+    sums = np.zeros((len(values), level.numOfNodes))
+    if values.shape[1] > 0:
+        sums[:, level.hasChildren] = np.add.reduceat(
+            values[:, level.childOrder], level.childStarts, axis=1
+        )
+    return sums
 
-                cost = float(currentHeight) * min(
-                    positiveExtrasSum, negativeExtrasSum
-                )
-                cost /= hierarchyHeight - 1
-                costArray[rowIndicesWithMatchedValue[0], currentHeight] = cost
 
-    return float(np.sum(costArray))
+def _computeHierarchicalDistances(
+    extras: np.ndarray,
+    hierarchyLevels: List[_HierarchyLevel],
+) -> np.ndarray:
+    hierarchyHeight = len(hierarchyLevels) + 1
 
+    distances = np.zeros(len(extras))
+    for currentHeight, level in enumerate(hierarchyLevels, start=1):
+        positiveExtrasSum = _sumByParent(np.maximum(extras, 0), level)
+        negativeExtrasSum = _sumByParent(np.maximum(-extras, 0), level)
 
-def _computeNumericalDistance(
-    dataDistribution: dict[str, float],
-    groupDistribution: dict[str, float],
-    originalSensitiveData: pd.Series,
+        extras = positiveExtrasSum - negativeExtrasSum
+
+        costs = np.minimum(positiveExtrasSum, negativeExtrasSum).sum(axis=1)
+        distances += float(currentHeight) * costs / (hierarchyHeight - 1)
+
+    return distances
+
+
+def _sumAbsoluteArithmeticSeries(
+    start: np.ndarray, step: np.ndarray, count: np.ndarray
+) -> np.ndarray:
+    # Sum of |start + index * step| for index in range(count), elementwise.
+    def partialSum(length: np.ndarray) -> np.ndarray:
+        return length * start + step * length * (length - 1) / 2
+
+    total = partialSum(count)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        root = -start / step
+    numOfNegativeTerms = np.clip(np.ceil(root), 0, count)
+    numOfPositiveTerms = np.clip(np.floor(root) + 1, 0, count)
+
+    return np.select(
+        [step > 0, step < 0],
+        [
+            total - 2 * partialSum(numOfNegativeTerms),
+            2 * partialSum(numOfPositiveTerms) - total,
+        ],
+        count * np.abs(start),
+    )
+
+
+def _computeNumericalDistances(
+    extras: np.ndarray, valueCounts: np.ndarray
+) -> np.ndarray:
+    # Every value is repeated by its count in the sorted original column,
+    # so the prefix sums grow linearly inside each run of equal values.
+    runExtras = extras * valueCounts
+    prefixSums = np.cumsum(runExtras, axis=1) - runExtras
+
+    distances = _sumAbsoluteArithmeticSeries(
+        prefixSums, extras, valueCounts
+    ).sum(axis=1)
+    return distances / (valueCounts.sum() - 1)
+
+
+class _ClassDistributions(NamedTuple):
+    classSizes: np.ndarray
+    pairClassIds: np.ndarray
+    pairValueCodes: np.ndarray
+    values: pd.Index
+
+
+def _getClassDistributions(
+    anonymizedData: EncodedTable,
+    sensitiveAttributeName: str,
+    qiNames: list[str],
+) -> _ClassDistributions:
+    classIds, _ = anonymizedData.getClassIds(qiNames)
+    valueCodes = anonymizedData.codes[sensitiveAttributeName].astype(int)
+    values = anonymizedData.codebooks[sensitiveAttributeName]
+
+    isGrouped = classIds >= 0
+    classSizes = np.bincount(classIds[isGrouped])
+
+    isPresent = isGrouped & (valueCodes >= 0)
+    numOfValues = len(values)
+    pairs = np.unique(
+        classIds[isPresent] * numOfValues + valueCodes[isPresent]
+    )
+
+    return _ClassDistributions(
+        classSizes,
+        pairs // max(numOfValues, 1),
+        pairs % max(numOfValues, 1),
+        pd.Index(values),
+    )
+
+
+def _iterateClassDistributions(
+    distributions: _ClassDistributions, domain: np.ndarray
+) -> Iterator[np.ndarray]:
+    numOfClasses = len(distributions.classSizes)
+    numOfValues = len(distributions.values)
+
+    # Values missing from the anonymized data point at the zero column.
+    domainIndices = distributions.values.get_indexer(domain)
+    domainIndices[domainIndices < 0] = numOfValues
+
+    batchSize = max(1, MAX_DISTRIBUTION_BATCH_SIZE // (numOfValues + 1))
+    batchBoundaries = np.searchsorted(
+        distributions.pairClassIds,
+        np.arange(0, numOfClasses + batchSize, batchSize),
+    )
+
+    for batchIndex, classStart in enumerate(range(0, numOfClasses, batchSize)):
+        classEnd = min(classStart + batchSize, numOfClasses)
+        pairStart, pairEnd = batchBoundaries[batchIndex : batchIndex + 2]
+
+        batch = np.zeros((classEnd - classStart, numOfValues + 1))
+        batch[
+            distributions.pairClassIds[pairStart:pairEnd] - classStart,
+            distributions.pairValueCodes[pairStart:pairEnd],
+        ] = 1
+        batch /= distributions.classSizes[classStart:classEnd, np.newaxis]
+
+        yield batch[:, domainIndices]
+
+
+def _computeHierarchicalTCloseness(
+    originalValues: pd.Series,
+    distributions: _ClassDistributions,
+    sensitiveHierarchy: np.chararray,
 ) -> float:
-    originalSensitiveData = originalSensitiveData.sort_values(
-        ascending=True, key=lambda x: pd.to_numeric(x, errors="coerce")
+    leaves = sensitiveHierarchy[:, 0]
+
+    isOriginalLeaf = pd.Index(originalValues.dropna().unique()).get_indexer(
+        leaves
     )
-    numRows = len(originalSensitiveData)
+    dataDistribution = np.where(
+        isOriginalLeaf >= 0, 1 / originalValues.nunique(), 0.0
+    )
+
+    hierarchyLevels = _compileHierarchy(sensitiveHierarchy)
+
+    maxDistance = float("-inf")
+    for groupDistributions in _iterateClassDistributions(
+        distributions, leaves
+    ):
+        distances = _computeHierarchicalDistances(
+            groupDistributions - dataDistribution, hierarchyLevels
+        )
+        maxDistance = max(maxDistance, float(distances.max()))
 
-    valueList = sorted(
-        [originalSensitiveData[index] for index in range(numRows)],
-        key=lambda x: pd.to_numeric(x),
+    return maxDistance
+
+
+def _computeOrderedTCloseness(
+    originalValues: pd.Series,
+    distributions: _ClassDistributions,
+) -> float:
+    valueCounts = originalValues.value_counts(sort=False)
+    order = np.argsort(
+        pd.to_numeric(valueCounts.index).to_numpy(), kind="stable"
     )
+    sortedValues = valueCounts.index.to_numpy()[order]
+    dataDistribution = 1 / len(valueCounts)
 
-    extraList = [
-        float(groupDistribution.get(value, 0) - dataDistribution.get(value, 0))
-        for value in valueList
-    ]
+    # Missing values sort last and neither distribution covers them.
+    sortedValueCounts = np.append(
+        valueCounts.to_numpy()[order], originalValues.isna().sum()
+    )
 
-    distance = 0.0
-    for index in range(numRows):
-        sum = 0
-        for subIndex in range(index):
-            sum += extraList[subIndex]
-        distance += fabs(sum)
-    distance /= numRows - 1
+    maxDistance = float("-inf")
+    for groupDistributions in _iterateClassDistributions(
+        distributions, sortedValues
+    ):
+        extras = np.pad(
+            groupDistributions - dataDistribution, ((0, 0), (0, 1))
+        )
+        distances = _computeNumericalDistances(extras, sortedValueCounts)
+        maxDistance = max(maxDistance, float(distances.max()))
 
-    return distance
+    return maxDistance
 
 
 def _computeTCloseness(
     originalData: pd.DataFrame,
-    anonymizedData: pd.DataFrame,
+    anonymizedData: Union[pd.DataFrame, EncodedTable],
     sensitiveAttributeName: str,
     qiNames: list[str],
     sensitiveHierarchy: np.chararray,
 ) -> float:
-    dataDistribution = dict(
-        originalData[sensitiveAttributeName].value_counts() * 0
-        + 1 / originalData[sensitiveAttributeName].nunique()
+    distributions = _getClassDistributions(
+        asEncodedTable(anonymizedData), sensitiveAttributeName, qiNames
     )
-    anonymizedGroups = anonymizedData.groupby(qiNames)
+    originalValues = originalData[sensitiveAttributeName]
 
-    maxHierarchicalDistance = float("-inf")
-    for _, group in anonymizedGroups:
-        groupDistribution = dict(
-            group[sensitiveAttributeName].value_counts() * 0 + 1 / len(group)
+    if sensitiveHierarchy is not None:
+        return _computeHierarchicalTCloseness(
+            originalValues, distributions, sensitiveHierarchy
         )
-        if sensitiveHierarchy is not None:
-            distance = _computeHierarchicalDistance(
-                dataDistribution, groupDistribution, sensitiveHierarchy
-            )
-        else:
-            distance = _computeNumericalDistance(
-                dataDistribution,
-                groupDistribution,
-                originalData[sensitiveAttributeName],
-            )
 
-        if distance > maxHierarchicalDistance:
-            maxHierarchicalDistance = distance
-
-    return maxHierarchicalDistance
+    return _computeOrderedTCloseness(originalValues, distributions)
 
 
 def measureTCloseness(
     originalData: pd.DataFrame,
-    anonymizedData: pd.DataFrame,
+    anonymizedData: Union[pd.DataFrame, EncodedTable],
     sensitiveAttributeName: str,
     qiNames: list[str],
     sensitiveHierarchy: np.chararray,
@@ -163,92 +306,260 @@ def measureTCloseness(
     )
 
 
-def _validateTCloseness(tFromData: float, tLimit: float) -> bool:
+def validateTCloseness(tFromData: float, tLimit: float) -> bool:
     return tFromData < tLimit
 
 
 def PETValidation(
-    original, anonymized, _, dataHierarchy, attributeTypes, tLimit, **other
+    original,
+    anonymized,
+    _,
+    dataHierarchy,
+    attributeTypes,
+    tLimit,
+    numOfProcess=1,
+    **other,
 ):
     tLimit = float(tLimit)
 
     dataHierarchy = loadDataHierarchyNatively(dataHierarchy, ";")
-    originalData = pd.read_csv(original, sep=";", skipinitialspace=True)
-    anonymizedData = pd.read_csv(anonymized, sep=";", skipinitialspace=True)
+    originalData = readCsv(original, ";", skipinitialspace=True)
+    anonymizedData = EncodedTable.fromCsv(
+        anonymized, ";", skipinitialspace=True
+    )
 
     qiNames = getAttributeNameByType(attributeTypes, QUASI_IDENTIFIER)
     sensitiveAttributes = getAttributeNameByType(
         attributeTypes, SENSITIVE_ATTRIBUTE
     )
 
-    tList = [
-        measureTCloseness(
-            originalData,
-            anonymizedData,
-            sensitiveAttribute,
-            qiNames,
-            dataHierarchy,
-        )
-        for sensitiveAttribute in sensitiveAttributes
-    ]
+    # Every sensitive attribute is measured over the same classes, so they
+    # are grouped once before the measurements fan out.
+    anonymizedData.getClassIds(qiNames)
+    tList = runInParallel(
+        [
+            (
+                measureTCloseness,
+                (
+                    originalData,
+                    anonymizedData,
+                    sensitiveAttribute,
+                    qiNames,
+                    dataHierarchy[sensitiveAttribute],
+                ),
+            )
+            for sensitiveAttribute in sensitiveAttributes
+        ],
+        numOfProcess,
+    )
 
-    fulfillTCloseness = all(_validateTCloseness(t, tLimit) for t in tList)
+    fulfillTCloseness = all(validateTCloseness(t, tLimit) for t in tList)
 
     return {"t": tLimit, "fulfill t-closeness": fulfillTCloseness}
 
 
+class TClosenessCriterion(PrivacyCriterion):
+    # Merging a close class with a distant one may leave the merged class
+    # distant, so generalizing can suppress more records.
+    isMonotonicWithSuppression = False
+
+    def __init__(
+        self,
+        originalValues: pd.Series,
+        t: float,
+        sensitiveHierarchy: Optional[np.ndarray],
+    ):
+        self.sensitiveAttribute = originalValues.name
+        self.t = t
+
+        valueCodes, values = factorizeValues(originalValues)
+        if sensitiveHierarchy is None:
+            # Ordered distance between the sorted distinct values.
+            self.hierarchyLevels = None
+            order = np.argsort(pd.to_numeric(values), kind="stable")
+            self.columns = np.empty(len(values), dtype=np.int64)
+            self.columns[order] = np.arange(len(values))
+            numOfColumns = len(values)
+        else:
+            # Hierarchical distance between the leaves of the hierarchy.
+            self.hierarchyLevels = _compileHierarchy(sensitiveHierarchy)
+            leafRows = {}
+            for row, leaf in enumerate(sensitiveHierarchy[:, 0].tolist()):
+                leafRows.setdefault(leaf, row)
+            self.columns = np.array(
+                [leafRows.get(value, -1) for value in values.tolist()],
+                dtype=np.int64,
+            )
+            if (self.columns < 0).any():
+                raise ValueError(
+                    f"Values of {self.sensitiveAttribute} are missing from "
+                    "its hierarchy"
+                )
+            numOfColumns = len(sensitiveHierarchy)
+
+        valueCounts = np.bincount(
+            valueCodes[valueCodes >= 0], minlength=len(values)
+        )
+        self.dataDistribution = np.zeros(numOfColumns)
+        self.dataDistribution[self.columns] = valueCounts / max(
+            valueCounts.sum(), 1
+        )
+
+    def __measureDistances(self, extras: np.ndarray) -> np.ndarray:
+        if self.hierarchyLevels is not None:
+            return _computeHierarchicalDistances(extras, self.hierarchyLevels)
+
+        numOfColumns = extras.shape[1]
+        return np.abs(np.cumsum(extras, axis=1)).sum(axis=1) / max(
+            numOfColumns - 1, 1
+        )
+
+    def findViolatingClasses(self, aggregates: ClassAggregates) -> np.ndarray:
+        pairClassIds, pairValueCodes, pairCounts = aggregates.countValues(
+            self.sensitiveAttribute
+        )
+        numOfClasses = len(aggregates.classSizes)
+        numOfColumns = len(self.dataDistribution)
+
+        batchSize = max(1, MAX_DISTRIBUTION_BATCH_SIZE // numOfColumns)
+        batchBoundaries = np.searchsorted(
+            pairClassIds, np.arange(0, numOfClasses + batchSize, batchSize)
+        )
+
+        isViolating = np.zeros(numOfClasses, dtype=bool)
+        for batchIndex, classStart in enumerate(
+            range(0, numOfClasses, batchSize)
+        ):
+            classEnd = min(classStart + batchSize, numOfClasses)
+            pairStart, pairEnd = batchBoundaries[batchIndex : batchIndex + 2]
+
+            distributions = np.zeros((classEnd - classStart, numOfColumns))
+            distributions[
+                pairClassIds[pairStart:pairEnd] - classStart,
+                self.columns[pairValueCodes[pairStart:pairEnd]],
+            ] = pairCounts[pairStart:pairEnd]
+            distributions /= aggregates.classSizes[classStart:classEnd, None]
+
+            isViolating[classStart:classEnd] = (
+                self.__measureDistances(distributions - self.dataDistribution)
+                > self.t
+            )
+
+        return isViolating
+
+
+def _createTClosenessCriteria(
+    generalizer: Generalizer, attributeTypes: Dict[str, str], t: float
+) -> List[PrivacyCriterion]:
+    criteria = []
+    for attributeName, attributeType in attributeTypes.items():
+        if attributeType != SENSITIVE_ATTRIBUTE:
+            continue
+
+        originalValues = generalizer.originalData[attributeName]
+        isNumerical = True
+        try:
+            float(originalValues.iloc[0])
+        except ValueError:
+            isNumerical = False
+
+        criteria.append(
+            TClosenessCriterion(
+                originalValues,
+                float(t),
+                (
+                    None
+                    if isNumerical
+                    else generalizer.hierarchies[attributeName].values
+                ),
+            )
+        )
+
+    return criteria
+
+
+def createArxPrivacyModels(
+    originalData: PathLike,
+    dataHierarchy: Dict[str, Hierarchy],
+    attributeTypes: Dict[str, str],
+    t: float,
+    javaApi: JavaApi,
+) -> List[PrivacyModel]:
+    # Only the first value decides whether an attribute is numerical.
+    firstRow = pd.read_csv(
+        originalData, sep=";", skipinitialspace=True, nrows=1
+    )
+
+    privacyModels = []
+    for attributeName in getAttributeNameByType(
+        attributeTypes, SENSITIVE_ATTRIBUTE
+    ):
+        isNumerical = True
+        try:
+            float(firstRow[attributeName].iloc[0])
+        except ValueError:
+            isNumerical = False
+
+        if isNumerical:
+            tClosenessModel = javaApi.OrderedDistanceTCloseness(
+                attributeName, float(t)
+            )
+        else:
+            tClosenessModel = javaApi.HierarchicalDistanceTCloseness(
+                attributeName,
+                float(t),
+                dataHierarchy.get(attributeName),
+            )
+
+        privacyModels.append(tClosenessModel)
+
+    return privacyModels
+
+
 def PETAnonymization(
     originalData: str,
     dataHierarchy: str,
     attributeTypes: Dict[str, str],
     maxSuppressionRate: float,
     t: float,
+    engine: str = "arx",
 ) -> pd.DataFrame:
-    javaApi = JavaApi()
-    originalDataFrame = pd.read_csv(
-        originalData, sep=";", skipinitialspace=True
-    )
-
-    originalData = loadDataFromCsv(
-        originalData, javaApi.StandardCharsets.UTF_8, ";", javaApi
-    )
-
-    dataHierarchy = loadDataHierarchy(
-        dataHierarchy, javaApi.StandardCharsets.UTF_8, ";", javaApi
-    )
+    if engine == "native":
+        return anonymizeNatively(
+            originalData,
+            dataHierarchy,
+            attributeTypes,
+            float(maxSuppressionRate),
+            lambda generalizer: _createTClosenessCriteria(
+                generalizer, attributeTypes, t
+            ),
+        )
+    if engine != "arx":
+        raise ValueError(f"Unsupported engine: {engine}")
 
-    setDataHierarchies(
-        originalData, dataHierarchy, attributeTypes, javaApi, True
-    )
+    with javaApiSession() as javaApi:
+        original = loadDataFromCsv(
+            originalData, javaApi.StandardCharsets.UTF_8, ";", javaApi
+        )
 
-    privacyModels = []
-    for attributeName, attributeType in attributeTypes.items():
-        if attributeType == SENSITIVE_ATTRIBUTE:
-            isNumerical = True
-            try:
-                float(originalDataFrame[attributeName].iloc[0])
-            except ValueError:
-                isNumerical = False
-
-            if isNumerical:
-                tClosenessModel = javaApi.OrderedDistanceTCloseness(
-                    attributeName, float(t)
-                )
-            else:
-                tClosenessModel = javaApi.HierarchicalDistanceTCloseness(
-                    attributeName, float(t), dataHierarchy.get(attributeName)
-                )
+        dataHierarchy = loadDataHierarchy(
+            dataHierarchy, javaApi.StandardCharsets.UTF_8, ";", javaApi
+        )
 
-            privacyModels.append(tClosenessModel)
+        setDataHierarchies(
+            original, dataHierarchy, attributeTypes, javaApi, True
+        )
 
-    anonymizedResult = anonymizeData(
-        originalData,
-        privacyModels,
-        javaApi,
-        None,
-        float(maxSuppressionRate),
-    )
-    anonymizedData = javaApi.Data.create(
-        anonymizedResult.getOutput(True).iterator()
-    )
-    return getDataFrame(anonymizedData)
+        anonymizedResult = anonymizeData(
+            original,
+            createArxPrivacyModels(
+                originalData, dataHierarchy, attributeTypes, t, javaApi
+            ),
+            javaApi,
+            None,
+            float(maxSuppressionRate),
+        )
+        anonymizedData = javaApi.Data.create(
+            anonymizedResult.getOutput(True).iterator()
+        )
+        return getDataFrame(anonymizedData)
@@ -0,0 +1,104 @@
+from dataclasses import dataclass
+from os import makedirs
+from os.path import exists, join
+from typing import Dict
+
+import numpy as np
+import pandas as pd
+
+from PETWorks.attributetypes import (
+    INSENSITIVE_ATTRIBUTE,
+    QUASI_IDENTIFIER,
+    SENSITIVE_ATTRIBUTE,
+)
+from PETWorks.generalization import Generalizer, readDataFrameFromCsv
+from PETWorks.hierarchy import loadCompiledHierarchies
+
+ADULT_DATA_PATH = "data/adult.csv"
+ADULT_HIERARCHY_PATH = "data/adult_hierarchy"
+SUBSET_FRACTION = 0.1
+RELEASE_K = 5
+
+ATTRIBUTE_TYPES = {
+    "age": QUASI_IDENTIFIER,
+    "education": QUASI_IDENTIFIER,
+    "marital-status": QUASI_IDENTIFIER,
+    "native-country": QUASI_IDENTIFIER,
+    "race": QUASI_IDENTIFIER,
+    "sex": QUASI_IDENTIFIER,
+    "occupation": SENSITIVE_ATTRIBUTE,
+    "workclass": INSENSITIVE_ATTRIBUTE,
+    "salary-class": INSENSITIVE_ATTRIBUTE,
+}
+
+
+@dataclass
+class SyntheticDataset:
+    numOfRows: int
+    originalData: str
+    subsetData: str
+    anonymizedData: str
+    anonymizedSubsetData: str
+    dataHierarchy: str = ADULT_HIERARCHY_PATH
+
+
+def getAllQiAttributeTypes() -> Dict[str, str]:
+    # The same order as the config generator walks the hierarchies in.
+    return {
+        attributeName: QUASI_IDENTIFIER
+        for attributeName in loadCompiledHierarchies(ADULT_HIERARCHY_PATH, ";")
+    }
+
+
+def __release(data: pd.DataFrame, hierarchies: dict, path: str) -> None:
+    generalizer = Generalizer(data, hierarchies, ATTRIBUTE_TYPES)
+    levels = [
+        (hierarchies[qiName].height - 1) // 2 for qiName in generalizer.qiNames
+    ]
+    release = generalizer.apply(levels, RELEASE_K, suppressionLimit=1.0)
+    release.to_csv(path, sep=";", index=False)
+
+
+def generateSyntheticDataset(
+    directory: str, numOfRows: int, seed: int = 0
+) -> SyntheticDataset:
+    directory = join(directory, f"adult-{numOfRows}-{seed}")
+    dataset = SyntheticDataset(
+        numOfRows,
+        join(directory, "original.csv"),
+        join(directory, "subset.csv"),
+        join(directory, "anonymized.csv"),
+        join(directory, "anonymized_subset.csv"),
+    )
+    if exists(dataset.anonymizedSubsetData):
+        return dataset
+
+    makedirs(directory, exist_ok=True)
+
+    # Every column is drawn from its own distribution in the adult data, so
+    # the values stay covered by the adult hierarchies while the number of
+    # distinct records keeps growing with the size.
+    adult = readDataFrameFromCsv(ADULT_DATA_PATH, ";")
+    generator = np.random.default_rng(seed)
+    original = pd.DataFrame(
+        {
+            attributeName: generator.choice(values.to_numpy(), numOfRows)
+            for attributeName, values in adult.items()
+        }
+    )
+    subset = original.sample(
+        frac=SUBSET_FRACTION, random_state=seed
+    ).sort_index()
+
+    original.to_csv(dataset.originalData, sep=";", index=False)
+    subset.to_csv(dataset.subsetData, sep=";", index=False)
+
+    hierarchies = loadCompiledHierarchies(dataset.dataHierarchy, ";")
+    __release(original, hierarchies, dataset.anonymizedData)
+    __release(
+        subset.reset_index(drop=True),
+        hierarchies,
+        dataset.anonymizedSubsetData,
+    )
+
+    return dataset
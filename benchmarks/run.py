@@ -0,0 +1,451 @@
+import argparse
+import json
+import platform
+import resource
+import subprocess
+import sys
+import time
+from contextlib import redirect_stdout
+from dataclasses import dataclass
+from glob import glob
+from io import StringIO
+from multiprocessing import get_context
+from os import getpid
+from os.path import join
+from tempfile import TemporaryDirectory, mkdtemp
+from typing import Callable, Dict, List, Optional, Tuple
+
+import pandas as pd
+from py4j.java_gateway import GatewayClient
+
+import PETWorks
+from PETWorks.autoturn import (
+    findQualifiedAnonymityConfigs,
+    generateAnonymityConfigs,
+)
+from benchmarks.dataset import (
+    ATTRIBUTE_TYPES,
+    SyntheticDataset,
+    generateSyntheticDataset,
+    getAllQiAttributeTypes,
+)
+
+DEFAULT_SIZES = [1_000, 10_000, 100_000, 1_000_000]
+DEFAULT_OUTPUT = "benchmarks/results.jsonl"
+FIRST_SAMPLE_COUNT = 100
+SECOND_SAMPLE_COUNT = 10
+ANALYSIS_BIAS = 0.1
+BATCH_K_VALUES = [2, 5, 10, 20]
+
+VALIDATION_PARAMETERS = {
+    "k": 5,
+    "l": 2,
+    "tLimit": 0.2,
+    "dMin": 0.0,
+    "dMax": 0.5,
+    "allowAttack": True,
+    "adversaryCost": 4,
+    "adversaryGain": 300,
+    "publisherLost": 300,
+    "publisherBenefit": 1200,
+}
+
+
+@dataclass
+class BenchmarkCase:
+    name: str
+    run: Callable[[SyntheticDataset, str], None]
+    setUp: Optional[Callable[[SyntheticDataset, str], None]] = None
+
+
+def __validate(
+    tech,
+    original: Optional[str],
+    anonymized: Optional[str],
+    inputs: Tuple[str] = ("dataHierarchy", "attributeTypes"),
+    **parameters,
+) -> Callable:
+    def run(dataset: SyntheticDataset, _) -> None:
+        availableInputs = {
+            "dataHierarchy": dataset.dataHierarchy,
+            "attributeTypes": ATTRIBUTE_TYPES,
+        }
+        PETWorks.PETValidation(
+            getattr(dataset, original) if original else None,
+            getattr(dataset, anonymized) if anonymized else None,
+            tech,
+            **{name: availableInputs[name] for name in inputs},
+            **parameters,
+        )
+
+    return run
+
+
+def __anonymize(tech, **parameters) -> Callable:
+    def run(dataset: SyntheticDataset, _) -> None:
+        options = dict(parameters)
+        if tech == "d-presence":
+            options["subsetData"] = dataset.subsetData
+
+        PETWorks.PETAnonymization(
+            dataset.originalData,
+            tech,
+            dataset.dataHierarchy,
+            ATTRIBUTE_TYPES,
+            maxSuppressionRate=0.04,
+            **options,
+        )
+
+    return run
+
+
+def __anonymizeInBatch(tech, parameterSets: List[dict]) -> Callable:
+    def run(dataset: SyntheticDataset, _) -> None:
+        for _ in PETWorks.PETBatchAnonymization(
+            dataset.originalData,
+            tech,
+            dataset.dataHierarchy,
+            ATTRIBUTE_TYPES,
+            0.04,
+            parameterSets,
+        ):
+            pass
+
+    return run
+
+
+def _measureMaleRatio(data: pd.DataFrame) -> float:
+    return float((data["sex"] == "Male").mean())
+
+
+def __generateConfigs(dataset: SyntheticDataset, workDirectory: str) -> None:
+    generateAnonymityConfigs(
+        dataset.originalData,
+        dataset.dataHierarchy,
+        join(workDirectory, "configs.csv"),
+        FIRST_SAMPLE_COUNT,
+        SECOND_SAMPLE_COUNT,
+    )
+
+
+def __findQualifiedConfigs(
+    dataset: SyntheticDataset, workDirectory: str
+) -> None:
+    findQualifiedAnonymityConfigs(
+        dataset.originalData,
+        dataset.dataHierarchy,
+        join(workDirectory, "configs.csv"),
+        getAllQiAttributeTypes(),
+        _measureMaleRatio,
+        ANALYSIS_BIAS,
+        join(workDirectory, "qualified.jsonl"),
+    )
+
+
+CASES = [
+    BenchmarkCase(
+        "validation/ReidentificationRisk",
+        __validate("ReidentificationRisk", "anonymizedData", None, inputs=()),
+    ),
+    *[
+        BenchmarkCase(
+            f"validation/{tech}",
+            __validate(tech, "originalData", "anonymizedData"),
+        )
+        for tech in ["Ambiguity", "Precision", "Non-Uniform Entropy"]
+    ],
+    BenchmarkCase(
+        "validation/AECS",
+        __validate(
+            "AECS",
+            "originalData",
+            "anonymizedData",
+            inputs=("attributeTypes",),
+        ),
+    ),
+    BenchmarkCase(
+        "validation/k-anonymity",
+        __validate(
+            "k-anonymity",
+            None,
+            "anonymizedData",
+            inputs=("attributeTypes",),
+            k=VALIDATION_PARAMETERS["k"],
+        ),
+    ),
+    BenchmarkCase(
+        "validation/l-diversity",
+        __validate(
+            "l-diversity",
+            None,
+            "anonymizedData",
+            inputs=("attributeTypes",),
+            l=VALIDATION_PARAMETERS["l"],
+        ),
+    ),
+    BenchmarkCase(
+        "validation/t-closeness",
+        __validate(
+            "t-closeness",
+            "originalData",
+            "anonymizedData",
+            tLimit=VALIDATION_PARAMETERS["tLimit"],
+        ),
+    ),
+    BenchmarkCase(
+        "validation/d-presence",
+        __validate(
+            "d-presence",
+            "originalData",
+            "anonymizedSubsetData",
+            dMin=VALIDATION_PARAMETERS["dMin"],
+            dMax=VALIDATION_PARAMETERS["dMax"],
+        ),
+    ),
+    BenchmarkCase(
+        "validation/profitability",
+        __validate(
+            "profitability",
+            "originalData",
+            "anonymizedData",
+            **{
+                name: VALIDATION_PARAMETERS[name]
+                for name in [
+                    "allowAttack",
+                    "adversaryCost",
+                    "adversaryGain",
+                    "publisherLost",
+                    "publisherBenefit",
+                ]
+            },
+        ),
+    ),
+    BenchmarkCase(
+        "validation/multi-metric",
+        __validate(
+            [
+                "k-anonymity",
+                "l-diversity",
+                "t-closeness",
+                "d-presence",
+                "profitability",
+            ],
+            "originalData",
+            "anonymizedData",
+            **VALIDATION_PARAMETERS,
+        ),
+    ),
+    BenchmarkCase(
+        "anonymization/k-anonymity", __anonymize("k-anonymity", k=5)
+    ),
+    BenchmarkCase(
+        "anonymization/k-anonymity-native",
+        __anonymize("k-anonymity", k=5, engine="native"),
+    ),
+    BenchmarkCase(
+        "anonymization/k-anonymity-batch",
+        __anonymizeInBatch("k-anonymity", [{"k": k} for k in BATCH_K_VALUES]),
+    ),
+    BenchmarkCase(
+        "anonymization/l-diversity", __anonymize("l-diversity", l=2)
+    ),
+    BenchmarkCase(
+        "anonymization/l-diversity-native",
+        __anonymize("l-diversity", l=2, engine="native"),
+    ),
+    BenchmarkCase(
+        "anonymization/t-closeness", __anonymize("t-closeness", t=0.2)
+    ),
+    BenchmarkCase(
+        "anonymization/t-closeness-native",
+        __anonymize("t-closeness", t=0.2, engine="native"),
+    ),
+    BenchmarkCase(
+        "anonymization/multi-criteria-native",
+        __anonymize(["k-anonymity", "l-diversity"], k=5, l=2),
+    ),
+    BenchmarkCase(
+        "anonymization/d-presence",
+        __anonymize("d-presence", dMin=0.0, dMax=0.2),
+    ),
+    BenchmarkCase("autotune/generateAnonymityConfigs", __generateConfigs),
+    BenchmarkCase(
+        "autotune/findQualifiedAnonymityConfigs",
+        __findQualifiedConfigs,
+        setUp=__generateConfigs,
+    ),
+]
+
+__numOfPy4jCalls = 0
+
+
+def __countPy4jCalls() -> None:
+    sendCommand = GatewayClient.send_command
+
+    def countingSendCommand(self, *arguments, **options):
+        global __numOfPy4jCalls
+        __numOfPy4jCalls += 1
+        return sendCommand(self, *arguments, **options)
+
+    GatewayClient.send_command = countingSendCommand
+
+
+def __readStatus(pid: str) -> Dict[str, str]:
+    with open(f"/proc/{pid}/status") as file:
+        return dict(line.rstrip("\n").split(":\t", 1) for line in file)
+
+
+def _measureChildrenPeakRss() -> int:
+    # The JVMs behind py4j are child processes, whose memory getrusage only
+    # reports once they have been waited for.
+    peakRss = 0
+    for path in glob("/proc/[0-9]*/status"):
+        pid = path.split("/")[2]
+        try:
+            status = __readStatus(pid)
+        except (OSError, ValueError):
+            continue
+
+        if int(status["PPid"]) == getpid() and "VmHWM" in status:
+            peakRss += int(status["VmHWM"].split()[0]) * 1024
+
+    return peakRss
+
+
+def __runCase(
+    case: BenchmarkCase, dataset: SyntheticDataset, connection
+) -> None:
+    record = {}
+    try:
+        with TemporaryDirectory(
+            prefix="petworks-benchmark-"
+        ) as workDirectory, redirect_stdout(StringIO()):
+            if case.setUp:
+                case.setUp(dataset, workDirectory)
+
+            __countPy4jCalls()
+            startRss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            start = time.perf_counter()
+            case.run(dataset, workDirectory)
+            record["wall time"] = time.perf_counter() - start
+
+        peakRss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        record["peak rss"] = peakRss * 1024
+        record["rss growth"] = (peakRss - startRss) * 1024
+        record["jvm peak rss"] = _measureChildrenPeakRss()
+        # Calls made by worker pools are not counted.
+        record["py4j calls"] = __numOfPy4jCalls
+    except Exception as error:
+        record["error"] = f"{type(error).__name__}: {error}"
+
+    connection.send(record)
+
+
+def measure(
+    case: BenchmarkCase, dataset: SyntheticDataset, timeout: float = None
+) -> dict:
+    # A fresh process per case, so that the peak memory is its own.
+    context = get_context("fork")
+    receiver, sender = context.Pipe(duplex=False)
+    process = context.Process(target=__runCase, args=(case, dataset, sender))
+    process.start()
+    # Only the child may hold the sending end, so that its death shows up
+    # here as the end of the pipe.
+    sender.close()
+
+    record = {}
+    if receiver.poll(timeout):
+        try:
+            record = receiver.recv()
+        except EOFError:
+            pass
+    else:
+        record = {"error": f"timed out after {timeout} seconds"}
+        process.terminate()
+    process.join()
+
+    if not record:
+        record = {"error": f"exited with code {process.exitcode}"}
+
+    return record
+
+
+def __getRevision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            capture_output=True,
+            check=True,
+            text=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def runBenchmarks(
+    sizes: List[int],
+    output: str,
+    caseNames: List[str] = None,
+    dataDirectory: str = None,
+    timeout: float = None,
+    seed: int = 0,
+) -> None:
+    cases = [
+        case
+        for case in CASES
+        if not caseNames or any(name in case.name for name in caseNames)
+    ]
+    dataDirectory = dataDirectory or mkdtemp(prefix="petworks-datasets-")
+    environment = {
+        "revision": __getRevision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+    }
+
+    with open(output, "a") as outFile:
+        for numOfRows in sizes:
+            dataset = generateSyntheticDataset(dataDirectory, numOfRows, seed)
+            for case in cases:
+                record = {
+                    "case": case.name,
+                    "rows": numOfRows,
+                    "timestamp": time.time(),
+                    **environment,
+                    **measure(case, dataset, timeout),
+                }
+                outFile.write(json.dumps(record) + "\n")
+                outFile.flush()
+                print(json.dumps(record), file=sys.stderr)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Benchmark the PETWorks validators and anonymizers."
+    )
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--output", default=DEFAULT_OUTPUT)
+    parser.add_argument(
+        "--cases",
+        nargs="+",
+        help="run only the cases whose names contain one of these",
+    )
+    parser.add_argument(
+        "--data-directory",
+        help="where the synthetic datasets are generated and reused",
+    )
+    parser.add_argument("--timeout", type=float, help="seconds per case")
+    parser.add_argument("--seed", type=int, default=0)
+    arguments = parser.parse_args()
+
+    runBenchmarks(
+        arguments.sizes,
+        arguments.output,
+        arguments.cases,
+        arguments.data_directory,
+        arguments.timeout,
+        arguments.seed,
+    )
+
+
+if __name__ == "__main__":
+    main()
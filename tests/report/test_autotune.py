@@ -44,7 +44,7 @@ def testGenerateAnonymityConfigs(tmp_path, simpleTestSet):
 def testFindQualifiedAnonymityConfigs(tmp_path, simpleTestSet):
     originalData, dataHierarchy, attributeTypes = simpleTestSet
     parameterSetFile = "tests/report/combination.csv"
-    output = tmp_path / "result.txt"
+    output = tmp_path / "result.jsonl"
 
     bias = 3
 
@@ -62,12 +62,55 @@ def testFindQualifiedAnonymityConfigs(tmp_path, simpleTestSet):
         numOfProcess=1,
     )
 
-    results = output.read_text().split("\n")[:-1]
-    assert len([line for line in results if line.startswith("No result")]) == 2
+    results = [json.loads(line) for line in output.read_text().splitlines()]
+    assert [result["index"] for result in results] == [0, 1, 2]
+    assert len([result for result in results if not result["metrics"]]) == 2
+
+
+def testFindQualifiedAnonymityConfigsResume(tmp_path, simpleTestSet):
+    originalData, dataHierarchy, attributeTypes = simpleTestSet
+    parameterSetFile = "tests/report/combination.csv"
+    output = tmp_path / "result.jsonl"
+
+    completedRecord = {
+        "index": 0,
+        "config": {
+            "suppressionLimit": 0.0,
+            "k": 1,
+            "level": [0, 4, 0, 0, 3, 0],
+        },
+        # No run computes None, so the record cannot have been rewritten.
+        "metrics": None,
+    }
+    output.write_text(json.dumps(completedRecord) + '\n{"index": 1, "con')
+
+    def analysisFunction(data: pd.DataFrame) -> float:
+        return len(data)
+
+    at.findQualifiedAnonymityConfigs(
+        originalData,
+        dataHierarchy,
+        parameterSetFile,
+        attributeTypes,
+        analysisFunction,
+        0,
+        output,
+        numOfProcess=1,
+        resume=True,
+    )
+
+    results = [json.loads(line) for line in output.read_text().splitlines()]
+    assert results[0] == completedRecord
+    assert [result["index"] for result in results] == [0, 1, 2]
+    assert results[2]["config"] == {
+        "suppressionLimit": 1.0,
+        "k": 9,
+        "level": [0, 1, 1, 0, 3, 1],
+    }
 
 
 def testCalculateThresholds(tmp_path):
-    resultFile = "tests/report/result.txt"
+    resultFile = "tests/report/result.jsonl"
     output = tmp_path / "thresholds.json"
 
     at.calculateThresholds(resultFile, output)
@@ -0,0 +1,29 @@
+import pytest
+
+from PETWorks.report import AnonymityConfig
+from PETWorks.report.iterator import AnonymityConfigSpace, generateConfigs
+
+
+def testGenerateConfigs():
+    configs = generateConfigs("data/adult10.csv")
+
+    assert configs.numOfDataRow == 10
+    assert len(configs) == 110
+
+
+def testAnonymityConfigSpaceIndexing():
+    configs = AnonymityConfigSpace(4)
+
+    assert configs[0] == AnonymityConfig(0.0, 1, None)
+    assert configs[5] == AnonymityConfig(0.25, 2, None)
+    assert configs[-1] == AnonymityConfig(1.0, 4, None)
+
+    with pytest.raises(IndexError):
+        configs[len(configs)]
+
+
+def testAnonymityConfigSpaceSample():
+    configs = AnonymityConfigSpace(4)
+
+    assert configs.sample(3) == [configs[0], configs[9], configs[18]]
+    assert len(AnonymityConfigSpace(30162).sample(1000)) == 1000
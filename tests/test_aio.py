@@ -0,0 +1,137 @@
+import asyncio
+
+import pytest
+
+from PETWorks.aio import PETAnonymization, PETValidation
+from PETWorks.arx import getJavaApiPool
+from PETWorks.attributetypes import QUASI_IDENTIFIER, SENSITIVE_ATTRIBUTE
+from PETWorks.generalization import readDataFrameFromCsv
+
+
+def testPETValidation(DATASET_PATH_ADULT, attributeTypesForAdult):
+    async def validate():
+        return await asyncio.gather(
+            *[
+                PETValidation(
+                    None,
+                    DATASET_PATH_ADULT["anonymizedData"],
+                    "k-anonymity",
+                    attributeTypes=attributeTypesForAdult,
+                    k=k,
+                )
+                for k in [5, 6]
+            ]
+        )
+
+    results = asyncio.run(validate())
+
+    assert [result["fulfill k-anonymity"] for result in results] == [
+        True,
+        False,
+    ]
+
+
+def testPETValidationOnGateway(DATASET_PATH_ADULT, attributeTypesForAdult):
+    result = asyncio.run(
+        PETValidation(
+            DATASET_PATH_ADULT["originalData"],
+            DATASET_PATH_ADULT["anonymizedData"],
+            "Ambiguity",
+            dataHierarchy=DATASET_PATH_ADULT["dataHierarchy"],
+            attributeTypes=attributeTypesForAdult,
+        )
+    )
+
+    assert result["ambiguity"] == 0.7271401100722763
+
+
+def testPETValidationTimeout(DATASET_PATH_ADULT, attributeTypesForAdult):
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(
+            PETValidation(
+                None,
+                DATASET_PATH_ADULT["anonymizedData"],
+                "k-anonymity",
+                timeout=0,
+                attributeTypes=attributeTypesForAdult,
+                k=5,
+            )
+        )
+
+
+def testPETAnonymizationNatively(
+    DATASET_PATH_ADULT, attributeTypesForAdultAllQi
+):
+    result = asyncio.run(
+        PETAnonymization(
+            DATASET_PATH_ADULT["originalData"],
+            "k-anonymity",
+            DATASET_PATH_ADULT["dataHierarchy"],
+            attributeTypesForAdultAllQi,
+            maxSuppressionRate=0.04,
+            k=5,
+            engine="native",
+        )
+    )
+
+    assert result.equals(readDataFrameFromCsv("data/KAnonymization.csv", ";"))
+
+
+def testPETAnonymizationTimeout(
+    DATASET_PATH_ADULT, attributeTypesForAdultAllQi
+):
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(
+            PETAnonymization(
+                DATASET_PATH_ADULT["originalData"],
+                "k-anonymity",
+                DATASET_PATH_ADULT["dataHierarchy"],
+                attributeTypesForAdultAllQi,
+                maxSuppressionRate=0.04,
+                timeout=0.5,
+                k=5,
+            )
+        )
+
+    # The cancelled job kills its gateway's JVM, so the pool stays usable.
+    with getJavaApiPool().session(timeout=60) as javaApi:
+        assert javaApi.isAlive()
+
+
+def testPETValidationConcurrently():
+    attributeTypeSets = [
+        {
+            "zipcode": QUASI_IDENTIFIER,
+            "age": QUASI_IDENTIFIER,
+            "nationality": QUASI_IDENTIFIER,
+            "condition": SENSITIVE_ATTRIBUTE,
+        },
+        {
+            "zipcode": QUASI_IDENTIFIER,
+            "age": QUASI_IDENTIFIER,
+            "condition": QUASI_IDENTIFIER,
+            "nationality": SENSITIVE_ATTRIBUTE,
+        },
+    ]
+
+    async def validate():
+        return await asyncio.gather(
+            *[
+                PETValidation(
+                    None,
+                    "data/inpatient_anonymized.csv",
+                    "l-diversity",
+                    attributeTypes=attributeTypes,
+                    l=3,
+                    numOfProcess=2,
+                )
+                for attributeTypes in attributeTypeSets
+            ]
+        )
+
+    results = asyncio.run(validate())
+
+    assert [result["fulfill l-diversity"] for result in results] == [
+        True,
+        False,
+    ]
@@ -1,5 +1,10 @@
-from typing import Dict
+import os
+import subprocess
+import sys
+from types import SimpleNamespace
+from typing import Dict, List
 
+import numpy as np
 import pandas as pd
 import pytest
 from py4j.java_collections import JavaArray
@@ -7,11 +12,15 @@ from py4j.java_collections import JavaArray
 from PETWorks.arx import (
     Data,
     JavaApi,
+    JavaApiPool,
+    createDataFromDataFrame,
+    findSubsetIndices,
     loadDataFromCsv,
     loadDataHierarchy,
     setDataHierarchies,
     anonymizeData,
     getDataFrame,
+    getDataFrameChunks,
 )
 from PETWorks.attributetypes import QUASI_IDENTIFIER, SENSITIVE_ATTRIBUTE
 
@@ -21,6 +30,24 @@ def javaApi() -> JavaApi:
     return JavaApi()
 
 
+class StubJavaApi:
+    def __init__(self):
+        self.alive = True
+
+    def isAlive(self) -> bool:
+        return self.alive
+
+    def shutdown(self) -> None:
+        self.alive = False
+
+
+@pytest.fixture
+def javaApiPool() -> JavaApiPool:
+    javaApiPool = JavaApiPool(maxSize=1, createJavaApi=StubJavaApi)
+    yield javaApiPool
+    javaApiPool.shutdown()
+
+
 @pytest.fixture(scope="module")
 def errorAttributeTypesForAdult() -> Dict[str, str]:
     attributeTypes = {
@@ -172,6 +199,62 @@ def testGetDataFrame(arxDataAdult):
     assert len(getDataFrame(arxDataAdult)) == 30162
 
 
+def testGetDataFrameChunks(arxDataAdult):
+    chunks = list(getDataFrameChunks(arxDataAdult, 10000))
+
+    assert [len(chunk) for chunk in chunks] == [10000, 10000, 10000, 162]
+    assert pd.concat(chunks, ignore_index=True).equals(
+        getDataFrame(arxDataAdult)
+    )
+
+
+def testCreateDataFromDataFrame(javaApi):
+    dataFrame = pd.DataFrame({"sex": ["Male", "Female"], "age": ["39", "50"]})
+
+    data = createDataFromDataFrame(dataFrame, javaApi)
+
+    assert getDataFrame(data).equals(dataFrame)
+
+
+def findSubsetIndicesByMask(
+    tableDataFrame: pd.DataFrame,
+    subsetDataFrame: pd.DataFrame,
+    qiNames: List[str],
+) -> List[int]:
+    subsetIndices = []
+    for _, subsetGroup in subsetDataFrame.groupby(qiNames):
+        filter = pd.Series(True, index=range(len(tableDataFrame)))
+        for qiName in qiNames:
+            filter &= tableDataFrame[qiName] == subsetGroup[qiName].iloc[0]
+        subsetIndices += np.flatnonzero(filter).tolist()[: len(subsetGroup)]
+    return subsetIndices
+
+
+def testFindSubsetIndices():
+    tableDataFrame = pd.DataFrame(
+        {
+            "zip": ["1305*", "1485*", "1305*", "1306*", "1305*", "1485*"],
+            "age": ["<=40", ">40", "<=40", "<=40", "<=40", ">40"],
+            "disease": ["flu", "cold", "flu", "cancer", "cold", "flu"],
+        }
+    )
+    subsetDataFrame = pd.DataFrame(
+        {
+            "zip": ["1485*", "1305*", "1305*", "1485*", "1485*", "1307*"],
+            "age": [">40", "<=40", "<=40", ">40", ">40", "<=40"],
+            "disease": ["flu", "cold", "flu", "cold", "flu", "flu"],
+        }
+    )
+    qiNames = ["zip", "age"]
+
+    subsetIndices = findSubsetIndices(tableDataFrame, subsetDataFrame, qiNames)
+
+    assert subsetIndices == [0, 2, 1, 5]
+    assert subsetIndices == findSubsetIndicesByMask(
+        tableDataFrame, subsetDataFrame, qiNames
+    )
+
+
 def testAnonymizeData(
     arxDataAdult, arxHierarchyAdult, attributeTypesForAdultAllQi, javaApi
 ):
@@ -192,3 +275,69 @@ def testAnonymizeData(
         .toString()
         == "255559.85455731067"
     )
+
+
+def testJavaApiPoolReusesJavaApi(javaApiPool):
+    with javaApiPool.session() as javaApi:
+        firstJavaApi = javaApi
+
+    with javaApiPool.session() as javaApi:
+        assert javaApi is firstJavaApi
+
+
+def testJavaApiPoolIsBounded(javaApiPool):
+    with javaApiPool.session():
+        with pytest.raises(TimeoutError):
+            javaApiPool.acquire(timeout=0.1)
+
+
+def testJavaApiPoolReplacesDeadJavaApi(javaApiPool):
+    with javaApiPool.session() as javaApi:
+        deadJavaApi = javaApi
+        deadJavaApi.shutdown()
+
+    with javaApiPool.session() as javaApi:
+        assert javaApi is not deadJavaApi
+        assert javaApi.isAlive()
+
+
+def testJavaApiPoolShutdown(javaApiPool):
+    with javaApiPool.session() as javaApi:
+        pass
+
+    javaApiPool.shutdown()
+
+    assert javaApi.isAlive() is False
+    with pytest.raises(RuntimeError):
+        javaApiPool.acquire()
+
+
+def testJavaApiKill():
+    javaProcess = subprocess.Popen(
+        [sys.executable, "-c", "import time; time.sleep(60)"]
+    )
+    gatewayObject = SimpleNamespace(
+        shutdown=lambda: None, java_process=javaProcess
+    )
+
+    JavaApi(gatewayObject, apiTable={}).kill()
+
+    assert javaProcess.poll() is not None
+
+
+def testJavaApiPoolForgetsJavaApisAfterFork(javaApiPool):
+    javaApi = javaApiPool.acquire()
+
+    processId = os.fork()
+    if processId == 0:
+        exitCode = 1
+        try:
+            if javaApiPool.acquire(timeout=0.1) is not javaApi:
+                exitCode = 0
+        finally:
+            os._exit(exitCode)
+
+    _, status = os.waitpid(processId, 0)
+    javaApiPool.release(javaApi)
+
+    assert os.waitstatus_to_exitcode(status) == 0
@@ -0,0 +1,44 @@
+import pandas as pd
+import pytest
+
+from PETWorks.batch import PETAnonymization
+from PETWorks.kanonymity import PETAnonymization as KAnonymization
+
+
+def testPETAnonymization(DATASET_PATH_ADULT, attributeTypesForAdultAllQi):
+    results = PETAnonymization(
+        DATASET_PATH_ADULT["originalData"],
+        DATASET_PATH_ADULT["dataHierarchy"],
+        attributeTypesForAdultAllQi,
+        maxSuppressionRate=0.04,
+        tech="k-anonymity",
+        parameterSets=[{"k": 5}, {"k": 10, "maxSuppressionRate": 0.1}],
+    )
+
+    assert next(results).equals(
+        pd.read_csv("data/KAnonymization.csv", sep=";", skipinitialspace=True)
+    )
+    assert next(results).equals(
+        KAnonymization(
+            DATASET_PATH_ADULT["originalData"],
+            DATASET_PATH_ADULT["dataHierarchy"],
+            attributeTypesForAdultAllQi,
+            maxSuppressionRate=0.1,
+            k=10,
+        )
+    )
+    assert next(results, None) is None
+
+
+def testPETAnonymizationUnsupported(
+    DATASET_PATH_ADULT, attributeTypesForAdultAllQi
+):
+    with pytest.raises(ValueError):
+        PETAnonymization(
+            DATASET_PATH_ADULT["originalData"],
+            DATASET_PATH_ADULT["dataHierarchy"],
+            attributeTypesForAdultAllQi,
+            maxSuppressionRate=0.04,
+            tech="profitability",
+            parameterSets=[{}],
+        )
@@ -2,10 +2,12 @@ from PETWorks.attributetypes import IDENTIFIER, QUASI_IDENTIFIER
 from PETWorks.attributetypes import SENSITIVE_ATTRIBUTE
 from PETWorks.dpresence import (
     measureDPresence,
+    measureDPresenceInChunks,
     validateDPresence,
     PETValidation,
     PETAnonymization,
 )
+from PETWorks.hierarchy import loadCompiledHierarchies
 
 from typing import Dict
 import pytest
@@ -96,6 +98,18 @@ def testPETValidationNotFulfilled(attributeTypesForPresence):
     assert result["d-presence"] is False
 
 
+def testMeasureDPresenceInChunks(attributeTypesForPresence):
+    deltaValues = measureDPresenceInChunks(
+        ORIGINAL_POPULATION_DATA_PATH,
+        ANONYMIZED_SAMPLE_DATA_PATH,
+        loadCompiledHierarchies(DATA_HIERARCHY_PATH, ";"),
+        attributeTypesForPresence,
+        chunkSize=2,
+    )
+
+    assert set(deltaValues) == {1 / 2, 2 / 3}
+
+
 def testPETAnonymization(DATASET_PATH_ADULT, attributeTypesForAdultAllQi):
     result = PETAnonymization(
         DATASET_PATH_ADULT["originalData"],
@@ -0,0 +1,66 @@
+from shutil import copyfile
+from typing import Dict
+
+import pytest
+
+from PETWorks.attributetypes import (
+    IDENTIFIER,
+    QUASI_IDENTIFIER,
+    SENSITIVE_ATTRIBUTE,
+)
+from PETWorks.generalization import Generalizer, readDataFrameFromCsv
+from PETWorks.hierarchy import loadCompiledHierarchies
+
+
+@pytest.fixture(scope="module")
+def attributeTypesForPresence() -> Dict[str, str]:
+    attributeTypes = {
+        "identifier": IDENTIFIER,
+        "name": IDENTIFIER,
+        "zip": QUASI_IDENTIFIER,
+        "age": QUASI_IDENTIFIER,
+        "nationality": QUASI_IDENTIFIER,
+        "sen": SENSITIVE_ATTRIBUTE,
+    }
+    return attributeTypes
+
+
+@pytest.fixture(scope="module")
+def generalizerForPresence(attributeTypesForPresence) -> Generalizer:
+    return Generalizer(
+        readDataFrameFromCsv("data/presence.csv", ";"),
+        loadCompiledHierarchies("data/presence_hierarchy", ";"),
+        attributeTypesForPresence,
+    )
+
+
+def testApply(generalizerForPresence):
+    result = generalizerForPresence.apply([3, 3, 2])
+
+    assert result.equals(
+        readDataFrameFromCsv("data/presence_transformed.csv", ";")
+    )
+
+
+def testApplyWithSuppression(generalizerForPresence):
+    result = generalizerForPresence.apply([3, 3, 1], k=2, suppressionLimit=0.2)
+
+    suppressed = result[["zip", "age", "nationality"]] == "*"
+    assert suppressed.all(axis=1).tolist() == [False] * 7 + [True, False]
+    assert result["sen"].equals(generalizerForPresence.originalData["sen"])
+
+
+def testApplyNotAnonymous(generalizerForPresence):
+    assert (
+        generalizerForPresence.apply([3, 3, 1], k=2, suppressionLimit=0.1)
+        is None
+    )
+
+
+def testReadDataFrameFromCsvCached(tmp_path):
+    path = tmp_path / "presence.csv"
+    copyfile("data/presence.csv", path)
+
+    expected = readDataFrameFromCsv(path, ";", cache=False)
+    assert readDataFrameFromCsv(path, ";", cache=True).equals(expected)
+    assert readDataFrameFromCsv(path, ";", cache=True).equals(expected)
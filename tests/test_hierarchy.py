@@ -0,0 +1,105 @@
+from os import utime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from PETWorks.hierarchy import (
+    compileHierarchy,
+    findAnonymousLevels,
+    loadCompiledHierarchies,
+)
+
+PRESENCE_QI_NAMES = ["zip", "age", "nationality"]
+
+
+@pytest.fixture(scope="module")
+def anonymizedPresence() -> pd.DataFrame:
+    anonymized = pd.read_csv(
+        "data/presence_anonymized.csv", sep=";", dtype=str
+    )
+    anonymized.columns = anonymized.columns.str.strip()
+    return anonymized.apply(lambda column: column.str.strip())
+
+
+def testCompileHierarchy():
+    hierarchy = compileHierarchy(
+        np.array(
+            [
+                ["Tech-support", "Technical", "*"],
+                ["Craft-repair", "Technical", "*"],
+                [" Other-service", "Other", "*"],
+            ]
+        )
+    )
+
+    assert hierarchy.height == 3
+    assert hierarchy.leafIds == {
+        "Tech-support": 0,
+        "Craft-repair": 1,
+        "Other-service": 2,
+    }
+    assert hierarchy.levelCodes.tolist() == [[2, 1, 0], [0, 1, 0], [1, 0, 0]]
+    assert hierarchy.levelValues[1].tolist() == ["Other", "Technical"]
+
+
+def testLoadCompiledHierarchies(DATASET_PATH_ADULT):
+    hierarchies = loadCompiledHierarchies(
+        DATASET_PATH_ADULT["dataHierarchy"], ";"
+    )
+
+    assert len(hierarchies) == 9
+    assert hierarchies["sex"].values.tolist() == [
+        ["Male", "*"],
+        ["Female", "*"],
+    ]
+    assert hierarchies["occupation"].values.shape == (14, 3)
+
+
+def testLoadCompiledHierarchiesCached(DATASET_PATH_ADULT):
+    first = loadCompiledHierarchies(DATASET_PATH_ADULT["dataHierarchy"], ";")
+    second = loadCompiledHierarchies(DATASET_PATH_ADULT["dataHierarchy"], ";")
+
+    assert first is not second
+    assert all(first[name] is second[name] for name in first)
+
+
+def testLoadCompiledHierarchiesReloadOnChange(tmp_path):
+    hierarchyFile = tmp_path / "test_hierarchy_sex.csv"
+    hierarchyFile.write_text("Male;*\nFemale;*\n")
+
+    first = loadCompiledHierarchies(tmp_path, ";")
+    assert first["sex"].values.shape == (2, 2)
+
+    hierarchyFile.write_text("Male;*\nFemale;*\nOther;*\n")
+    utime(hierarchyFile, ns=(0, 0))
+
+    second = loadCompiledHierarchies(tmp_path, ";")
+    assert second["sex"].values.shape == (3, 2)
+
+
+def testFindAnonymousLevels(anonymizedPresence):
+    hierarchies = loadCompiledHierarchies("data/presence_hierarchy", ";")
+
+    assert findAnonymousLevels(
+        anonymizedPresence, PRESENCE_QI_NAMES, hierarchies
+    ) == [3, 3, 2]
+
+
+def testFindAnonymousLevelsAllSuppressed(anonymizedPresence):
+    hierarchies = loadCompiledHierarchies("data/presence_hierarchy", ";")
+    anonymizedPresence = anonymizedPresence.copy()
+    anonymizedPresence[PRESENCE_QI_NAMES] = "*"
+
+    assert findAnonymousLevels(
+        anonymizedPresence, PRESENCE_QI_NAMES, hierarchies
+    ) == [5, 3, 3]
+
+
+def testFindAnonymousLevelsInconsistent(anonymizedPresence):
+    hierarchies = loadCompiledHierarchies("data/presence_hierarchy", ";")
+    anonymizedPresence = anonymizedPresence.copy()
+    anonymizedPresence.loc[0, "zip"] = "4763*"
+
+    with pytest.raises(ValueError):
+        findAnonymousLevels(anonymizedPresence, PRESENCE_QI_NAMES, hierarchies)
@@ -0,0 +1,95 @@
+from typing import Dict
+
+import pandas as pd
+import pytest
+
+import PETWorks
+from PETWorks.attributetypes import QUASI_IDENTIFIER, SENSITIVE_ATTRIBUTE
+from PETWorks.incremental import IncrementalValidation, PETValidation
+
+ANONYMIZED_DATA_PATH = "data/inpatient_anonymized.csv"
+
+
+@pytest.fixture(scope="module")
+def attributeTypesForInpatient() -> Dict[str, str]:
+    attributeTypes = {
+        "zipcode": QUASI_IDENTIFIER,
+        "age": QUASI_IDENTIFIER,
+        "nationality": QUASI_IDENTIFIER,
+        "condition": SENSITIVE_ATTRIBUTE,
+    }
+    return attributeTypes
+
+
+@pytest.fixture(scope="module")
+def inpatient() -> pd.DataFrame:
+    return pd.read_csv(ANONYMIZED_DATA_PATH, sep=";", dtype=str)
+
+
+def testUpdate(attributeTypesForInpatient, inpatient):
+    validation = IncrementalValidation(attributeTypesForInpatient, k=4, l=3)
+
+    first = validation.update(inpatient.iloc[:6])
+    assert (first.k, first.l) == (2, 2)
+    assert first.fulfillKAnonymity is False
+    assert first.kChangedClasses == {
+        ("1305*", "<=40", "*"): True,
+        ("1485*", ">40", "*"): False,
+    }
+
+    second = validation.update(inpatient.iloc[6:])
+    assert (second.k, second.l) == (4, 3)
+    assert second.fulfillKAnonymity is True
+    assert second.fulfillLDiversity is True
+    assert second.kChangedClasses == {
+        ("1485*", ">40", "*"): True,
+        ("1306*", "<=40", "*"): True,
+    }
+
+
+def testSaveAndLoad(attributeTypesForInpatient, inpatient, tmp_path):
+    validation = IncrementalValidation(attributeTypesForInpatient, k=4, l=3)
+    validation.update(inpatient.iloc[:6])
+    validation.save(tmp_path / "state.json")
+
+    loaded = IncrementalValidation.load(tmp_path / "state.json")
+
+    assert loaded.classSizes == validation.classSizes
+    assert loaded.distinctValues == validation.distinctValues
+    assert loaded.update(inpatient.iloc[6:]).k == 4
+
+
+def testPETValidation(attributeTypesForInpatient, tmp_path):
+    result = PETValidation(
+        tmp_path / "state.json",
+        ANONYMIZED_DATA_PATH,
+        "incremental",
+        attributeTypes=attributeTypesForInpatient,
+        k=4,
+        l=3,
+    )
+
+    assert result["fulfill k-anonymity"] is True
+    assert result["fulfill l-diversity"] is True
+    assert len(result["changed classes"]["k-anonymity"]) == 3
+
+
+def testPETValidationThroughPETWorks(attributeTypesForInpatient, tmp_path):
+    for _ in range(2):
+        result = PETWorks.PETValidation(
+            tmp_path / "state.json",
+            ANONYMIZED_DATA_PATH,
+            "incremental",
+            attributeTypes=attributeTypesForInpatient,
+            k=8,
+            l=3,
+        )
+
+    assert result["fulfill k-anonymity"] is True
+    assert sorted(
+        change["class"] for change in result["changed classes"]["k-anonymity"]
+    ) == [
+        ["1305*", "<=40", "*"],
+        ["1306*", "<=40", "*"],
+        ["1485*", ">40", "*"],
+    ]
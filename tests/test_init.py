@@ -0,0 +1,74 @@
+import subprocess
+import sys
+from types import ModuleType
+
+import pytest
+
+import PETWorks
+
+
+def testImportIsLazy():
+    loadedModules = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            "import sys, PETWorks; print(' '.join(sys.modules))",
+        ],
+        capture_output=True,
+        check=True,
+        text=True,
+    ).stdout.split()
+
+    for moduleName in ["torch", "pandas", "PETWorks.federatedlearning"]:
+        assert moduleName not in loadedModules
+
+
+def testPETValidation(DATASET_PATH_ADULT, attributeTypesForAdult):
+    result = PETWorks.PETValidation(
+        None,
+        DATASET_PATH_ADULT["anonymizedData"],
+        "k-anonymity",
+        attributeTypes=attributeTypesForAdult,
+        k=5,
+    )
+
+    assert result["fulfill k-anonymity"] is True
+
+
+def testPETValidationUnsupported():
+    with pytest.raises(ValueError):
+        PETWorks.PETValidation(None, None, "unknown")
+
+
+def testRegisterValidation():
+    plugin = ModuleType("plugin")
+    plugin.PETValidation = lambda recover, origin, tech, **keywordArgs: {
+        "tech": tech,
+        **keywordArgs,
+    }
+
+    PETWorks.registerValidation("plugin", plugin)
+    try:
+        result = PETWorks.PETValidation(None, None, "plugin", k=5)
+    finally:
+        del PETWorks.VALIDATIONS["plugin"]
+
+    assert result == {"tech": "plugin", "k": 5}
+
+
+def testRegisterAnonymization():
+    plugin = ModuleType("plugin")
+    plugin.PETAnonymization = lambda *arguments, **keywordArgs: (
+        arguments,
+        keywordArgs,
+    )
+
+    PETWorks.registerAnonymization("plugin", plugin)
+    try:
+        result = PETWorks.PETAnonymization(
+            "original.csv", "plugin", "hierarchy", {}, 0.1, k=5
+        )
+    finally:
+        del PETWorks.ANONYMIZATIONS["plugin"]
+
+    assert result == (("original.csv", "hierarchy", {}, 0.1), {"k": 5})
@@ -1,4 +1,5 @@
 from PETWorks.kanonymity import PETValidation, PETAnonymization
+from PETWorks.generalization import readDataFrameFromCsv
 import pandas as pd
 
 
@@ -26,6 +27,18 @@ def testPETValidationNotFulfilled(DATASET_PATH_ADULT, attributeTypesForAdult):
     assert result["fulfill k-anonymity"] is False
 
 
+def testPETValidationInChunks(DATASET_PATH_ADULT, attributeTypesForAdult):
+    result = PETValidation(
+        None,
+        DATASET_PATH_ADULT["anonymizedData"],
+        "k-anonymity",
+        attributeTypes=attributeTypesForAdult,
+        k=5,
+        chunkSize=1000,
+    )
+    assert result["fulfill k-anonymity"] is True
+
+
 def testPETAnonymization(DATASET_PATH_ADULT, attributeTypesForAdultAllQi):
     result = PETAnonymization(
         DATASET_PATH_ADULT["originalData"],
@@ -38,3 +51,18 @@ def testPETAnonymization(DATASET_PATH_ADULT, attributeTypesForAdultAllQi):
     assert result.equals(
         pd.read_csv("data/KAnonymization.csv", sep=";", skipinitialspace=True)
     )
+
+
+def testPETAnonymizationNatively(
+    DATASET_PATH_ADULT, attributeTypesForAdultAllQi
+):
+    result = PETAnonymization(
+        DATASET_PATH_ADULT["originalData"],
+        DATASET_PATH_ADULT["dataHierarchy"],
+        attributeTypesForAdultAllQi,
+        maxSuppressionRate=0.04,
+        k=5,
+        engine="native",
+    )
+
+    assert result.equals(readDataFrameFromCsv("data/KAnonymization.csv", ";"))
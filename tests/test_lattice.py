@@ -0,0 +1,125 @@
+from itertools import product
+
+import numpy as np
+import pytest
+
+from PETWorks.attributetypes import QUASI_IDENTIFIER
+from PETWorks.generalization import Generalizer, readDataFrameFromCsv
+from PETWorks.hierarchy import loadCompiledHierarchies
+from PETWorks.kanonymity import KAnonymityCriterion
+from PETWorks.lattice import (
+    Lattice,
+    LossMetric,
+    findKAnonymousLevels,
+    findOptimalLevels,
+    getMaxKValues,
+)
+from PETWorks.ldiversity import DistinctLDiversityCriterion
+from PETWorks.tcloseness import TClosenessCriterion
+
+
+@pytest.fixture(scope="module")
+def generalizerForPresence() -> Generalizer:
+    return Generalizer(
+        readDataFrameFromCsv("data/presence.csv", ";"),
+        loadCompiledHierarchies("data/presence_hierarchy", ";"),
+        {
+            "zip": QUASI_IDENTIFIER,
+            "age": QUASI_IDENTIFIER,
+            "nationality": QUASI_IDENTIFIER,
+        },
+    )
+
+
+def testLattice():
+    lattice = Lattice([2, 3])
+
+    assert len(lattice) == 6
+    assert [
+        lattice.nodes[nodeIds].tolist() for nodeIds in lattice.iterateLevels()
+    ] == [[[0, 0]], [[0, 1], [1, 0]], [[0, 2], [1, 1]], [[1, 2]]]
+
+
+def testGetMaxKValues():
+    maxKValues = getMaxKValues(np.array([4, 1, 2]), np.array([0, 2, 3, 7]))
+
+    assert maxKValues[:3].tolist() == [1, 2, 4]
+    assert maxKValues[3] > 7
+
+
+def testFindKAnonymousLevels(generalizerForPresence):
+    configs = [(0.0, 1), (0.0, 2), (0.2, 2), (0.5, 3), (1.0, 9)]
+
+    anonymousLevels = findKAnonymousLevels(generalizerForPresence, configs)
+
+    nodes = list(product(range(6), range(4), range(4)))
+    for suppressionLimit, k in configs:
+        assert anonymousLevels[(suppressionLimit, k)] == sorted(
+            (
+                node
+                for node in nodes
+                if generalizerForPresence.apply(node, k, suppressionLimit)
+                is not None
+            ),
+            key=sum,
+        )
+
+
+def testFindOptimalKAnonymousLevels(generalizerForPresence):
+    lossMetric = LossMetric(generalizerForPresence)
+
+    optimalLevels, _ = findOptimalLevels(
+        generalizerForPresence, [KAnonymityCriterion(2)], 0.2
+    )
+
+    losses = {}
+    for node in product(range(6), range(4), range(4)):
+        isOutlier = generalizerForPresence.getOutliers(node, 2, 0.2)
+        if isOutlier is not None:
+            losses[node] = lossMetric.measure(node, isOutlier)
+
+    assert losses[tuple(optimalLevels)] == min(losses.values())
+    assert (
+        findOptimalLevels(
+            generalizerForPresence, [KAnonymityCriterion(100)], 0.0
+        )
+        is None
+    )
+
+
+@pytest.mark.parametrize("suppressionRate", [0.0, 0.25])
+def testFindOptimalLevels(generalizerForPresence, suppressionRate):
+    sensitiveValues = generalizerForPresence.originalData["sen"]
+    criteria = [
+        KAnonymityCriterion(2),
+        DistinctLDiversityCriterion("sen", 2),
+        TClosenessCriterion(sensitiveValues, 0.3, None),
+    ]
+    lossMetric = LossMetric(generalizerForPresence)
+
+    levels, isOutlier = findOptimalLevels(
+        generalizerForPresence, criteria, suppressionRate
+    )
+
+    losses = {}
+    for node in product(range(6), range(4), range(4)):
+        classIds, _ = generalizerForPresence.getClassSizes(node)
+        classes = sensitiveValues.groupby(classIds)
+        isViolating = (
+            (classes.size() < 2)
+            | (classes.nunique() < 2)
+            | (
+                (
+                    classes.apply(lambda values: (values == "0").mean())
+                    - 4 / 9
+                ).abs()
+                > 0.3
+            )
+        ).to_numpy()
+
+        nodeOutliers = isViolating[classIds]
+        if nodeOutliers.sum() <= int(suppressionRate * 9):
+            losses[node] = lossMetric.measure(node, nodeOutliers)
+
+    assert losses[tuple(levels)] == min(losses.values())
+    assert lossMetric.measure(levels, isOutlier) == min(losses.values())
@@ -2,10 +2,12 @@ from PETWorks.attributetypes import QUASI_IDENTIFIER
 from PETWorks.attributetypes import SENSITIVE_ATTRIBUTE
 from PETWorks.ldiversity import (
     measureLDiversity,
+    measureLDiversityInChunks,
     validateLDiversity,
     PETValidation,
     PETAnonymization,
 )
+from PETWorks.generalization import readDataFrameFromCsv
 from typing import Dict
 import pytest
 import pandas as pd
@@ -74,6 +76,14 @@ def testPETValidationNotFulfilled(attributeTypesForInpatient):
     assert result["fulfill l-diversity"] is False
 
 
+def testMeasureLDiversityInChunks(attributeTypesForInpatient):
+    lValues = measureLDiversityInChunks(
+        ANONYMIZED_DATA_PATH, attributeTypesForInpatient, chunkSize=2
+    )
+
+    assert lValues == [3, 3, 3]
+
+
 def testPETAnonymization(DATASET_PATH_ADULT):
     attributeTypes = {
         "age": QUASI_IDENTIFIER,
@@ -98,3 +108,28 @@ def testPETAnonymization(DATASET_PATH_ADULT):
     assert result.equals(
         pd.read_csv("data/LAnonymization.csv", sep=";", skipinitialspace=True)
     )
+
+
+def testPETAnonymizationNatively(DATASET_PATH_ADULT):
+    attributeTypes = {
+        "age": QUASI_IDENTIFIER,
+        "education": QUASI_IDENTIFIER,
+        "marital-status": QUASI_IDENTIFIER,
+        "native-country": QUASI_IDENTIFIER,
+        "occupation": SENSITIVE_ATTRIBUTE,
+        "race": QUASI_IDENTIFIER,
+        "salary-class": QUASI_IDENTIFIER,
+        "sex": QUASI_IDENTIFIER,
+        "workclass": QUASI_IDENTIFIER,
+    }
+
+    result = PETAnonymization(
+        DATASET_PATH_ADULT["originalData"],
+        DATASET_PATH_ADULT["dataHierarchy"],
+        attributeTypes,
+        maxSuppressionRate=0.04,
+        l=5,
+        engine="native",
+    )
+
+    assert result.equals(readDataFrameFromCsv("data/LAnonymization.csv", ";"))
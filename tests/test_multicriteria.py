@@ -0,0 +1,81 @@
+from typing import Dict
+
+import pytest
+
+from PETWorks.attributetypes import (
+    IDENTIFIER,
+    QUASI_IDENTIFIER,
+    SENSITIVE_ATTRIBUTE,
+)
+from PETWorks.kanonymity import measureKAnonymity
+from PETWorks.ldiversity import measureLDiversity
+from PETWorks.multicriteria import PETAnonymization
+
+ORIGINAL_DATA_PATH = "data/presence.csv"
+DATA_HIERARCHY_PATH = "data/presence_hierarchy"
+
+
+@pytest.fixture(scope="module")
+def attributeTypesForPresence() -> Dict[str, str]:
+    attributeTypes = {
+        "identifier": IDENTIFIER,
+        "name": IDENTIFIER,
+        "zip": QUASI_IDENTIFIER,
+        "age": QUASI_IDENTIFIER,
+        "nationality": QUASI_IDENTIFIER,
+        "sen": SENSITIVE_ATTRIBUTE,
+    }
+    return attributeTypes
+
+
+def testPETAnonymization(attributeTypesForPresence):
+    result = PETAnonymization(
+        ORIGINAL_DATA_PATH,
+        DATA_HIERARCHY_PATH,
+        attributeTypesForPresence,
+        maxSuppressionRate=0.25,
+        techs=["k-anonymity", "l-diversity", "t-closeness"],
+        k=2,
+        l=2,
+        t=0.3,
+    )
+
+    assert result[["zip", "age", "nationality"]].values.tolist() == [
+        ["4790*", "*", "N. America"],
+        ["4790*", "*", "N. America"],
+        ["4790*", "*", "N. America"],
+        ["4763*", "*", "S. America"],
+        ["4763*", "*", "S. America"],
+        ["4763*", "*", "S. America"],
+        ["4897*", "*", "W. Europe"],
+        ["*", "*", "*"],
+        ["4897*", "*", "W. Europe"],
+    ]
+    assert (result[["identifier", "name"]] == "*").all(axis=None)
+
+    generalized = result[result["zip"] != "*"]
+    assert measureKAnonymity(generalized, ["zip", "age", "nationality"]) >= 2
+    assert min(measureLDiversity(generalized, attributeTypesForPresence)) >= 2
+
+
+def testPETAnonymizationUnsupported(attributeTypesForPresence):
+    with pytest.raises(ValueError):
+        PETAnonymization(
+            ORIGINAL_DATA_PATH,
+            DATA_HIERARCHY_PATH,
+            attributeTypesForPresence,
+            maxSuppressionRate=0.0,
+            techs=["k-anonymity", "d-presence"],
+            k=2,
+        )
+
+    with pytest.raises(ValueError):
+        PETAnonymization(
+            ORIGINAL_DATA_PATH,
+            DATA_HIERARCHY_PATH,
+            attributeTypesForPresence,
+            maxSuppressionRate=0.0,
+            techs=["k-anonymity"],
+            engine="arx",
+            k=2,
+        )
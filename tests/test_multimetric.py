@@ -0,0 +1,146 @@
+from typing import Dict
+
+import pytest
+
+from PETWorks.attributetypes import (
+    IDENTIFIER,
+    QUASI_IDENTIFIER,
+    SENSITIVE_ATTRIBUTE,
+)
+import PETWorks.ldiversity as LDiversity
+import PETWorks.profitability as Profitability
+from PETWorks.multimetric import PETValidation
+
+
+@pytest.fixture(scope="module")
+def attributeTypesForPresence() -> Dict[str, str]:
+    attributeTypes = {
+        "identifier": IDENTIFIER,
+        "name": IDENTIFIER,
+        "zip": QUASI_IDENTIFIER,
+        "age": QUASI_IDENTIFIER,
+        "nationality": QUASI_IDENTIFIER,
+        "sen": SENSITIVE_ATTRIBUTE,
+    }
+    return attributeTypes
+
+
+def testPETValidation(DATASET_PATH_ADULT, attributeTypesForAdult):
+    result = PETValidation(
+        DATASET_PATH_ADULT["originalData"],
+        DATASET_PATH_ADULT["anonymizedData"],
+        ["k-anonymity", "l-diversity", "t-closeness", "profitability"],
+        dataHierarchy=DATASET_PATH_ADULT["dataHierarchy"],
+        attributeTypes=attributeTypesForAdult,
+        k=5,
+        l=2,
+        tLimit=0.5,
+        allowAttack=False,
+        adversaryCost=4,
+        adversaryGain=300,
+        publisherLost=300,
+        publisherBenefit=1200,
+    )
+
+    assert result["k-anonymity"] == {"k": 5, "fulfill k-anonymity": True}
+    assert result["l-diversity"] == {"l": 2, "fulfill l-diversity": False}
+    assert result["t-closeness"] == {"t": 0.5, "fulfill t-closeness": True}
+    assert result["profitability"]["isProfitable"] is True
+    assert result["class sizes"]["min"] == 5
+
+
+def testPETValidationInParallel(DATASET_PATH_ADULT, attributeTypesForAdult):
+    arguments = (
+        DATASET_PATH_ADULT["originalData"],
+        DATASET_PATH_ADULT["anonymizedData"],
+        ["k-anonymity", "l-diversity", "t-closeness"],
+    )
+    parameters = {
+        "dataHierarchy": DATASET_PATH_ADULT["dataHierarchy"],
+        "attributeTypes": attributeTypesForAdult,
+        "k": 5,
+        "l": 2,
+        "tLimit": 0.5,
+    }
+
+    assert PETValidation(
+        *arguments, numOfProcess=3, **parameters
+    ) == PETValidation(*arguments, **parameters)
+
+
+def testPETValidationDPresence(attributeTypesForPresence):
+    result = PETValidation(
+        "data/presence.csv",
+        "data/presence_anonymized.csv",
+        ["d-presence", "k-anonymity"],
+        dataHierarchy="data/presence_hierarchy",
+        attributeTypes=attributeTypesForPresence,
+        dMin=1 / 2,
+        dMax=2 / 3,
+        k=2,
+    )
+
+    assert result["d-presence"] == {
+        "dMin": 1 / 2,
+        "dMax": 2 / 3,
+        "d-presence": True,
+    }
+    assert result["k-anonymity"]["fulfill k-anonymity"] is True
+    assert result["class sizes"] == {
+        "number of classes": 2,
+        "min": 2,
+        "max": 3,
+        "average": 2.5,
+        "suppressed records": 0,
+    }
+
+
+def testPETValidationUnsupportedTech(attributeTypesForPresence):
+    with pytest.raises(ValueError):
+        PETValidation(
+            "data/presence.csv",
+            "data/presence_anonymized.csv",
+            ["k-anonymity", "FL"],
+            attributeTypes=attributeTypesForPresence,
+            k=2,
+        )
+
+
+@pytest.mark.parametrize("chunkSize", [None, 1000])
+def testPETValidationMatchesSingleMetrics(
+    DATASET_PATH_ADULT, attributeTypesForAdult, chunkSize
+):
+    # The adult release has a space after every delimiter.
+    parameters = {
+        "allowAttack": False,
+        "adversaryCost": 4,
+        "adversaryGain": 300,
+        "publisherLost": 300,
+        "publisherBenefit": 1200,
+    }
+    result = PETValidation(
+        None,
+        DATASET_PATH_ADULT["anonymizedData"],
+        ["l-diversity", "profitability"],
+        attributeTypes=attributeTypesForAdult,
+        l=2,
+        **parameters,
+    )
+
+    assert result["l-diversity"] == LDiversity.PETValidation(
+        None,
+        DATASET_PATH_ADULT["anonymizedData"],
+        "l-diversity",
+        attributeTypesForAdult,
+        2,
+        chunkSize=chunkSize,
+    )
+    assert result["profitability"] == Profitability.PETValidation(
+        None,
+        DATASET_PATH_ADULT["anonymizedData"],
+        "profitability",
+        None,
+        attributeTypesForAdult,
+        chunkSize=chunkSize,
+        **parameters,
+    )
@@ -0,0 +1,42 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from PETWorks.parallel import runInParallel
+from PETWorks.table import EncodedTable
+
+
+def testRunInParallel():
+    table = EncodedTable.fromDataFrame(
+        pd.DataFrame({"zip": ["47*", "47*", "48*"], "sen": ["1", "2", "1"]})
+    )
+    tasks = [
+        (table.getClassSizes, (["zip"],)),
+        (table.countDistinctValues, (["zip"], "sen")),
+        (np.add, (1, 2)),
+    ]
+
+    assert [
+        np.asarray(result).tolist()
+        for result in runInParallel(tasks, numOfProcess=2)
+    ] == [[2, 1], [2, 1], 3]
+
+
+def __identify(name: str) -> str:
+    time.sleep(0.2)
+    return name
+
+
+def testRunInParallelConcurrently():
+    with ThreadPoolExecutor(2) as executor:
+        futures = [
+            executor.submit(runInParallel, [(__identify, (name,))] * 4, 2)
+            for name in ["A", "B"]
+        ]
+
+        assert [future.result() for future in futures] == [
+            ["A"] * 4,
+            ["B"] * 4,
+        ]
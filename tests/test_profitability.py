@@ -1,5 +1,13 @@
 from PETWorks.attributetypes import QUASI_IDENTIFIER, INSENSITIVE_ATTRIBUTE
-from PETWorks.profitability import PETValidation
+from PETWorks.generalization import readEncodedTableFromCsv
+from PETWorks.profitability import (
+    PETValidation,
+    _countClassSizesInChunks,
+    computeProfitabilityPayoffAcceptingAttack,
+    computeProfitabilityPayoffNoAttack,
+    measureProfitabilityPayoffAcceptingAttack,
+    measureProfitabilityPayoffNoAttack,
+)
 
 
 def testPETValidation(DATASET_PATH_DELTA):
@@ -31,3 +39,53 @@ def testPETValidation(DATASET_PATH_DELTA):
         "publisher's benefit": 1200,
         "isProfitable": True,
     }
+
+
+def testPETValidationInChunks(DATASET_PATH_DELTA):
+    attributeTypes = {
+        "zip": QUASI_IDENTIFIER,
+        "age": QUASI_IDENTIFIER,
+        "nationality": QUASI_IDENTIFIER,
+        "salary-class": INSENSITIVE_ATTRIBUTE,
+    }
+
+    result = PETValidation(
+        DATASET_PATH_DELTA["originalData"],
+        DATASET_PATH_DELTA["anonymizedData"],
+        "profitability",
+        dataHierarchy=DATASET_PATH_DELTA["dataHierarchy"],
+        attributeTypes=attributeTypes,
+        allowAttack=False,
+        adversaryCost=4,
+        adversaryGain=300,
+        publisherLost=300,
+        publisherBenefit=1200,
+        chunkSize=3,
+    )
+
+    assert result["isProfitable"] is False
+
+
+def testPayoffInChunksWithMissingValues(tmp_path):
+    subset = tmp_path / "subset.csv"
+    subset.write_text(
+        "zip; age; salary-class\n"
+        "1305*; <=40; <=50K\n"
+        "1305*; <=40; >50K\n"
+        "; <=40; <=50K\n"
+        "1485*; ; >50K\n"
+        "1485*\n"
+        "1485*; >40; <=50K\n"
+    )
+    qiNames = ["zip", "age"]
+    anonymized = readEncodedTableFromCsv(subset, ";")
+    classSizes, numOfRows = _countClassSizesInChunks(subset, qiNames, 2)
+
+    assert computeProfitabilityPayoffAcceptingAttack(
+        classSizes, numOfRows, 300, 1200
+    ) == measureProfitabilityPayoffAcceptingAttack(
+        anonymized, qiNames, 300, 1200
+    )
+    assert computeProfitabilityPayoffNoAttack(
+        classSizes, numOfRows, 4, 300
+    ) == measureProfitabilityPayoffNoAttack(anonymized, qiNames, 4, 300)
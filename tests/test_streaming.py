@@ -0,0 +1,23 @@
+import pandas as pd
+
+from PETWorks.streaming import countClassSizes, countDistinctValues
+
+
+def testCountClassSizes():
+    chunks = [
+        pd.DataFrame({"zip": ["47*", "47*"], "sen": ["1", "2"]}),
+        pd.DataFrame({"zip": ["48*", "47*"], "sen": ["1", None]}),
+    ]
+
+    classSizes, valueCounts = countClassSizes(
+        iter(chunks), [["zip"], ["zip", "sen"]]
+    )
+
+    assert classSizes.to_dict() == {"47*": 3, "48*": 1}
+    assert countDistinctValues(classSizes, valueCounts).tolist() == [2, 1]
+
+
+def testCountClassSizesWithoutChunks():
+    (classSizes,) = countClassSizes(iter([]), [["zip"]])
+
+    assert classSizes.empty
@@ -0,0 +1,107 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from PETWorks.table import EncodedTable
+
+
+@pytest.fixture(scope="module")
+def dataFrame() -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "zip": ["476*", "479*", "476*", "*", "476*", None],
+            "age": [30, 40, 30, 30, 40, 40],
+            "disease": ["flu", "flu", "cancer", "flu", "flu", "cancer"],
+        }
+    )
+
+
+def testFromDataFrame(dataFrame):
+    table = EncodedTable.fromDataFrame(dataFrame)
+
+    assert len(table) == 6
+    assert table.columns == ["zip", "age", "disease"]
+    assert table.codes["zip"].dtype == np.int8
+    assert table.codebooks["zip"].tolist() == ["*", "476*", "479*"]
+    assert table.toDataFrame().equals(dataFrame)
+
+
+def testGetClassIds(dataFrame):
+    table = EncodedTable.fromDataFrame(dataFrame)
+
+    classIds, numOfClasses = table.getClassIds(["zip", "age"])
+
+    assert numOfClasses == 4
+    assert classIds.tolist() == (
+        dataFrame.groupby(["zip", "age"]).ngroup().fillna(-1).tolist()
+    )
+    assert table.getClassIds(["zip", "age"]) is table.getClassIds(
+        ["zip", "age"]
+    )
+
+
+def testClassStatistics(dataFrame):
+    table = EncodedTable.fromDataFrame(dataFrame)
+
+    assert table.getClassSizes(["zip"]).tolist() == [1, 3, 1]
+    assert table.countDistinctValues(["zip"], "disease").tolist() == [1, 2, 1]
+    assert (
+        table.isSuppressed(["zip"]).tolist()
+        == [False] * 3 + [True] + [False] * 2
+    )
+
+
+def testSaveAndLoad(dataFrame, tmp_path):
+    EncodedTable.fromDataFrame(dataFrame).save(tmp_path)
+
+    loaded = EncodedTable.load(tmp_path, list(dataFrame.columns))
+
+    assert loaded.codebooks["age"].tolist() == [30, 40]
+    assert loaded.toDataFrame().equals(dataFrame)
+
+
+def testSaveMixedColumn(tmp_path):
+    table = EncodedTable.fromDataFrame(
+        pd.DataFrame({"zip": ["476*", 47677, "476*"]})
+    )
+
+    with pytest.raises(TypeError):
+        table.save(tmp_path)
+
+
+def testFromCsvCached(dataFrame, tmp_path):
+    path = tmp_path / "data.csv"
+    dataFrame.to_csv(path, sep=";", index=False)
+
+    first = EncodedTable.fromCsv(path, ";", cache=True)
+    second = EncodedTable.fromCsv(path, ";", cache=True)
+
+    assert isinstance(second.codes["zip"], np.memmap)
+    assert second.toDataFrame().equals(first.toDataFrame())
+    assert second.toDataFrame().equals(pd.read_csv(path, sep=";"))
+
+
+def testFromCsvCacheInvalidated(dataFrame, tmp_path):
+    path = tmp_path / "data.csv"
+    dataFrame.to_csv(path, sep=";", index=False)
+    EncodedTable.fromCsv(path, ";", cache=True)
+
+    dataFrame.iloc[:3].to_csv(path, sep=";", index=False)
+    table = EncodedTable.fromCsv(path, ";", cache=True)
+
+    assert len(table) == 3
+    assert not isinstance(table.codes["zip"], np.memmap)
+
+
+def testFromCsvCacheSkipsMixedColumn(tmp_path):
+    path = tmp_path / "data.csv"
+    path.write_text("zip;age\n476*;30\n47677;40\n")
+    converters = {
+        "zip": lambda value: int(value) if value.isdigit() else value
+    }
+
+    EncodedTable.fromCsv(path, ";", cache=True, converters=converters)
+    table = EncodedTable.fromCsv(path, ";", cache=True, converters=converters)
+
+    assert table.toDataFrame()["zip"].tolist() == ["476*", 47677]
+    assert not isinstance(table.codes["zip"], np.memmap)
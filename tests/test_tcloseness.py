@@ -1,7 +1,101 @@
 from PETWorks.attributetypes import QUASI_IDENTIFIER
 from PETWorks.attributetypes import SENSITIVE_ATTRIBUTE
-from PETWorks.tcloseness import PETAnonymization
+from PETWorks.arx import loadDataHierarchyNatively
+from PETWorks.generalization import readDataFrameFromCsv
+from PETWorks.tcloseness import (
+    measureTCloseness,
+    PETValidation,
+    PETAnonymization,
+)
 import pandas as pd
+import pytest
+
+
+@pytest.fixture(scope="module")
+def attributeTypesForHierarchicalTCloseness():
+    return {
+        "age": QUASI_IDENTIFIER,
+        "education": QUASI_IDENTIFIER,
+        "marital-status": QUASI_IDENTIFIER,
+        "native-country": QUASI_IDENTIFIER,
+        "occupation": SENSITIVE_ATTRIBUTE,
+        "race": QUASI_IDENTIFIER,
+        "salary-class": QUASI_IDENTIFIER,
+        "sex": QUASI_IDENTIFIER,
+        "workclass": QUASI_IDENTIFIER,
+    }
+
+
+def testMeasureHierarchicalTCloseness(DATASET_PATH_ADULT):
+    originalData = pd.read_csv(
+        DATASET_PATH_ADULT["originalData"], sep=";", skipinitialspace=True
+    )
+    anonymizedData = pd.read_csv(
+        DATASET_PATH_ADULT["anonymizedData"], sep=";", skipinitialspace=True
+    )
+    dataHierarchy = loadDataHierarchyNatively(
+        DATASET_PATH_ADULT["dataHierarchy"], ";"
+    )
+
+    t = measureTCloseness(
+        originalData,
+        anonymizedData,
+        "occupation",
+        ["age", "sex", "race"],
+        dataHierarchy["occupation"],
+    )
+    assert t == pytest.approx(0.0642857142857143)
+
+
+def testMeasureOrderedTCloseness(DATASET_PATH_ADULT):
+    originalData = pd.read_csv(
+        DATASET_PATH_ADULT["originalData"], sep=";", skipinitialspace=True
+    )
+    anonymizedData = pd.read_csv(
+        DATASET_PATH_ADULT["anonymizedData"], sep=";", skipinitialspace=True
+    )
+    dataHierarchy = loadDataHierarchyNatively(
+        DATASET_PATH_ADULT["dataHierarchy"], ";"
+    )
+
+    t = measureTCloseness(
+        originalData,
+        anonymizedData,
+        "age",
+        ["sex", "race", "marital-status"],
+        dataHierarchy["age"],
+    )
+    assert t == pytest.approx(209.45833333333331)
+
+
+def testPETValidationFulfilled(
+    DATASET_PATH_ADULT, attributeTypesForHierarchicalTCloseness
+):
+    result = PETValidation(
+        DATASET_PATH_ADULT["originalData"],
+        DATASET_PATH_ADULT["anonymizedData"],
+        "t-closeness",
+        dataHierarchy=DATASET_PATH_ADULT["dataHierarchy"],
+        attributeTypes=attributeTypesForHierarchicalTCloseness,
+        tLimit=0.1,
+    )
+    assert result["t"] == 0.1
+    assert result["fulfill t-closeness"] is True
+
+
+def testPETValidationNotFulfilled(
+    DATASET_PATH_ADULT, attributeTypesForHierarchicalTCloseness
+):
+    result = PETValidation(
+        DATASET_PATH_ADULT["originalData"],
+        DATASET_PATH_ADULT["anonymizedData"],
+        "t-closeness",
+        dataHierarchy=DATASET_PATH_ADULT["dataHierarchy"],
+        attributeTypes=attributeTypesForHierarchicalTCloseness,
+        tLimit=0.05,
+    )
+    assert result["t"] == 0.05
+    assert result["fulfill t-closeness"] is False
 
 
 def testPETAnonymizationOrderedTCloseness(DATASET_PATH_ADULT):
@@ -60,3 +154,47 @@ def testPETAnonymizationHierarchicalTCloseness(DATASET_PATH_ADULT):
             skipinitialspace=True,
         )
     )
+
+
+def testPETAnonymizationOrderedTClosenessNatively(DATASET_PATH_ADULT):
+    attributeTypes = {
+        "age": SENSITIVE_ATTRIBUTE,
+        "education": QUASI_IDENTIFIER,
+        "marital-status": QUASI_IDENTIFIER,
+        "native-country": QUASI_IDENTIFIER,
+        "occupation": QUASI_IDENTIFIER,
+        "race": QUASI_IDENTIFIER,
+        "salary-class": QUASI_IDENTIFIER,
+        "sex": QUASI_IDENTIFIER,
+        "workclass": QUASI_IDENTIFIER,
+    }
+
+    result = PETAnonymization(
+        DATASET_PATH_ADULT["originalData"],
+        DATASET_PATH_ADULT["dataHierarchy"],
+        attributeTypes,
+        maxSuppressionRate=0.04,
+        t=0.2,
+        engine="native",
+    )
+
+    assert result.equals(
+        readDataFrameFromCsv("data/OrderedTAnonymization.csv", ";")
+    )
+
+
+def testPETAnonymizationHierarchicalTClosenessNatively(
+    DATASET_PATH_ADULT, attributeTypesForHierarchicalTCloseness
+):
+    result = PETAnonymization(
+        DATASET_PATH_ADULT["originalData"],
+        DATASET_PATH_ADULT["dataHierarchy"],
+        attributeTypesForHierarchicalTCloseness,
+        maxSuppressionRate=0.04,
+        t=0.2,
+        engine="native",
+    )
+
+    assert result.equals(
+        readDataFrameFromCsv("data/HierarchicalTAnonymization.csv", ";")
+    )